@@ -1,18 +1,27 @@
 import os
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, abort, make_response
 from flask_oauthlib.provider import OAuth2Provider
 from flask_talisman import Talisman
 from flask_cors import CORS
 import uuid
-from pathlib import Path
-import json
-import src.server as auth
-import sys
+from src import database
+from src.leaderboard import Leaderboard
+from src.keys import KeyRegistry
+from src.sessions import create_sessions
+from src.handlers import Handlers
+from src import questions
+from src import hashing
+from src import metrics
+from src import logs
+import logging
+import time
 import argparse
 
 # set up flask API
 app = Flask(__name__)
 app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", os.urandom(24))
+# keep the leaderboard in the order it was sorted
+app.json.sort_keys = False
 # enables CORS
 CORS(app)
 
@@ -20,325 +29,251 @@ CORS(app)
 parser = argparse.ArgumentParser()
 parser.add_argument(
     "--logfile",
-    type=bool,
-    default=False,
-    help="Instead of printing logs onto the terminal, log into file.",
+    type=str,
+    nargs="?",
+    const="log.txt",
+    default=None,
+    help="Instead of printing logs onto the terminal, log into a file as "
+    "JSON lines, log.txt if no file is given.",
+)
+parser.add_argument(
+    "--asgi",
+    action="store_true",
+    help="Serve the async (ASGI) version of the API with hypercorn, "
+    "for many players at once, needs requirements-asgi.txt.",
+)
+parser.add_argument(
+    "--port",
+    type=int,
+    default=5000,
+    help="Port to serve the API on.",
+)
+parser.add_argument(
+    "--no-https-redirect",
+    action="store_true",
+    help="Serve plain HTTP without redirecting to HTTPS, for local "
+    "testing such as bench/.",
+)
+parser.add_argument(
+    "--max-active-quizzes",
+    type=int,
+    default=database.MAX_ACTIVE_QUIZZES,
+    help="Competitive quizzes each user may have in progress at once, "
+    "the least recently used is dropped past this.",
+)
+parser.add_argument(
+    "--sessions",
+    type=str,
+    choices=["memory", "sqlite", "redis"],
+    default=None,
+    help="Where infinite quiz sessions are kept, use sqlite or redis "
+    "when running several workers.",
 )
 args = parser.parse_args()
 
-if args.logfile:
-    log_file = open("log.txt", "wt")
-    sys.stdout = sys.stderr = log_file
+# fork the password hashing workers before any other threads start
+hashing.pool.start()
 
-    @app.teardown_appcontext
-    def close_log_file(error):
-        log_file.close()
+# logs are written by a background thread, never the request's
+logs.setup(args.logfile)
+log = logging.getLogger("quizzy.api")
 
-# load valid API keys
-API_KEYS_DIR = Path(Path(__file__).parent, "src", "valid_api_keys.json")
-with open(API_KEYS_DIR, "r") as f:
-    VALID_KEYS = json.loads(f.read())
+# set up the database and the in-memory house leaderboard
+database.MAX_ACTIVE_QUIZZES = args.max_active_quizzes
+database.init_db()
+leaderboard = Leaderboard()
+leaderboard.start()
+keys = KeyRegistry()
+infinite_sessions = create_sessions(args.sessions)
+question_bank = questions.QuestionBank()
+question_bank.start()
+handlers = Handlers(leaderboard, infinite_sessions, question_bank)
 
-infinite_sessions = {}
 oauth = OAuth2Provider(app)
 
 talisman = Talisman(
-    app, content_security_policy={"default-src": "'self'"}, force_https=True
+    app, content_security_policy={"default-src": "'self'"},
+    force_https=not args.no_https_redirect,
 )
 
 
-def api_key_auth():
-    """Authenticate User"""
+# seconds between metrics written to the log file
+METRICS_INTERVAL = 60
+
+if args.logfile:
+    metrics.start_dump(METRICS_INTERVAL, log.info)
+
+
+@app.before_request
+def start_timer():
+    """Count the request as in flight and start timing it"""
+    g.start = time.perf_counter()
+    g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    metrics.requests_in_flight.inc()
+
+
+@app.after_request
+def record_request(response):
+    """Record how long the request took and how much was sent"""
+    # redirected to HTTPS before the timer started
+    if "start" not in g:
+        return response
+
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    duration = time.perf_counter() - g.start
+    metrics.observe_request(
+        route, request.method, response.status_code, duration,
+        request.content_length or 0, response.content_length or 0,
+    )
+
+    log.info("%s %s %s", request.method, route, response.status_code,
+             extra={"request_id": g.request_id, "user": g.get("user"),
+                    "method": request.method, "route": route,
+                    "status": response.status_code,
+                    "duration_ms": round(duration * 1000, 2)})
+    response.headers["X-Request-ID"] = g.request_id
+    return response
+
+
+@app.teardown_request
+def finish_request(error):
+    if "start" in g:
+        metrics.requests_in_flight.dec()
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Metrics in the Prometheus text format"""
+    return Response(metrics.render(),
+                    mimetype="text/plain; version=0.0.4")
+
+
+def api_key_auth() -> str:
+    """Authenticate User, giving back their name"""
     api_key = request.headers.get("X-API-Key")
-    if not api_key or api_key not in VALID_KEYS:
-        return jsonify({"error": "Unauthorized"}), 401
+    user = keys.lookup(api_key) if api_key else None
+    if user is None:
+        abort(make_response(jsonify({"error": "Unauthorized"}), 401))
+    g.user = user
+    return user
 
 
-@app.route("/signup", methods=["POST"])
-def register_client():
-    """User account sign up"""
-    data = request.get_json()
-
-    # check for all params
-    expected = ["name", "password", "team"]
-    if not (list(data) == expected):
-        return jsonify({"error":
-                        "Invalid request, missing expected parameter"}), 400
-
-    # check team selected is valid
-    teams = ["ngata", "rutherford", "britten", "blake", "cooper", "sheppard"]
-    if data["team"].lower() in teams:
-        team = {"team": data["team"].lower()}
-    else:
-        return jsonify({"error": "Invalid request, unexpected team"}), 400
+@app.errorhandler(hashing.Saturated)
+def hashing_saturated(error: hashing.Saturated):
+    """Too many sign ups or log ins at once, ask to come back shortly"""
+    response = jsonify({"error": "Server busy, try again shortly"})
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response, 503
 
-    # generate random API Key
-    api_key = str(uuid.uuid4())
-    new_client = data | {"api_key": api_key,
-                         "active_quizzes": {}, "points": 0} | team
-    message, access = auth.signUp(new_client)
-    if not access:
-        return jsonify({"error": message}), 400
 
-    # save API key and user
-    with open(API_KEYS_DIR, "r+") as f:
-        route = json.loads(f.read()) | {api_key: data["name"]}
-        f.seek(0)
-        f.write(json.dumps(route))
-        f.truncate()
+def preflight(status):
+    """Answer a CORS preflight for a POST route"""
+    response = jsonify({"status": status})
+    response.headers.add("Allow", "POST")
+    response.headers.add("Access-Control-Allow-Headers",
+                         "Content-Type, X-API-Key")
+    response.headers.add("Access-Control-Allow-Methods", "POST")
+    return response
 
-    global VALID_KEYS
-    VALID_KEYS |= {api_key: data["name"]}
-    return jsonify({"api_key": api_key}), 201
 
+def respond(result: (dict, int)):
+    """Send back what a handler gave"""
+    body, status = result
+    return jsonify(body), status
 
-@app.route("/login", methods=["POST"])
-def login_client():
-    """Log in client"""
-    data = request.get_json()
 
-    # check expected params
-    expected = ["name", "password"]
-    if not (list(data) == expected):
-        return jsonify({"error":
-                        "Invalid request, missing expected parameter"}), 400
+@app.route("/signup", methods=["POST"])
+def register_client():
+    """User account sign up"""
+    return respond(handlers.signup(request.get_json()))
 
-    # check password is correct
-    message, access = auth.login(data["name"], data["password"])
-    if not access:
-        print(message)
-        return jsonify({"error": message}), 400
 
-    # if given access, load user info
-    with open(Path(auth.PROFILES_DIR, data["name"] + ".json"), "r") as f:
-        api_key = json.loads(f.read())["api_key"]
-    return jsonify({"api_key": api_key}), 201
+@app.route("/login", methods=["POST"])
+def login_client():
+    """Log in client"""
+    return respond(handlers.login(request.get_json()))
 
 
 @app.route("/get_score", methods=["GET"])
 def get_score():
     """Give score"""
-    api_key_auth()
-    with open(
-        Path(auth.PROFILES_DIR,
-             VALID_KEYS[request.headers.get("X-API-Key")] + ".json"),
-        "r",
-    ) as f:
-        return jsonify({"score": json.loads(f.read())["points"]}), 201
+    return respond(handlers.get_score(api_key_auth()))
 
 
 @app.route("/render_leaderboard", methods=["GET"])
 def render_leaderboard():
     """Get Leaderboard"""
     api_key_auth()
-    with open(Path(auth.DEFAULT_DIR, "teams.json"), "r") as f:
-        leaderboard = json.loads(f.read())
-    return jsonify(data=leaderboard), 200
+    return respond(handlers.render_leaderboard())
 
 
 @app.route("/start_infinite_quiz", methods=["POST", "OPTIONS"])
 def start_infinite_quiz():
     """Start infinite quiz session"""
     if request.method == "OPTIONS":
-        response = jsonify({"status": 200})
-        response.headers.add("Allow", "POST")
-        response.headers.add("Access-Control-Allow-Headers",
-                             "Content-Type, X-API-Key")
-        response.headers.add("Access-Control-Allow-Methods", "POST")
-        return response
-
-    api_key_auth()
-    data = request.get_json()
-
-    # expected params
-    expected = ["questions", "lives"]
-    if not (list(data) == expected):
-        return jsonify({"error":
-                        "Invalid request, missing expected parameter"}), 400
-
-    global infinite_sessions
-    infinite_sessions[request.headers.get("X-API-Key")] = data
-    return jsonify({"status": "Infinite Quiz Ready"}), 200
+        return preflight(200)
+    user = api_key_auth()
+    return respond(handlers.start_infinite_quiz(user, request.get_json()))
 
 
 @app.route("/expand_infinite_quiz", methods=["POST", "OPTIONS"])
 def expand_infinite_quiz():
     """Expand the user's infinite quiz session"""
     if request.method == "OPTIONS":
-        response = jsonify({"status": "success"})
-        response.headers.add("Allow", "POST")
-        response.headers.add("Access-Control-Allow-Headers",
-                             "Content-Type, X-API-Key")
-        response.headers.add("Access-Control-Allow-Methods", "POST")
-        return response
-
-    api_key_auth()
-    data = request.get_json()
-    expected = ["questions"]
-    if not (list(data) == expected):
-        return jsonify({"error":
-                        "Invalid request, missing expected parameter"}), 400
-
-    global infinite_sessions
-    api_key = request.headers.get("X-API-Key")
-    # append the live session
-    infinite_sessions[api_key]["questions"].append(data)
-    return jsonify({"status": "Quiz Appended"}), 200
+        return preflight("success")
+    user = api_key_auth()
+    return respond(handlers.expand_infinite_quiz(user, request.get_json()))
 
 
 @app.route("/answer_infinite_quiz", methods=["POST", "OPTIONS"])
 def answer_infinite_quiz():
     """Answer an infinite gamemode question"""
     if request.method == "OPTIONS":
-        response = jsonify({"status": "success"})
-        response.headers.add("Allow", "POST")
-        response.headers.add("Access-Control-Allow-Headers",
-                             "Content-Type, X-API-Key")
-        response.headers.add("Access-Control-Allow-Methods", "POST")
-        return response
+        return preflight("success")
+    user = api_key_auth()
+    return respond(handlers.answer_infinite_quiz(user, request.get_json()))
 
-    api_key_auth()
-    data = request.get_json()
-    expected = ["selected"]
-    if not (list(data) == expected):
-        return jsonify({"error":
-                        "Invalid request, missing expected parameter"}), 400
 
-    api_key = request.headers.get("X-API-Key")
-    global infinite_sessions
-    question = infinite_sessions[api_key]["questions"][0]
-    user = VALID_KEYS[api_key]
-
-    # delete question
-    del infinite_sessions[api_key]["questions"][0]
-
-    # check if correct
-    if question["correct_answer"] == data["selected"]:
-        # if correct add score to user and their house team
-        with open(Path(auth.PROFILES_DIR, user + ".json"), "r+") as teams:
-            user_info = json.loads(teams.read())
-            user_info["points"] += 1
-
-            teams.seek(0)
-            teams.write(json.dumps(user_info))
-            teams.truncate()
-
-        with open(Path(auth.DEFAULT_DIR, "teams.json"), "r+") as teams:
-            team = json.loads(teams.read())
-            team[user_info["team"]]["points"] += 1
-
-            teams.seek(0)
-            teams.write(json.dumps(team))
-            teams.truncate()
-
-        return (
-            jsonify(
-                {
-                    "status": "Correct Answer",
-                    "lives": infinite_sessions[api_key]["lives"],
-                }
-            ),
-            200,
-        )
-
-    # if question is wrong, lose 1 life
-    infinite_sessions[api_key]["lives"] -= 1
-    return (
-        jsonify(
-            {"status": "Wrong Answer",
-             "lives": infinite_sessions[api_key]["lives"]}
-        ),
-        200,
-    )
+@app.route("/question/<int:question_id>", methods=["GET"])
+def get_question(question_id: int):
+    """Get a question from the bank, without its answer"""
+    return respond(handlers.get_question(api_key_auth(), question_id))
 
 
 @app.route("/start_quiz", methods=["POST", "OPTIONS"])
 def start_quiz():
     """Start traditional quiz"""
     if request.method == "OPTIONS":
-        response = jsonify({"status": 200})
-        response.headers.add("Allow", "POST")
-        response.headers.add("Access-Control-Allow-Headers",
-                             "Content-Type, X-API-Key")
-        response.headers.add("Access-Control-Allow-Methods", "POST")
-        return response
-
-    api_key_auth()
-    data = request.get_json()
-    expected = ["quiz_name", "quiz"]
-    if not (list(data) == expected):
-        return jsonify({"error":
-                        "Invalid request, missing expected parameter"}), 400
-
-    # save quiz session to a file
-    user = VALID_KEYS[request.headers.get("X-API-Key")]
-    with open(Path(auth.PROFILES_DIR, user + ".json"), "r+") as f:
-        route = json.loads(f.read())
-        route["active_quizzes"][data["quiz_name"]] = (data["quiz"]
-                                                      | {"index": 0})
-        if len(route["active_quizzes"]) > 5:
-            del route["active_quizzes"][0]
-
-        f.seek(0)
-        f.write(json.dumps(route))
-        f.truncate()
-
-    return jsonify({"status": "Competitive mode quiz successfully added"}), 200
+        return preflight(200)
+    user = api_key_auth()
+    return respond(handlers.start_quiz(user, request.get_json()))
 
 
 @app.route("/answer_quiz", methods=["POST", "OPTIONS"])
 def answer_quiz():
     """Answer quiz in traditional game mode"""
     if request.method == "OPTIONS":
-        response = jsonify({"status": "success"})
-        response.headers.add("Allow", "POST")
-        response.headers.add("Access-Control-Allow-Headers",
-                             "Content-Type, X-API-Key")
-        response.headers.add("Access-Control-Allow-Methods", "POST")
-        return response
-
-    api_key_auth()
-    data = request.get_json()
-    expected = ["quiz_name", "selected"]
-    if not (list(data) == expected):
-        return jsonify({"error":
-                        "Invalid request, missing expected parameter"}), 400
+        return preflight("success")
+    user = api_key_auth()
+    return respond(handlers.answer_quiz(user, request.get_json()))
 
-    # open up quiz
-    user = VALID_KEYS[request.headers.get("X-API-Key")]
-    with open(Path(auth.PROFILES_DIR, user + ".json"), "r+") as f:
-        route = json.loads(f.read())
-        question = route["active_quizzes"][data["quiz_name"]]
 
-        # check if correct
-        correct = question["results"][question["index"]]["correct_answer"]
-        if (correct == data["selected"]):
-            # if correct add a point to user and their house team
-            route["points"] += 1
-            with open(Path(auth.DEFAULT_DIR, "teams.json"), "r+") as teams:
-                team = json.loads(teams.read())
-                team[route["team"]]["points"] += 1
-
-                teams.seek(0)
-                teams.write(json.dumps(team))
-                teams.truncate()
-
-            route["active_quizzes"][data["quiz_name"]]["index"] += 1
-            f.seek(0)
-            f.write(json.dumps(route))
-            f.truncate()
-
-            return jsonify({"status": "Correct Answer"}), 200
-
-        route["active_quizzes"][data["quiz_name"]]["index"] += 1
-
-        f.seek(0)
-        f.write(json.dumps(route))
-        f.truncate()
-
-    # otherwise return wrong answer
-    return jsonify({"status": "Wrong Answer"}), 200
+@app.route("/answer_quiz_batch", methods=["POST", "OPTIONS"])
+def answer_quiz_batch():
+    """Answer several questions of a traditional quiz at once"""
+    if request.method == "OPTIONS":
+        return preflight("success")
+    user = api_key_auth()
+    return respond(handlers.answer_quiz_batch(user, request.get_json()))
 
 
 if __name__ == "__main__":
-    app.run()
+    if args.asgi:
+        from src import asgi
+
+        asgi.serve(asgi.create_app(leaderboard, keys, infinite_sessions,
+                                   question_bank,
+                                   force_https=not args.no_https_redirect),
+                   port=args.port)
+    else:
+        app.run(port=args.port)
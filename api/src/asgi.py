@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import time
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from quart import Quart, Response, g, request, jsonify, redirect
+from src import hashing
+from src import metrics
+from src.handlers import Handlers
+
+# threads for blocking database, session store and question bank calls
+IO_WORKERS = 16
+# threads waiting on the password hashing workers, kept off the I/O threads
+HASH_WORKERS = hashing.HASH_WORKERS + hashing.MAX_QUEUED
+
+log = logging.getLogger("quizzy.asgi")
+
+# the headers Talisman gives the Flask app
+SECURITY_HEADERS = {
+    "Content-Security-Policy": "default-src 'self'",
+    "Strict-Transport-Security": "max-age=31556926; includeSubDomains",
+    "X-Frame-Options": "SAMEORIGIN",
+    "X-Content-Type-Options": "nosniff",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+}
+
+
+class Unauthorized(Exception):
+    """Request had no valid API key"""
+
+
+def _preflight(status):
+    response = jsonify({"status": status})
+    response.headers.add("Allow", "POST")
+    response.headers.add("Access-Control-Allow-Headers",
+                         "Content-Type, X-API-Key")
+    response.headers.add("Access-Control-Allow-Methods", "POST")
+    return response
+
+
+def create_app(leaderboard, keys, infinite_sessions, question_bank,
+               force_https: bool = True) -> Quart:
+    """ASGI version of the API, the same routes as api.py
+
+            Parameters:
+                    leaderboard (Leaderboard): House leaderboard
+                    keys (KeyRegistry): API keys of logged in users
+                    infinite_sessions: Infinite quiz session store
+                    question_bank (QuestionBank): Infinite quiz questions
+                    force_https (bool): Redirect plain HTTP to HTTPS
+    """
+    app = Quart(__name__)
+    app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", os.urandom(24))
+    # keep the leaderboard in the order it was sorted
+    app.json.sort_keys = False
+
+    handlers = Handlers(leaderboard, infinite_sessions, question_bank)
+    io_pool = ThreadPoolExecutor(IO_WORKERS, thread_name_prefix="io")
+    hash_pool = ThreadPoolExecutor(HASH_WORKERS, thread_name_prefix="hash")
+
+    async def run(function, *args, pool=io_pool):
+        """Run a blocking call on a thread pool without blocking the loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, partial(function, *args))
+
+    async def api_key_auth() -> str:
+        """Authenticate User, giving back their name"""
+        api_key = request.headers.get("X-API-Key")
+        user = await run(keys.lookup, api_key) if api_key else None
+        if user is None:
+            raise Unauthorized()
+        g.user = user
+        return user
+
+    @app.errorhandler(Unauthorized)
+    async def unauthorized(error):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    @app.errorhandler(hashing.Saturated)
+    async def hashing_saturated(error: hashing.Saturated):
+        response = jsonify({"error": "Server busy, try again shortly"})
+        response.headers["Retry-After"] = str(error.retry_after)
+        return response, 503
+
+    @app.before_request
+    async def https_redirect():
+        if not force_https or request.is_secure:
+            return None
+        if request.headers.get("X-Forwarded-Proto", "") == "https":
+            return None
+        return redirect(request.url.replace("http://", "https://", 1))
+
+    @app.before_request
+    async def start_timer():
+        g.start = time.perf_counter()
+        g.request_id = (request.headers.get("X-Request-ID")
+                        or uuid.uuid4().hex)
+        metrics.requests_in_flight.inc()
+
+    @app.after_request
+    async def record_request(response):
+        # redirected to HTTPS before the timer started
+        if "start" not in g:
+            return response
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        duration = time.perf_counter() - g.start
+        metrics.observe_request(
+            route, request.method, response.status_code, duration,
+            request.content_length or 0, response.content_length or 0,
+        )
+
+        log.info("%s %s %s", request.method, route, response.status_code,
+                 extra={"request_id": g.request_id, "user": g.get("user"),
+                        "method": request.method, "route": route,
+                        "status": response.status_code,
+                        "duration_ms": round(duration * 1000, 2)})
+        response.headers["X-Request-ID"] = g.request_id
+        return response
+
+    @app.teardown_request
+    async def finish_request(error):
+        if "start" in g:
+            metrics.requests_in_flight.dec()
+
+    @app.after_request
+    async def add_headers(response):
+        # CORS for any origin and Talisman's security headers
+        response.headers.setdefault("Access-Control-Allow-Origin", "*")
+        for header, value in SECURITY_HEADERS.items():
+            response.headers.setdefault(header, value)
+        return response
+
+    @app.after_serving
+    async def shutdown():
+        io_pool.shutdown(wait=False)
+        hash_pool.shutdown(wait=False)
+
+    @app.route("/metrics", methods=["GET"])
+    async def get_metrics():
+        """Metrics in the Prometheus text format"""
+        return Response(metrics.render(),
+                        mimetype="text/plain; version=0.0.4")
+
+    async def respond(handler, *args, pool=io_pool):
+        """Run a handler off the event loop and send back what it gave"""
+        body, status = await run(handler, *args, pool=pool)
+        return jsonify(body), status
+
+    @app.route("/signup", methods=["POST"])
+    async def register_client():
+        """User account sign up"""
+        return await respond(handlers.signup, await request.get_json(),
+                             pool=hash_pool)
+
+    @app.route("/login", methods=["POST"])
+    async def login_client():
+        """Log in client"""
+        return await respond(handlers.login, await request.get_json(),
+                             pool=hash_pool)
+
+    @app.route("/get_score", methods=["GET"])
+    async def get_score():
+        """Give score"""
+        return await respond(handlers.get_score, await api_key_auth())
+
+    @app.route("/render_leaderboard", methods=["GET"])
+    async def render_leaderboard():
+        """Get Leaderboard"""
+        await api_key_auth()
+        body, status = handlers.render_leaderboard()
+        return jsonify(body), status
+
+    @app.route("/start_infinite_quiz", methods=["POST", "OPTIONS"])
+    async def start_infinite_quiz():
+        """Start infinite quiz session"""
+        if request.method == "OPTIONS":
+            return _preflight(200)
+        return await respond(handlers.start_infinite_quiz,
+                             await api_key_auth(), await request.get_json())
+
+    @app.route("/expand_infinite_quiz", methods=["POST", "OPTIONS"])
+    async def expand_infinite_quiz():
+        """Expand the user's infinite quiz session"""
+        if request.method == "OPTIONS":
+            return _preflight("success")
+        return await respond(handlers.expand_infinite_quiz,
+                             await api_key_auth(), await request.get_json())
+
+    @app.route("/answer_infinite_quiz", methods=["POST", "OPTIONS"])
+    async def answer_infinite_quiz():
+        """Answer an infinite gamemode question"""
+        if request.method == "OPTIONS":
+            return _preflight("success")
+        return await respond(handlers.answer_infinite_quiz,
+                             await api_key_auth(), await request.get_json())
+
+    @app.route("/question/<int:question_id>", methods=["GET"])
+    async def get_question(question_id: int):
+        """Get a question from the bank, without its answer"""
+        return await respond(handlers.get_question, await api_key_auth(),
+                             question_id)
+
+    @app.route("/start_quiz", methods=["POST", "OPTIONS"])
+    async def start_quiz():
+        """Start traditional quiz"""
+        if request.method == "OPTIONS":
+            return _preflight(200)
+        return await respond(handlers.start_quiz,
+                             await api_key_auth(), await request.get_json())
+
+    @app.route("/answer_quiz", methods=["POST", "OPTIONS"])
+    async def answer_quiz():
+        """Answer quiz in traditional game mode"""
+        if request.method == "OPTIONS":
+            return _preflight("success")
+        return await respond(handlers.answer_quiz,
+                             await api_key_auth(), await request.get_json())
+
+    @app.route("/answer_quiz_batch", methods=["POST", "OPTIONS"])
+    async def answer_quiz_batch():
+        """Answer several questions of a traditional quiz at once"""
+        if request.method == "OPTIONS":
+            return _preflight("success")
+        return await respond(handlers.answer_quiz_batch,
+                             await api_key_auth(), await request.get_json())
+
+    return app
+
+
+def serve(app: Quart, host: str = "127.0.0.1", port: int = 5000) -> None:
+    """Run the ASGI app on hypercorn"""
+    from hypercorn.asyncio import serve as hypercorn_serve
+    from hypercorn.config import Config
+
+    config = Config()
+    config.bind = [f"{host}:{port}"]
+    asyncio.run(hypercorn_serve(app, config))
@@ -0,0 +1,450 @@
+from collections import OrderedDict
+from pathlib import Path
+import threading
+import hashlib
+import sqlite3
+import time
+import json
+import os
+from src import metrics
+from src import normalize
+from src import shuffle
+
+DEFAULT_DIR = Path(__file__).parent
+# somewhere else, such as a throwaway database for bench/
+DATABASE_DIR = Path(os.environ.get("QUIZZY_DB",
+                                   Path(DEFAULT_DIR, "quizzy.db")))
+
+# number of competitive quizzes a user may have in progress at once,
+# the least recently used is dropped past this
+MAX_ACTIVE_QUIZZES = 5
+# number of API keys a user may hold at once, a login past this drops
+# their oldest so logged in devices beyond the newest few are logged out
+MAX_API_KEYS = 5
+# decoded quiz packs kept in memory, packs never change once stored
+PACK_CACHE_SIZE = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    name TEXT PRIMARY KEY,
+    password TEXT NOT NULL,
+    team TEXT NOT NULL,
+    points INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS api_keys (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key_hash TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL REFERENCES users(name)
+);
+CREATE INDEX IF NOT EXISTS api_keys_name ON api_keys(name);
+CREATE TABLE IF NOT EXISTS quiz_packs (
+    hash TEXT PRIMARY KEY,
+    quiz TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS active_quizzes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL REFERENCES users(name),
+    quiz_name TEXT NOT NULL,
+    pack TEXT NOT NULL REFERENCES quiz_packs(hash),
+    question_index INTEGER NOT NULL DEFAULT 0,
+    last_used REAL NOT NULL,
+    seed INTEGER NOT NULL DEFAULT 0,
+    answer_key BLOB NOT NULL DEFAULT x'',
+    UNIQUE (name, quiz_name)
+);
+CREATE INDEX IF NOT EXISTS active_quizzes_pack ON active_quizzes(pack);
+CREATE TABLE IF NOT EXISTS team_points (
+    team TEXT PRIMARY KEY,
+    points INTEGER NOT NULL DEFAULT 0,
+    colour TEXT NOT NULL
+);
+"""
+
+_local = threading.local()
+_packs = OrderedDict()
+_packs_lock = threading.Lock()
+
+
+def connect() -> sqlite3.Connection:
+    """Get this thread's connection to the database"""
+    connection = getattr(_local, "connection", None)
+    if connection is None:
+        # autocommit mode, transactions are opened explicitly
+        connection = sqlite3.connect(DATABASE_DIR, timeout=30,
+                                     isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        _local.connection = connection
+    return connection
+
+
+def begin(db: sqlite3.Connection) -> None:
+    """Open a write transaction, timing the wait for SQLite's write lock"""
+    start = time.perf_counter()
+    db.execute("BEGIN IMMEDIATE")
+    metrics.lock_wait.observe(time.perf_counter() - start, "database")
+
+
+def init_db() -> None:
+    """Create the tables and seed the house teams"""
+    db = connect()
+    _hash_api_keys(db)
+    _share_quiz_packs(db)
+    db.executescript(SCHEMA)
+    _add_answer_keys(db)
+    _prune_api_keys(db)
+
+    with open(Path(DEFAULT_DIR, "teams.json"), "r") as f:
+        teams = json.loads(f.read())
+
+    # only seed teams which don't exist yet so points are kept
+    db.executemany(
+        "INSERT OR IGNORE INTO team_points (team, points, colour) "
+        "VALUES (?, ?, ?)",
+        [(team, info["points"], info["colour"])
+         for team, info in teams.items()],
+    )
+
+
+def _create_tables(db: sqlite3.Connection, *tables: str) -> None:
+    """Create only the given tables and their indexes, other tables may
+    still be waiting on their own upgrade"""
+    for statement in SCHEMA.split(";"):
+        if any(f"EXISTS {table} (" in statement
+               or f"ON {table}(" in statement for table in tables):
+            db.execute(statement)
+
+
+def _hash_api_keys(db: sqlite3.Connection) -> None:
+    """Replace plain API keys from older databases with their hashes"""
+    columns = [row["name"] for row in
+               db.execute("PRAGMA table_info(api_keys)").fetchall()]
+    if "api_key" not in columns:
+        return
+
+    from src.keys import hash_key
+    rows = db.execute("SELECT api_key, name FROM api_keys").fetchall()
+    begin(db)
+    db.execute("DROP TABLE api_keys")
+    _create_tables(db, "api_keys")
+    db.executemany("INSERT INTO api_keys (key_hash, name) VALUES (?, ?)",
+                   [(hash_key(row["api_key"]), row["name"]) for row in rows])
+    db.execute("COMMIT")
+
+
+def _share_quiz_packs(db: sqlite3.Connection) -> None:
+    """Move quizzes saved whole in each active quiz into shared packs"""
+    columns = [row["name"] for row in
+               db.execute("PRAGMA table_info(active_quizzes)").fetchall()]
+    if "quiz" not in columns:
+        return
+
+    rows = db.execute("SELECT name, quiz_name, quiz, question_index "
+                      "FROM active_quizzes ORDER BY id").fetchall()
+    begin(db)
+    db.execute("DROP TABLE active_quizzes")
+    _create_tables(db, "quiz_packs", "active_quizzes")
+    now = time.time()
+    for row in rows:
+        pack = _store_pack(db, json.loads(row["quiz"]))
+        db.execute(
+            "INSERT INTO active_quizzes "
+            "(name, quiz_name, pack, question_index, last_used) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (row["name"], row["quiz_name"], pack, row["question_index"], now),
+        )
+    db.execute("COMMIT")
+
+
+def _add_answer_keys(db: sqlite3.Connection) -> None:
+    """Give active quizzes from older databases a seed and answer key"""
+    columns = [row["name"] for row in
+               db.execute("PRAGMA table_info(active_quizzes)").fetchall()]
+    # quizzes started before keep being graded by the answer's text
+    if "seed" not in columns:
+        db.execute("ALTER TABLE active_quizzes "
+                   "ADD COLUMN seed INTEGER NOT NULL DEFAULT 0")
+    if "answer_key" not in columns:
+        db.execute("ALTER TABLE active_quizzes "
+                   "ADD COLUMN answer_key BLOB NOT NULL DEFAULT x''")
+
+
+def _prune_api_keys(db: sqlite3.Connection) -> None:
+    """Drop keys past the limit handed out before there was one"""
+    db.execute(
+        "DELETE FROM api_keys WHERE id NOT IN "
+        "(SELECT id FROM api_keys AS newer WHERE newer.name = api_keys.name "
+        "ORDER BY id DESC LIMIT ?)",
+        (MAX_API_KEYS,),
+    )
+
+
+def add_user(name: str, password: str, team: str, key_hash: str) -> bool:
+    """Add a new user and their API key, False if the name is taken"""
+    db = connect()
+    try:
+        begin(db)
+        db.execute("INSERT INTO users (name, password, team) VALUES (?, ?, ?)",
+                   (name, password, team))
+        db.execute("INSERT INTO api_keys (key_hash, name) VALUES (?, ?)",
+                   (key_hash, name))
+        db.execute("COMMIT")
+    except sqlite3.IntegrityError:
+        db.execute("ROLLBACK")
+        return False
+    return True
+
+
+def get_user(name: str) -> dict | None:
+    """Get a user's profile"""
+    row = connect().execute("SELECT * FROM users WHERE name = ?",
+                            (name,)).fetchone()
+    return dict(row) if row else None
+
+
+def add_key(key_hash: str, name: str) -> None:
+    """Give a user another API key, dropping their oldest past the limit"""
+    db = connect()
+    begin(db)
+    db.execute("INSERT INTO api_keys (key_hash, name) VALUES (?, ?)",
+               (key_hash, name))
+    db.execute(
+        "DELETE FROM api_keys WHERE name = ? AND id NOT IN "
+        "(SELECT id FROM api_keys WHERE name = ? ORDER BY id DESC LIMIT ?)",
+        (name, name, MAX_API_KEYS),
+    )
+    db.execute("COMMIT")
+
+
+def get_keys_since(last_id: int) -> list:
+    """Get the API keys added after the given row, oldest first"""
+    return connect().execute(
+        "SELECT id, key_hash, name FROM api_keys WHERE id > ? ORDER BY id",
+        (last_id,),
+    ).fetchall()
+
+
+def get_points(name: str) -> int:
+    """Get a user's points"""
+    row = connect().execute("SELECT points FROM users WHERE name = ?",
+                            (name,)).fetchone()
+    return row["points"] if row else 0
+
+
+def add_points(name: str, points: int = 1) -> str | None:
+    """Add points to a user, giving back their house team"""
+    row = connect().execute(
+        "UPDATE users SET points = points + ? WHERE name = ? RETURNING team",
+        (points, name),
+    ).fetchone()
+    return row["team"] if row else None
+
+
+def add_team_points(points: dict) -> None:
+    """Add points to several house teams in one transaction"""
+    db = connect()
+    begin(db)
+    db.executemany("UPDATE team_points SET points = points + ? WHERE team = ?",
+                   [(value, team) for team, value in points.items()])
+    db.execute("COMMIT")
+
+
+def get_teams() -> dict:
+    """Get every house team's points and colour"""
+    rows = connect().execute("SELECT * FROM team_points").fetchall()
+    return {row["team"]: {"points": row["points"], "colour": row["colour"]}
+            for row in rows}
+
+
+def _store_pack(db: sqlite3.Connection, quiz: dict) -> str:
+    """Save a quiz pack once by its content, giving back its hash"""
+    text = json.dumps(quiz, sort_keys=True, separators=(",", ":"))
+    pack = hashlib.sha256(text.encode()).hexdigest()
+    inserted = db.execute(
+        "INSERT OR IGNORE INTO quiz_packs (hash, quiz) VALUES (?, ?)",
+        (pack, text),
+    ).rowcount
+    if inserted:
+        metrics.database_bytes.inc(len(text), "quiz_packs", "written")
+    return pack
+
+
+def _load_pack(db: sqlite3.Connection, pack: str) -> list:
+    """Get the questions of a quiz pack, decoding it at most once"""
+    with _packs_lock:
+        results = _packs.get(pack)
+        if results is not None:
+            _packs.move_to_end(pack)
+            return results
+
+    row = db.execute("SELECT quiz FROM quiz_packs WHERE hash = ?",
+                     (pack,)).fetchone()
+    results = metrics.decode("quiz_packs", row["quiz"])["results"]
+    with _packs_lock:
+        _packs[pack] = results
+        while len(_packs) > PACK_CACHE_SIZE:
+            _packs.popitem(last=False)
+    return results
+
+
+def _drop_packs(db: sqlite3.Connection, packs: set) -> None:
+    """Delete the given quiz packs if no active quiz still uses them"""
+    db.executemany(
+        "DELETE FROM quiz_packs WHERE hash = ? AND NOT EXISTS "
+        "(SELECT 1 FROM active_quizzes WHERE pack = ?)",
+        [(pack, pack) for pack in packs],
+    )
+
+
+def _use_quiz(db: sqlite3.Connection, name: str,
+              quiz_name: str) -> sqlite3.Row | None:
+    """Get a user's place in a quiz, marking it as the most recently used"""
+    return db.execute(
+        "UPDATE active_quizzes SET last_used = ? "
+        "WHERE name = ? AND quiz_name = ? "
+        "RETURNING id, pack, question_index, answer_key",
+        (time.time(), name, quiz_name),
+    ).fetchone()
+
+
+def start_quiz(name: str, quiz_name: str, quiz: dict) -> int:
+    """Save a competitive quiz, dropping the least recently used past the
+    limit, giving back the seed its answers are shown in order by"""
+    # older clients send the text as OpenTDB escaped it
+    quiz = normalize.canonical_quiz(quiz)
+    # where each correct answer is shown, worked out once for grading
+    seed = shuffle.new_seed()
+    key = shuffle.answer_key(seed, quiz["results"])
+    db = connect()
+    begin(db)
+    pack = _store_pack(db, quiz)
+    dropped = {row["pack"] for row in db.execute(
+        "DELETE FROM active_quizzes WHERE name = ? AND quiz_name = ? "
+        "RETURNING pack",
+        (name, quiz_name),
+    ).fetchall()}
+    db.execute(
+        "INSERT INTO active_quizzes "
+        "(name, quiz_name, pack, last_used, seed, answer_key) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (name, quiz_name, pack, time.time(), seed, key),
+    )
+    dropped.update(row["pack"] for row in db.execute(
+        "DELETE FROM active_quizzes WHERE name = ? AND id NOT IN "
+        "(SELECT id FROM active_quizzes WHERE name = ? "
+        "ORDER BY last_used DESC, id DESC LIMIT ?) RETURNING pack",
+        (name, name, MAX_ACTIVE_QUIZZES),
+    ).fetchall())
+    _drop_packs(db, dropped - {pack})
+    db.execute("COMMIT")
+    return seed
+
+
+class QuizFinished(Exception):
+    """Every question of a quiz has been answered already"""
+
+
+def answer_question(name: str, quiz_name: str,
+                    selected) -> (bool, str | None) or None:
+    """Grade the answer to the current question of a quiz, moving onto the
+    next one and adding the point in one transaction, giving back whether
+    it was correct and the user's house team if so
+
+            Parameters:
+                    name (str): The user
+                    quiz_name (str): The quiz being answered
+                    selected (str | int): The answer's text or where it
+                            was shown
+    """
+    db = connect()
+    begin(db)
+    row = _use_quiz(db, name, quiz_name)
+    if row is None:
+        db.execute("ROLLBACK")
+        return None
+
+    # an answer sent as an index is graded from the key alone
+    index = row["question_index"]
+    key = row["answer_key"]
+    results = None
+    if not key or not shuffle.is_index(selected):
+        results = _load_pack(db, row["pack"])
+    if index >= (len(key) if results is None else len(results)):
+        db.execute("ROLLBACK")
+        raise QuizFinished()
+
+    if shuffle.is_index(selected):
+        correct = index < len(key) and selected == key[index]
+    else:
+        correct = normalize.matches(results[index]["correct_answer"],
+                                    selected)
+
+    db.execute("UPDATE active_quizzes SET question_index = question_index + 1 "
+               "WHERE id = ?", (row["id"],))
+    team = None
+    if correct:
+        team = db.execute(
+            "UPDATE users SET points = points + 1 WHERE name = ? "
+            "RETURNING team",
+            (name,),
+        ).fetchone()["team"]
+    db.execute("COMMIT")
+    return correct, team
+
+
+def answer_questions(name: str, quiz_name: str, answers: list,
+                     start: int = None) -> (list, str) or None:
+    """Grade the next answers of a quiz, adding the points once
+
+            Parameters:
+                    name (str): The user
+                    quiz_name (str): The quiz being answered
+                    answers (list): Selected answers in order, each its
+                            text or where it was shown
+                    start (int): Place in the quiz of the first answer,
+                            the current question if not given
+    """
+    db = connect()
+    begin(db)
+    row = _use_quiz(db, name, quiz_name)
+    current = row["question_index"] if row else 0
+    # answers for questions before these are missing
+    if row is None or (start is not None and start > current):
+        db.execute("ROLLBACK")
+        return None
+
+    # a batch sent again after its reply was lost, only the answers not
+    # graded already count
+    if start is not None:
+        answers = answers[current - start:]
+
+    # answers sent as indices are graded from the key alone, the pack is
+    # only decoded when some are sent as text
+    key = row["answer_key"]
+    results = None
+    if not key or not all(map(shuffle.is_index, answers)):
+        results = _load_pack(db, row["pack"])
+    if current + len(answers) > (len(key) if results is None
+                                 else len(results)):
+        db.execute("ROLLBACK")
+        return None
+
+    # grade every answer in one pass
+    correct = []
+    for position, selected in enumerate(answers, current):
+        if shuffle.is_index(selected):
+            correct.append(position < len(key) and selected == key[position])
+        else:
+            correct.append(normalize.matches(
+                results[position]["correct_answer"], selected))
+
+    db.execute("UPDATE active_quizzes SET question_index = question_index + ? "
+               "WHERE id = ?", (len(answers), row["id"]))
+    team = db.execute(
+        "UPDATE users SET points = points + ? WHERE name = ? RETURNING team",
+        (sum(correct), name),
+    ).fetchone()["team"]
+    db.execute("COMMIT")
+    return correct, team
@@ -0,0 +1,283 @@
+# what every route does once the request has been read, shared by the
+# Flask app in api.py and the ASGI app so the two can't drift apart
+import logging
+import uuid
+import src.server as auth
+from src import database
+from src import questions
+from src import normalize
+from src import shuffle
+
+log = logging.getLogger(__name__)
+
+TEAMS = ["ngata", "rutherford", "britten", "blake", "cooper", "sheppard"]
+
+# questions handed out each time an infinite quiz starts or expands
+INFINITE_BATCH = 20
+
+INVALID = {"error": "Invalid request, missing expected parameter"}
+NO_SESSION = {"error": "Invalid request, no live session"}
+
+
+def expect(data, expected: list) -> bool:
+    """Request JSON has exactly the expected parameters, in order"""
+    return isinstance(data, dict) and list(data) == expected
+
+
+class Handlers:
+    """Route bodies, each giving back the JSON to send and its status"""
+
+    def __init__(self, leaderboard, infinite_sessions,
+                 question_bank) -> None:
+        self.leaderboard = leaderboard
+        self.infinite_sessions = infinite_sessions
+        self.question_bank = question_bank
+
+    def signup(self, data) -> (dict, int):
+        """User account sign up"""
+        # check for all params
+        if not expect(data, ["name", "password", "team"]):
+            return INVALID, 400
+
+        # check team selected is valid
+        if data["team"].lower() not in TEAMS:
+            return {"error": "Invalid request, unexpected team"}, 400
+
+        # generate random API Key
+        api_key = str(uuid.uuid4())
+        new_client = data | {"api_key": api_key,
+                             "team": data["team"].lower()}
+        message, access = auth.signUp(new_client)
+        if not access:
+            return {"error": message}, 400
+
+        return {"api_key": api_key}, 201
+
+    def login(self, data) -> (dict, int):
+        """Log in client"""
+        # check expected params
+        if not expect(data, ["name", "password"]):
+            return INVALID, 400
+
+        # check password is correct
+        message, access = auth.login(data["name"], data["password"])
+        if not access:
+            log.info("Log in failed for %s: %s", data["name"], message)
+            return {"error": message}, 400
+
+        # if given access, give back their api key
+        return {"api_key": access}, 201
+
+    def get_score(self, user: str) -> (dict, int):
+        """Give score"""
+        return {"score": database.get_points(user)}, 201
+
+    def render_leaderboard(self) -> (dict, int):
+        """Get Leaderboard"""
+        return {"data": self.leaderboard.render()}, 200
+
+    def start_infinite_quiz(self, user: str, data) -> (dict, int):
+        """Start infinite quiz session"""
+        # expected params
+        if not expect(data, ["category", "difficulty", "type", "lives"]):
+            return INVALID, 400
+
+        if (data["category"] not in questions.CATEGORIES
+                or data["difficulty"] not in questions.DIFFICULTIES
+                or data["type"] not in questions.TYPES
+                or not isinstance(data["lives"], int) or data["lives"] < 1):
+            return {"error": "Invalid request, unexpected quiz"}, 400
+
+        # hand out questions from the bank, only their ids are kept with
+        # where their answers are shown for the session's seed, which never
+        # leaves the server
+        seed = shuffle.new_seed()
+        session_id = uuid.uuid4().hex
+        drawn = self.question_bank.draw(data["category"], data["difficulty"],
+                                        data["type"], INFINITE_BATCH, seed)
+        if not drawn:
+            return {"error": "No questions available"}, 503
+
+        ids = [question["id"] for question in drawn]
+        self.infinite_sessions.set(user, {
+            "quiz": [data["category"], data["difficulty"], data["type"]],
+            "questions": ids,
+            "answers": self.question_bank.answer_key(seed, ids),
+            "seed": seed,
+            "session": session_id,
+            "lives": data["lives"],
+        })
+        return {"status": "Infinite Quiz Ready", "session": session_id,
+                "questions": drawn}, 200
+
+    def expand_infinite_quiz(self, user: str, data) -> (dict, int):
+        """Expand the user's infinite quiz session"""
+        # older clients don't say which session they are expanding
+        if not (expect(data, []) or expect(data, ["session"])):
+            return INVALID, 400
+
+        session = self.infinite_sessions.get(user)
+        if session is None:
+            return NO_SESSION, 400
+
+        # a refill asked for by a session that has since been replaced
+        session_id = session.get("session")
+        if data.get("session", session_id) != session_id:
+            return NO_SESSION, 400
+
+        # draw more questions from the same pool, shown by the same seed
+        seed = session.get("seed")
+        drawn = self.question_bank.draw(*session["quiz"], INFINITE_BATCH,
+                                        seed)
+        ids = [question["id"] for question in drawn]
+        key = []
+        if seed is not None:
+            key = self.question_bank.answer_key(seed, ids)
+
+        def expand(session: dict) -> bool:
+            # append to the live session, unless replaced since
+            if (session.get("session"), session.get("seed")) != (
+                    session_id, seed):
+                return False
+            session["questions"].extend(ids)
+            if "answers" in session:
+                session["answers"].extend(key)
+            return True
+
+        if not self.infinite_sessions.update(user, expand):
+            return NO_SESSION, 400
+        return {"status": "Quiz Appended", "questions": drawn}, 200
+
+    def answer_infinite_quiz(self, user: str, data) -> (dict, int):
+        """Answer an infinite gamemode question"""
+        # older clients send the answer alone
+        if expect(data, ["selected"]):
+            data = {"id": None} | data
+        elif not expect(data, ["id", "selected"]):
+            return INVALID, 400
+
+        def answer(session: dict) -> (bool, int):
+            # an answer to a question other than the one asked next
+            if data["id"] is not None and (
+                    session["questions"][:1] != [data["id"]]):
+                return None, session["lives"]
+
+            # take the question off and check if correct, by where the
+            # answer was shown if sent as an index
+            question_id = session["questions"].pop(0)
+            index = (session["answers"].pop(0) if "answers" in session
+                     else None)
+            if shuffle.is_index(data["selected"]):
+                correct = data["selected"] == index
+            else:
+                question = self.question_bank.get(question_id)
+                correct = normalize.matches(question["correct_answer"],
+                                            data["selected"])
+
+            # if question is wrong, lose 1 life
+            if not correct:
+                session["lives"] -= 1
+            return correct, session["lives"]
+
+        try:
+            result = self.infinite_sessions.update(user, answer)
+        except IndexError:
+            result = None
+        if result is None:
+            return NO_SESSION, 400
+
+        correct, lives = result
+        if correct is None:
+            return {"error": "Invalid request, not the current question"}, 400
+
+        # the session is over once out of lives
+        if lives <= 0:
+            self.infinite_sessions.delete(user)
+
+        if correct:
+            # if correct add score to user and their house team
+            self.leaderboard.add(database.add_points(user))
+            return {"status": "Correct Answer", "lives": lives}, 200
+
+        return {"status": "Wrong Answer", "lives": lives}, 200
+
+    def get_question(self, user: str, question_id: int) -> (dict, int):
+        """Get a question from the bank, without its answer"""
+        question = self.question_bank.get(question_id)
+        if question is None:
+            return {"error": "Question does not exist"}, 404
+
+        # answers in the order the user's infinite quiz shows them, so an
+        # index sent back for it is graded against the same order
+        session = self.infinite_sessions.get(user) or {}
+        return questions.public(question_id, question,
+                                session.get("seed")), 200
+
+    def start_quiz(self, user: str, data) -> (dict, int):
+        """Start traditional quiz"""
+        if not expect(data, ["quiz_name", "quiz"]):
+            return INVALID, 400
+
+        # save quiz session to the database
+        try:
+            seed = database.start_quiz(user, data["quiz_name"], data["quiz"])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return {"error": "Invalid request, unexpected quiz"}, 400
+
+        # answers are shown in an order worked out from the seed
+        return {"status": "Competitive mode quiz successfully added",
+                "seed": seed}, 200
+
+    def answer_quiz(self, user: str, data) -> (dict, int):
+        """Answer quiz in traditional game mode"""
+        if not expect(data, ["quiz_name", "selected"]):
+            return INVALID, 400
+
+        # grade the current question, by where the answer was shown if
+        # sent as an index, and move onto the next one
+        try:
+            graded = database.answer_question(user, data["quiz_name"],
+                                              data["selected"])
+        except database.QuizFinished:
+            return {"error": "Invalid request, every question of the quiz "
+                    "has been answered"}, 400
+        if graded is None:
+            return {"error": "Invalid request, quiz not started"}, 400
+
+        correct, team = graded
+        if correct:
+            # the user's point was added with the answer, now their team's
+            self.leaderboard.add(team)
+            return {"status": "Correct Answer"}, 200
+
+        # otherwise return wrong answer
+        return {"status": "Wrong Answer"}, 200
+
+    def answer_quiz_batch(self, user: str, data) -> (dict, int):
+        """Answer several questions of a traditional quiz at once"""
+        # older clients leave out where the batch starts
+        if expect(data, ["quiz_name", "answers"]):
+            data = data | {"start": None}
+        elif (not expect(data, ["quiz_name", "start", "answers"])
+                or not shuffle.is_index(data["start"])
+                or data["start"] < 0):
+            return INVALID, 400
+        if not isinstance(data["answers"], list):
+            return INVALID, 400
+
+        # grade the answers in order from where the batch starts
+        graded = database.answer_questions(user, data["quiz_name"],
+                                           data["answers"], data["start"])
+        if graded is None:
+            return {"error": "Invalid request, quiz not started, answers "
+                    "missing or more answers than questions"}, 400
+
+        # the user's points were added with the answers, now their team's
+        correct, team = graded
+        if sum(correct):
+            self.leaderboard.add(team, sum(correct))
+
+        results = ["Correct Answer" if i else "Wrong Answer"
+                   for i in correct]
+        return {"status": "Answers Graded",
+                "results": results, "points": sum(correct)}, 200
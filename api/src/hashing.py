@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from hashlib import sha256
+import multiprocessing
+import threading
+import hmac
+import math
+import time
+import os
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# processes hashing passwords at once
+HASH_WORKERS = os.cpu_count() or 2
+# hashes allowed to wait for a worker before turning people away
+MAX_QUEUED = 64
+# seconds a checked password is trusted for without hashing again
+VERIFIED_FOR = 5 * 60
+# most logins remembered at once
+MAX_VERIFIED = 10000
+
+
+class Saturated(Exception):
+    """Too many passwords are waiting to be hashed"""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Too many passwords waiting to be hashed")
+        self.retry_after = retry_after
+
+
+class HashPool:
+    """Bounded pool of processes hashing passwords off the request thread"""
+
+    def __init__(self, workers: int = HASH_WORKERS,
+                 max_queued: int = MAX_QUEUED) -> None:
+        self.workers = workers
+        self.limit = workers + max_queued
+        self.lock = threading.Lock()
+        self.pending = 0
+        # rolling average of how long a hash took to come back, waiting
+        # in the queue included, for Retry-After
+        self.average = 0.1
+        self.executor = None
+
+    def start(self) -> None:
+        """Start the workers, before any other threads are running"""
+        if self.workers <= 0 or self.executor is not None:
+            return
+        if "fork" in multiprocessing.get_all_start_methods():
+            # forked workers skip re-importing api.py, all the workers
+            # are forked on the first task so do it now
+            self.executor = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context("fork"))
+            self.executor.submit(int).result()
+        else:
+            # hashlib lets go of the GIL while hashing so threads still help
+            self.executor = ThreadPoolExecutor(self.workers,
+                                               thread_name_prefix="hash")
+
+    def stop(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def generate(self, password: str) -> str:
+        """Hash a new password"""
+        return self._run(generate_password_hash, password)
+
+    def check(self, password_hash: str, password: str) -> bool:
+        """Check a password against its hash"""
+        return self._run(check_password_hash, password_hash, password)
+
+    def _run(self, function, *args):
+        # no workers, hash on the calling thread
+        if self.executor is None:
+            return function(*args)
+
+        with self.lock:
+            if self.pending >= self.limit:
+                raise Saturated(max(1, math.ceil(self.average)))
+            self.pending += 1
+
+        start = time.monotonic()
+        try:
+            return self.executor.submit(function, *args).result()
+        finally:
+            elapsed = time.monotonic() - start
+            with self.lock:
+                self.pending -= 1
+                self.average = 0.9 * self.average + 0.1 * elapsed
+
+
+class VerifiedLogins:
+    """Passwords checked recently, so logging in again skips the hash
+
+    Only a keyed digest of the name, password and stored hash is kept,
+    which stops matching as soon as the password is changed.
+    """
+
+    def __init__(self, ttl: float = VERIFIED_FOR,
+                 max_entries: int = MAX_VERIFIED) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.secret = os.urandom(32)
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def _digest(self, name: str, password: str, password_hash: str) -> bytes:
+        message = "\0".join([name, password, password_hash]).encode("utf-8")
+        return hmac.new(self.secret, message, sha256).digest()
+
+    def verified(self, name: str, password: str, password_hash: str) -> bool:
+        """Password was checked a moment ago"""
+        digest = self._digest(name, password, password_hash)
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is None:
+                return False
+            if entry[1] < time.monotonic():
+                del self.entries[name]
+                return False
+        return hmac.compare_digest(entry[0], digest)
+
+    def add(self, name: str, password: str, password_hash: str) -> None:
+        """Remember a password that was just checked"""
+        digest = self._digest(name, password, password_hash)
+        with self.lock:
+            self.entries.pop(name, None)
+            self.entries[name] = (digest, time.monotonic() + self.ttl)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+pool = HashPool()
+verified_logins = VerifiedLogins()
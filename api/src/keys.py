@@ -0,0 +1,45 @@
+from collections import deque
+from hashlib import sha256
+from src import database
+from src import metrics
+
+
+def hash_key(api_key: str) -> str:
+    """Hash an API key so the key itself is never stored"""
+    return sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class KeyRegistry:
+    """Index of hashed API keys to the users that own them"""
+
+    def __init__(self) -> None:
+        self.lock = metrics.TimedLock("api_keys")
+        self.index = {}
+        # each user's keys oldest first, to drop them as the database does
+        self.owned = {}
+        self.last_id = 0
+        self.reload()
+
+    def reload(self) -> None:
+        """Read the keys added since the last reload, by any worker"""
+        with self.lock:
+            for row in database.get_keys_since(self.last_id):
+                self.index[row["key_hash"]] = row["name"]
+                self.last_id = row["id"]
+
+                # keys are read in the order they were added, so the
+                # oldest past the limit are the ones the database dropped
+                owned = self.owned.setdefault(row["name"], deque())
+                owned.append(row["key_hash"])
+                while len(owned) > database.MAX_API_KEYS:
+                    self.index.pop(owned.popleft(), None)
+
+    def lookup(self, api_key: str) -> str | None:
+        """Get the user that owns an API key"""
+        key_hash = hash_key(api_key)
+        name = self.index.get(key_hash)
+        if name is None:
+            # the key may have been added by another worker
+            self.reload()
+            name = self.index.get(key_hash)
+        return name
@@ -0,0 +1,81 @@
+import threading
+import sqlite3
+import atexit
+from src import database
+from src import metrics
+
+# seconds between writing the house points to disk
+FLUSH_INTERVAL = 5.0
+
+
+class Leaderboard:
+    """House team points kept in memory and written to disk behind"""
+
+    def __init__(self, interval: float = FLUSH_INTERVAL) -> None:
+        self.interval = interval
+        self.lock = metrics.TimedLock("leaderboard")
+        self.stopped = threading.Event()
+
+        self.teams = database.get_teams()
+        self.pending = {team: 0 for team in self.teams}
+        self.ranking = None
+
+    def add(self, team: str, points: int = 1) -> None:
+        """Give points to a house team"""
+        with self.lock:
+            self.teams[team]["points"] += points
+            self.pending[team] += points
+            self.ranking = None
+
+    def render(self) -> dict:
+        """Get the teams sorted from highest scoring"""
+        with self.lock:
+            if self.ranking is None:
+                self.ranking = {
+                    team: dict(info) for team, info in sorted(
+                        self.teams.items(),
+                        key=lambda item: item[1]["points"],
+                        reverse=True,
+                    )
+                }
+            return self.ranking
+
+    def flush(self) -> None:
+        """Write the points gained since the last flush to disk"""
+        with self.lock:
+            pending = {team: points
+                       for team, points in self.pending.items() if points}
+            self.pending = {team: 0 for team in self.teams}
+
+        try:
+            if pending:
+                database.add_team_points(pending)
+        except sqlite3.Error:
+            # keep the points to try again on the next flush
+            with self.lock:
+                for team, points in pending.items():
+                    self.pending[team] += points
+            return
+
+        # other workers may have flushed points of their own
+        teams = database.get_teams()
+        with self.lock:
+            for team, info in teams.items():
+                info["points"] += self.pending[team]
+            self.teams = teams
+            self.ranking = None
+
+    def start(self) -> None:
+        """Flush on an interval and when the server shuts down"""
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Stop flushing and write any remaining points"""
+        self.stopped.set()
+        self.flush()
+
+    def _run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.flush()
@@ -0,0 +1,98 @@
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from datetime import datetime, timezone
+import logging
+import atexit
+import queue
+import time
+import json
+import sys
+
+# log records waiting to be written, any more are dropped
+QUEUE_SIZE = 10000
+# rotate the log file once it reaches this size or age
+MAX_BYTES = 10 * 1024 * 1024
+ROTATE_EVERY = 24 * 60 * 60
+# rotated log files kept
+BACKUPS = 5
+
+# request details written with each record when given as extra
+FIELDS = ["request_id", "user", "method", "route", "status", "duration_ms"]
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc)
+            .isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        return json.dumps(entry)
+
+
+class RotatingHandler(RotatingFileHandler):
+    """Rotates the log file by size, or once it gets too old"""
+
+    def __init__(self, path: str, max_bytes: int = MAX_BYTES,
+                 interval: float = ROTATE_EVERY,
+                 backups: int = BACKUPS) -> None:
+        super().__init__(path, maxBytes=max_bytes, backupCount=backups,
+                         encoding="utf-8")
+        self.interval = interval
+        self.rollover_at = time.time() + interval
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        return (time.time() >= self.rollover_at
+                or bool(super().shouldRollover(record)))
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self.rollover_at = time.time() + self.interval
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records rather than make a request wait"""
+
+    def __init__(self, records: queue.Queue) -> None:
+        super().__init__(records)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup(path: str | None = None) -> QueueListener:
+    """Send every log record through a queue to a background writer
+
+            Parameters:
+                    path (str): JSON lines log file, or None for the
+                            terminal
+    """
+    if path is None:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    else:
+        handler = RotatingHandler(path)
+        handler.setFormatter(JsonFormatter())
+
+    records = queue.Queue(QUEUE_SIZE)
+    root = logging.getLogger()
+    root.handlers = [DroppingQueueHandler(records)]
+    root.setLevel(logging.INFO)
+
+    listener = QueueListener(records, handler, respect_handler_level=True)
+    listener.start()
+    # write out whatever is still queued on the way out
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,190 @@
+from bisect import bisect_left
+import threading
+import time
+import json
+
+# request durations, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# lock waits are usually far shorter
+WAIT_BUCKETS = (0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0)
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Total that only goes up, by label values"""
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def inc(self, value: float = 1, *labels) -> None:
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + value
+
+    def samples(self):
+        with self.lock:
+            values = list(self.values.items())
+        for labels, value in values:
+            yield f"{self.name}{_labels(self.labels, labels)} {value}"
+
+
+class Gauge(Counter):
+    """Value that goes up and down, by label values"""
+    type = "gauge"
+
+    def dec(self, value: float = 1, *labels) -> None:
+        self.inc(-value, *labels)
+
+
+class Histogram:
+    """Counts of observations in fixed buckets, by label values"""
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (),
+                 buckets: tuple = LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        # label values to [bucket counts..., +Inf count, sum]
+        self.values = {}
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.values.get(labels)
+            if counts is None:
+                counts = self.values[labels] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def samples(self):
+        with self.lock:
+            values = [(labels, list(counts))
+                      for labels, counts in self.values.items()]
+        for labels, counts in values:
+            total = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                total += count
+                le = _labels(self.labels, labels, f'le="{bound}"')
+                yield f"{self.name}_bucket{le} {total}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {counts[-1]}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {total}"
+
+
+class TimedLock:
+    """threading.Lock that records how long it was waited on"""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.lock = threading.Lock()
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        # uncontended, nothing to time
+        if self.lock.acquire(False):
+            lock_wait.observe(0, self.name)
+            return True
+        if not blocking:
+            return False
+        start = time.perf_counter()
+        acquired = self.lock.acquire(True, timeout)
+        lock_wait.observe(time.perf_counter() - start, self.name)
+        return acquired
+
+    def release(self) -> None:
+        self.lock.release()
+
+    def locked(self) -> bool:
+        return self.lock.locked()
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+def encode(table: str, value) -> str:
+    """JSON for a database row, counting the bytes written"""
+    text = json.dumps(value)
+    database_bytes.inc(len(text), table, "written")
+    return text
+
+
+def decode(table: str, text: str):
+    """JSON from a database row, counting the bytes read and decode time"""
+    start = time.perf_counter()
+    value = json.loads(text)
+    decode_seconds.observe(time.perf_counter() - start, table)
+    database_bytes.inc(len(text), table, "read")
+    return value
+
+
+def render() -> str:
+    """Every metric in the Prometheus text format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+def start_dump(interval: float, write) -> None:
+    """Hand the metrics to write every interval seconds"""
+    def run() -> None:
+        while True:
+            time.sleep(interval)
+            write(render())
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+requests_total = Counter(
+    "quizzy_requests_total", "Requests handled",
+    ("route", "method", "status"))
+request_seconds = Histogram(
+    "quizzy_request_duration_seconds", "Time taken to handle a request",
+    ("route", "method"))
+requests_in_flight = Gauge(
+    "quizzy_requests_in_flight", "Requests being handled right now")
+request_bytes = Counter(
+    "quizzy_request_bytes_total", "Bytes of request bodies", ("route",))
+response_bytes = Counter(
+    "quizzy_response_bytes_total", "Bytes of response bodies", ("route",))
+lock_wait = Histogram(
+    "quizzy_lock_wait_seconds", "Time spent waiting for a lock",
+    ("lock",), WAIT_BUCKETS)
+database_bytes = Counter(
+    "quizzy_database_bytes_total", "Bytes of JSON read from and written "
+    "to the database", ("table", "direction"))
+decode_seconds = Histogram(
+    "quizzy_json_decode_seconds", "Time taken to decode JSON from the "
+    "database", ("table",), WAIT_BUCKETS)
+
+REGISTRY = [requests_total, request_seconds, requests_in_flight,
+            request_bytes, response_bytes, lock_wait,
+            database_bytes, decode_seconds]
+
+
+def observe_request(route: str, method: str, status: int, seconds: float,
+                    received: int, sent: int) -> None:
+    """Record a finished request"""
+    requests_total.inc(1, route, method, status)
+    request_seconds.observe(seconds, route, method)
+    if received:
+        request_bytes.inc(received, route)
+    if sent:
+        response_bytes.inc(sent, route)
@@ -0,0 +1,78 @@
+# one-shot migration of the JSON profiles into the database,
+# run from the api directory with: python -m src.migrate
+from pathlib import Path
+import time
+import json
+import os
+from src.keys import hash_key
+from src import database
+from src import normalize
+
+DEFAULT_DIR = Path(__file__).parent
+PROFILES_DIR = Path(DEFAULT_DIR, "profiles")
+
+
+def migrate() -> (int, int):
+    """Copy every profile, API key and team score into the database"""
+    database.init_db()
+    db = database.connect()
+
+    # load the keys, mapped by user so every key a user had still works
+    keys = {}
+    if os.path.exists(Path(DEFAULT_DIR, "valid_api_keys.json")):
+        with open(Path(DEFAULT_DIR, "valid_api_keys.json"), "r") as f:
+            for api_key, name in json.loads(f.read()).items():
+                keys.setdefault(name, set()).add(api_key)
+
+    profiles = []
+    if os.path.exists(PROFILES_DIR):
+        profiles = [file for file in os.listdir(PROFILES_DIR)
+                    if file.endswith(".json")]
+
+    migrated_keys = 0
+    db.execute("BEGIN IMMEDIATE")
+    for file in profiles:
+        with open(Path(PROFILES_DIR, file), "r") as f:
+            profile = json.loads(f.read())
+
+        db.execute(
+            "INSERT OR REPLACE INTO users (name, password, team, points) "
+            "VALUES (?, ?, ?, ?)",
+            (profile["name"], profile["password"],
+             profile["team"], profile["points"]),
+        )
+
+        user_keys = keys.get(profile["name"], set()) | {profile["api_key"]}
+        db.executemany(
+            "INSERT OR IGNORE INTO api_keys (key_hash, name) VALUES (?, ?)",
+            [(hash_key(api_key), profile["name"]) for api_key in user_keys],
+        )
+        migrated_keys += len(user_keys)
+
+        # the newest quizzes are kept if there are too many, their
+        # questions saved once in the shared packs
+        quizzes = list(profile["active_quizzes"].items())
+        for quiz_name, quiz in quizzes[-database.MAX_ACTIVE_QUIZZES:]:
+            index = quiz.pop("index", 0)
+            pack = database._store_pack(db, normalize.canonical_quiz(quiz))
+            db.execute(
+                "INSERT OR REPLACE INTO active_quizzes "
+                "(name, quiz_name, pack, question_index, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (profile["name"], quiz_name, pack, index, time.time()),
+            )
+
+    # house points were only ever kept in teams.json
+    with open(Path(DEFAULT_DIR, "teams.json"), "r") as f:
+        teams = json.loads(f.read())
+    db.executemany("UPDATE team_points SET points = ? WHERE team = ?",
+                   [(info["points"], team) for team, info in teams.items()])
+    db.execute("COMMIT")
+
+    return len(profiles), migrated_keys
+
+
+if __name__ == "__main__":
+    users, api_keys = migrate()
+    print(f"Migrated {users} profiles and {api_keys} API keys "
+          f"into {database.DATABASE_DIR}")
@@ -0,0 +1,106 @@
+# local stand-in for OpenTDB, for running the api offline or under load,
+# run from the api directory with: python -m src.opentdb_stub
+# then start the api with OPENTDB_URL=http://127.0.0.1:5001/api.php
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import argparse
+import time
+import json
+
+# how many different questions each category, difficulty and type has
+QUESTIONS_PER_POOL = 500
+
+
+def make_question(category: str, difficulty: str, type: str, n: int) -> dict:
+    """Make up a question, the same one every time for the same number"""
+    if type == "boolean":
+        correct = "True" if n % 2 else "False"
+        incorrect = ["False" if n % 2 else "True"]
+    else:
+        correct = f"Answer {n}"
+        incorrect = [f"Wrong {n}.{i}" for i in range(3)]
+
+    return {
+        "type": type,
+        "difficulty": difficulty,
+        "category": f"Category {category}",
+        "question": f"Question {n} for category {category}?",
+        "correct_answer": correct,
+        "incorrect_answers": incorrect,
+    }
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Answer /api.php and /api_token.php like OpenTDB does"""
+    counter = 0
+    # seconds callers must wait between calls, like OpenTDB, 0 for none
+    rate_limit = 0
+    last_call = 0
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        params = {key: value[0] for key, value in parse_qs(url.query).items()}
+        if url.path == "/api_token.php":
+            self._send({"response_code": 0, "token": "stub-token"})
+            return
+        elif url.path != "/api.php":
+            self.send_error(404)
+            return
+
+        # response code 5 is OpenTDB's rate limit
+        now = time.monotonic()
+        if now - Handler.last_call < Handler.rate_limit:
+            self._send({"response_code": 5, "results": []})
+            return
+        Handler.last_call = now
+
+        amount = min(int(params.get("amount", 10)), 50)
+        category = params.get("category", "9")
+        difficulty = params.get("difficulty", "easy")
+        type = params.get("type", "multiple")
+
+        # response code 1 is OpenTDB not having that many questions
+        if amount > QUESTIONS_PER_POOL:
+            self._send({"response_code": 1, "results": []})
+            return
+
+        # hand out the questions in a cycle so pools fill up then repeat
+        results = []
+        for _ in range(amount):
+            Handler.counter += 1
+            results.append(make_question(
+                category, difficulty, type,
+                Handler.counter % QUESTIONS_PER_POOL))
+
+        self._send({"response_code": 0, "results": results})
+
+    def _send(self, data: dict) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def serve(port: int = 5001, rate_limit: float = 0) -> ThreadingHTTPServer:
+    """Create the stand-in server, call serve_forever() to run it"""
+    Handler.rate_limit = rate_limit
+    return ThreadingHTTPServer(("127.0.0.1", port), Handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0,
+        help="Seconds between calls before answering with response code 5.",
+    )
+    args = parser.parse_args()
+    print(f"OpenTDB stand-in on http://127.0.0.1:{args.port}/api.php")
+    serve(args.port, args.rate_limit).serve_forever()
@@ -0,0 +1,269 @@
+from urllib.parse import urlencode
+from urllib.request import urlopen
+import threading
+import logging
+import random
+import time
+import json
+import os
+from src import database
+from src import metrics
+from src import normalize
+from src import shuffle
+
+log = logging.getLogger(__name__)
+
+# OpenTDB, or a local stand-in such as src/opentdb_stub.py
+OPENTDB_URL = os.environ.get("OPENTDB_URL", "https://opentdb.com/api.php")
+
+CATEGORIES = range(9, 33)
+DIFFICULTIES = ["easy", "medium", "hard"]
+TYPES = ["multiple", "boolean"]
+
+# questions the filler tries to keep in each pool
+POOL_SIZE = 200
+# OpenTDB allows one call every 5 seconds per IP
+FETCH_INTERVAL = 5.0
+# most questions OpenTDB gives in one call
+FETCH_AMOUNT = 50
+# longest wait before trying again a pool that last gave nothing, the
+# wait doubling from the fetch interval up to this
+MAX_BACKOFF = 10 * 60
+
+
+class _Fill:
+    """A fill under way that others wanting the same pool can wait on"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.added = 0
+
+
+def pool_key(category: int, difficulty: str, type: str) -> str:
+    """Name of the pool for a category, difficulty and question type"""
+    return f"{category}:{difficulty}:{type}"
+
+
+def public(question_id: int, question: dict, seed: int = None) -> dict:
+    """The parts of a question a client may see, without the answer
+
+            Parameters:
+                    question_id (int): The question's id in the bank
+                    question (dict): The whole question
+                    seed (int): Seed of the session the answers are shown
+                            in order by, shuffled freshly if not given
+    """
+    if seed is None:
+        options = question["incorrect_answers"] + [question["correct_answer"]]
+        random.shuffle(options)
+    else:
+        # the seed stays on the server, but the order it gives shouldn't
+        # point at the answer either
+        options = shuffle.options(seed, question_id, question, hidden=True)
+    return {
+        "id": question_id,
+        "type": question["type"],
+        "category": question["category"],
+        "question": question["question"],
+        "options": options,
+    }
+
+
+class QuestionBank:
+    """Pools of pre-fetched questions, by category, difficulty and type"""
+
+    def __init__(self, url: str = OPENTDB_URL,
+                 interval: float = FETCH_INTERVAL) -> None:
+        self.url = url
+        self.interval = interval
+        self.lock = metrics.TimedLock("question_bank")
+        self.fetch_lock = metrics.TimedLock("opentdb_fetch")
+        self.wake = threading.Event()
+        self.last_fetch = 0
+        # questions asked for per call, less for pools OpenTDB has fewer of
+        self.amounts = {}
+        # fills under way, and when pools that gave nothing may be tried
+        # again with how long to wait after that
+        self.filling = {}
+        self.retry = {}
+
+        db = database.connect()
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, pool TEXT NOT NULL, "
+            "question TEXT NOT NULL, text TEXT NOT NULL, "
+            "version INTEGER NOT NULL DEFAULT 1, "
+            "UNIQUE (pool, text))"
+        )
+        # questions stored before their text was normalized
+        columns = [row["name"] for row in
+                   db.execute("PRAGMA table_info(questions)").fetchall()]
+        if "version" not in columns:
+            db.execute("ALTER TABLE questions "
+                       "ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+
+        # question ids of every pool, and questions already decoded
+        self.pools = {}
+        self.cache = {}
+        for row in db.execute(
+            "SELECT id, pool FROM questions"
+        ).fetchall():
+            self.pools.setdefault(row["pool"], []).append(row["id"])
+
+    def draw(self, category: int, difficulty: str,
+             type: str, amount: int, seed: int = None) -> list:
+        """Hand out random questions from a pool, without their answers"""
+        pool = pool_key(category, difficulty, type)
+        with self.lock:
+            cold = (not self.pools.setdefault(pool, [])
+                    and not self._backing_off(pool))
+
+        # an empty pool has to be filled before the quiz can start, a
+        # small one hands out what it has while the filler tops it up
+        if cold:
+            self.fill(pool)
+
+        with self.lock:
+            ids = self.pools[pool]
+            chosen = random.sample(ids, min(amount, len(ids)))
+
+        # let the filler top the pool back up in the background
+        self.wake.set()
+        return [public(i, self.get(i), seed) for i in chosen]
+
+    def answer_key(self, seed: int, question_ids: list) -> list:
+        """Where the correct answer of each question is shown for a seed"""
+        return [shuffle.correct_index(seed, i, self.get(i), hidden=True)
+                for i in question_ids]
+
+    def get(self, question_id: int) -> dict | None:
+        """Get a whole question, including its answer"""
+        question = self.cache.get(question_id)
+        if question is None:
+            db = database.connect()
+            row = db.execute(
+                "SELECT question, version FROM questions WHERE id = ?",
+                (question_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            question = metrics.decode("questions", row["question"])
+
+            # normalize older questions the first time they are used
+            if row["version"] < normalize.SCHEMA_VERSION:
+                question = normalize.canonical_question(question)
+                db.execute(
+                    "UPDATE questions SET question = ?, version = ? "
+                    "WHERE id = ?",
+                    (metrics.encode("questions", question),
+                     normalize.SCHEMA_VERSION, question_id),
+                )
+            self.cache[question_id] = question
+        return question
+
+    def fill(self, pool: str) -> int:
+        """Fetch one batch of questions into a pool, giving back how many,
+        or wait for the fill of it already under way"""
+        with self.lock:
+            call = self.filling.get(pool)
+            leader = call is None
+            if leader:
+                call = self.filling[pool] = _Fill()
+
+        if not leader:
+            call.done.wait()
+            return call.added
+
+        try:
+            call.added = self._fill(pool)
+        finally:
+            with self.lock:
+                del self.filling[pool]
+                # wait longer each time a pool gives nothing
+                if call.added:
+                    self.retry.pop(pool, None)
+                else:
+                    _, wait = self.retry.get(pool, (0, FETCH_INTERVAL))
+                    self.retry[pool] = (time.monotonic() + wait,
+                                        min(wait * 2, MAX_BACKOFF))
+            call.done.set()
+        return call.added
+
+    def _fill(self, pool: str) -> int:
+        category, difficulty, type = pool.split(":")
+        amount = self.amounts.get(pool, FETCH_AMOUNT)
+        while True:
+            data = self._fetch(pool, {"amount": amount, "category": category,
+                                      "difficulty": difficulty,
+                                      "type": type})
+            # response code 1 is OpenTDB having fewer questions than
+            # were asked for, ask again for half as many
+            if data is None or data["response_code"] != 1 or amount == 1:
+                break
+            amount //= 2
+            self.amounts[pool] = amount
+
+        if data is None or data["response_code"] != 0:
+            return 0
+
+        db = database.connect()
+        added = []
+        for question in data["results"]:
+            # decoded once here, never when handed out or graded
+            question = normalize.canonical_question(question)
+            row = db.execute(
+                "INSERT OR IGNORE INTO questions "
+                "(pool, question, text, version) "
+                "VALUES (?, ?, ?, ?) RETURNING id",
+                (pool, metrics.encode("questions", question),
+                 question["question"], normalize.SCHEMA_VERSION),
+            ).fetchone()
+            if row is not None:
+                added.append(row["id"])
+                self.cache[row["id"]] = question
+
+        with self.lock:
+            self.pools.setdefault(pool, []).extend(added)
+        return len(added)
+
+    def _fetch(self, pool: str, params: dict) -> dict | None:
+        """Call OpenTDB, keeping to its rate limit"""
+        with self.fetch_lock:
+            wait = self.last_fetch + self.interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self.last_fetch = time.monotonic()
+
+            try:
+                with urlopen(f"{self.url}?{urlencode(params)}",
+                             timeout=10) as response:
+                    return json.loads(response.read())
+            except (OSError, ValueError) as e:
+                log.warning("Failed to fetch questions for %s: %s", pool, e)
+                return None
+
+    def start(self) -> None:
+        """Keep every pool that has been asked for topped up"""
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self.wake.wait()
+            self.wake.clear()
+
+            # pools that gave nothing last time wait their turn
+            with self.lock:
+                low = [pool for pool, ids in self.pools.items()
+                       if len(ids) < POOL_SIZE
+                       and not self._backing_off(pool)]
+
+            for pool in low:
+                # stop topping up a pool once upstream has run dry
+                if self.fill(pool) == 0:
+                    continue
+                self.wake.set()
+
+    def _backing_off(self, pool: str) -> bool:
+        """Whether a pool gave nothing too recently to try again"""
+        return self.retry.get(pool, (0, 0))[0] > time.monotonic()
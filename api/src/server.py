@@ -1,30 +1,20 @@
-from pathlib import Path
-import json
-import os
-from werkzeug.security import generate_password_hash, check_password_hash
-
-DEFAULT_DIR = Path(__file__).parent
-PROFILES_DIR = Path(DEFAULT_DIR, "profiles")
+from src.keys import hash_key
+from src import hashing
+from src import database
+import uuid
 
 
 def signUp(client: dict) -> (str, True | False):
     """Sign up user online"""
-    if os.path.exists(Path(PROFILES_DIR, str(client["name"]) + ".json")):
+    if database.get_user(client["name"]) is not None:
         return "User already exists", False
 
-    client["password"] = generate_password_hash(client["password"])
-
-    # add user profile on the server
-    with open(Path(PROFILES_DIR, client["name"] + ".json"), "w") as f:
-        f.write(json.dumps(client))
+    password = hashing.pool.generate(client["password"])
 
-    # append their valid key to other api keys
-    with open(Path(DEFAULT_DIR, "valid_api_keys.json"), "r+") as f:
-        keys = json.loads(f.read()) | {client["api_key"]: client["name"]}
-
-        f.seek(0)
-        f.write(json.dumps(keys))
-        f.truncate()
+    # add user profile and their api key on the server
+    if not database.add_user(client["name"], password,
+                             client["team"], hash_key(client["api_key"])):
+        return "User already exists", False
 
     return "Sign up successful", client["api_key"]
 
@@ -32,15 +22,18 @@ def signUp(client: dict) -> (str, True | False):
 def login(name: str, password: str) -> (str, str | None):
     """Log in user"""
     # check if user exist
-    if os.path.exists(Path(PROFILES_DIR, str(name) + ".json")):
-        with open(Path(PROFILES_DIR, str(name) + ".json"), "r") as info:
-            profile = json.loads(info.read())
-            correct = check_password_hash(profile["password"], password)
-
-            # check if password correct
-            if correct:
-                return "Succesfully logged in", profile["api_key"]
-            else:
-                return "Password is incorrect", None
-    else:
+    profile = database.get_user(name)
+    if profile is None:
         return "User does not exist!", None
+
+    # check if password correct, skipping the hash if it was just checked
+    stored = profile["password"]
+    if (hashing.verified_logins.verified(name, password, stored)
+            or hashing.pool.check(stored, password)):
+        hashing.verified_logins.add(name, password, stored)
+        # only key hashes are kept so give a new key
+        api_key = str(uuid.uuid4())
+        database.add_key(hash_key(api_key), name)
+        return "Succesfully logged in", api_key
+    else:
+        return "Password is incorrect", None
@@ -0,0 +1,227 @@
+import time
+import json
+import os
+from src import database
+from src import metrics
+
+# seconds an infinite quiz session is kept after it was last used
+SESSION_TTL = 60 * 60
+# seconds between sweeps for expired sessions
+SWEEP_INTERVAL = 60
+
+
+class MemorySessions:
+    """Infinite quiz sessions kept in this process only"""
+
+    def __init__(self, ttl: float = SESSION_TTL) -> None:
+        self.ttl = ttl
+        self.lock = metrics.TimedLock("sessions")
+        self.sessions = {}
+        self.last_sweep = time.monotonic()
+
+    def set(self, name: str, session: dict) -> None:
+        """Start or replace a user's session"""
+        with self.lock:
+            self._sweep()
+            self.sessions[name] = (session, time.monotonic() + self.ttl)
+
+    def get(self, name: str) -> dict | None:
+        """Get a copy of a user's session"""
+        with self.lock:
+            session, expires = self.sessions.get(name, (None, 0))
+            if expires < time.monotonic():
+                return None
+            return json.loads(json.dumps(session))
+
+    def update(self, name: str, change):
+        """Change a user's session in place, giving back what change returns
+
+                Parameters:
+                        name (str): The user
+                        change (Callable): function given the session dict
+        """
+        with self.lock:
+            self._sweep()
+            session, expires = self.sessions.get(name, (None, 0))
+            if expires < time.monotonic():
+                # expired but not swept yet
+                self.sessions.pop(name, None)
+                return None
+
+            result = change(session)
+            self.sessions[name] = (session, time.monotonic() + self.ttl)
+            return result
+
+    def delete(self, name: str) -> None:
+        """End a user's session"""
+        with self.lock:
+            self.sessions.pop(name, None)
+
+    def _sweep(self) -> None:
+        """Drop expired sessions, at most once every sweep interval"""
+        now = time.monotonic()
+        if now - self.last_sweep < SWEEP_INTERVAL:
+            return
+
+        self.last_sweep = now
+        for name in [name for name, (_, expires) in self.sessions.items()
+                     if expires < now]:
+            del self.sessions[name]
+
+
+class SQLiteSessions:
+    """Infinite quiz sessions shared by every worker through the database"""
+
+    def __init__(self, ttl: float = SESSION_TTL) -> None:
+        self.ttl = ttl
+        self.last_sweep = 0
+        database.connect().execute(
+            "CREATE TABLE IF NOT EXISTS infinite_sessions ("
+            "name TEXT PRIMARY KEY, session TEXT NOT NULL, "
+            "expires REAL NOT NULL)"
+        )
+
+    def set(self, name: str, session: dict) -> None:
+        """Start or replace a user's session"""
+        self._sweep()
+        database.connect().execute(
+            "INSERT OR REPLACE INTO infinite_sessions "
+            "(name, session, expires) VALUES (?, ?, ?)",
+            (name, metrics.encode("infinite_sessions", session),
+             time.time() + self.ttl),
+        )
+
+    def get(self, name: str) -> dict | None:
+        """Get a copy of a user's session"""
+        row = database.connect().execute(
+            "SELECT session FROM infinite_sessions "
+            "WHERE name = ? AND expires >= ?",
+            (name, time.time()),
+        ).fetchone()
+        return (metrics.decode("infinite_sessions", row["session"])
+                if row else None)
+
+    def update(self, name: str, change):
+        """Change a user's session in place, giving back what change returns
+
+                Parameters:
+                        name (str): The user
+                        change (Callable): function given the session dict
+        """
+        db = database.connect()
+        database.begin(db)
+        try:
+            row = db.execute(
+                "SELECT session FROM infinite_sessions "
+                "WHERE name = ? AND expires >= ?",
+                (name, time.time()),
+            ).fetchone()
+            if row is None:
+                db.execute("ROLLBACK")
+                return None
+
+            session = metrics.decode("infinite_sessions", row["session"])
+            result = change(session)
+            db.execute(
+                "UPDATE infinite_sessions SET session = ?, expires = ? "
+                "WHERE name = ?",
+                (metrics.encode("infinite_sessions", session),
+                 time.time() + self.ttl, name),
+            )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return result
+
+    def delete(self, name: str) -> None:
+        """End a user's session"""
+        database.connect().execute(
+            "DELETE FROM infinite_sessions WHERE name = ?", (name,))
+
+    def _sweep(self) -> None:
+        """Drop expired sessions, at most once every sweep interval"""
+        now = time.time()
+        if now - self.last_sweep < SWEEP_INTERVAL:
+            return
+
+        self.last_sweep = now
+        database.connect().execute(
+            "DELETE FROM infinite_sessions WHERE expires < ?", (now,))
+
+
+class RedisSessions:
+    """Infinite quiz sessions kept in Redis or a Redis-compatible server"""
+
+    def __init__(self, ttl: float = SESSION_TTL,
+                 url: str = "redis://127.0.0.1:6379/0") -> None:
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis session backend needs the redis "
+                               "package: pip install redis")
+
+        self.ttl = int(ttl)
+        self.redis = redis
+        self.client = redis.Redis.from_url(url)
+
+    def set(self, name: str, session: dict) -> None:
+        """Start or replace a user's session"""
+        self.client.set(self._key(name), json.dumps(session), ex=self.ttl)
+
+    def get(self, name: str) -> dict | None:
+        """Get a copy of a user's session"""
+        value = self.client.get(self._key(name))
+        return json.loads(value) if value is not None else None
+
+    def update(self, name: str, change):
+        """Change a user's session in place, giving back what change returns
+
+                Parameters:
+                        name (str): The user
+                        change (Callable): function given the session dict
+        """
+        key = self._key(name)
+        with self.client.pipeline() as pipe:
+            # retry if another worker changed the session underneath us
+            while True:
+                try:
+                    pipe.watch(key)
+                    value = pipe.get(key)
+                    if value is None:
+                        return None
+
+                    session = json.loads(value)
+                    result = change(session)
+
+                    pipe.multi()
+                    pipe.set(key, json.dumps(session), ex=self.ttl)
+                    pipe.execute()
+                    return result
+                except self.redis.WatchError:
+                    continue
+
+    def delete(self, name: str) -> None:
+        """End a user's session"""
+        self.client.delete(self._key(name))
+
+    def _key(self, name: str) -> str:
+        return f"quizzy:infinite:{name}"
+
+
+def create_sessions(backend: str | None = None):
+    """Create the infinite quiz session store
+
+            Parameters:
+                    backend (str): memory, sqlite or redis, defaults to
+                                   the QUIZZY_SESSIONS environment variable
+    """
+    backend = backend or os.environ.get("QUIZZY_SESSIONS", "memory")
+    if backend == "memory":
+        return MemorySessions()
+    elif backend == "sqlite":
+        return SQLiteSessions()
+    elif backend == "redis":
+        return RedisSessions(url=os.environ.get("QUIZZY_REDIS_URL",
+                                                "redis://127.0.0.1:6379/0"))
+    raise ValueError(f"Unknown session backend: {backend}")
@@ -0,0 +1,74 @@
+# answers are shown in an order worked out from a seed the server hands
+# out, so clients can send back where the answer was instead of its text
+import hashlib
+import secrets
+
+# largest seed, JSON numbers are exact up to 2 ** 53 in any client
+SEED_BITS = 53
+
+
+def new_seed() -> int:
+    """A seed for one attempt at a quiz"""
+    return secrets.randbits(SEED_BITS)
+
+
+def order(seed: int, position: int, count: int) -> list:
+    """Where each answer of a question goes, the same on every client
+
+            Parameters:
+                    seed (int): Seed of the attempt
+                    position (int): The question's place in the quiz, or
+                            its id in the question bank
+                    count (int): Number of answers
+    """
+    # Fisher-Yates driven by a hash rather than a random generator, so it
+    # can be repeated anywhere from the seed alone
+    shown = list(range(count))
+    for i in range(count - 1, 0, -1):
+        digest = hashlib.sha256(f"{seed}:{position}:{i}".encode()).digest()
+        j = int.from_bytes(digest[:8], "big") % (i + 1)
+        shown[i], shown[j] = shown[j], shown[i]
+    return shown
+
+
+def options(seed: int, position: int, question: dict,
+            hidden: bool = False) -> list:
+    """A question's answers in the order they are shown
+
+            Parameters:
+                    seed (int): Seed of the attempt
+                    position (int): The question's place in the quiz, or
+                            its id in the question bank
+                    question (dict): The question
+                    hidden (bool): Shuffle the answers sorted rather than
+                            with the correct one last, so the seed alone
+                            doesn't give it away
+    """
+    answers = question["incorrect_answers"] + [question["correct_answer"]]
+    if hidden:
+        answers = sorted(answers)
+    return [answers[i] for i in order(seed, position, len(answers))]
+
+
+def correct_index(seed: int, position: int, question: dict,
+                  hidden: bool = False) -> int:
+    """Where the correct answer of a question is shown"""
+    if hidden:
+        return options(seed, position, question, True).index(
+            question["correct_answer"])
+
+    # the correct answer comes after the incorrect ones before shuffling
+    count = len(question["incorrect_answers"]) + 1
+    return order(seed, position, count).index(count - 1)
+
+
+def answer_key(seed: int, questions: list) -> bytes:
+    """Where the correct answer of every question of a quiz is shown, a
+    byte each"""
+    return bytes(correct_index(seed, position, question)
+                 for position, question in enumerate(questions))
+
+
+def is_index(selected) -> bool:
+    """Whether an answer was sent as where it was shown, not its text"""
+    return isinstance(selected, int) and not isinstance(selected, bool)
@@ -0,0 +1,31 @@
+# the api directory, so tests import src like api.py does
+from pathlib import Path
+import sys
+import threading
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest  # noqa: E402
+from src import database  # noqa: E402
+from src import opentdb_stub  # noqa: E402
+from src import questions  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A database of the test's own"""
+    monkeypatch.setattr(database, "DATABASE_DIR", Path(tmp_path, "quizzy.db"))
+    monkeypatch.setattr(database._local, "connection", None, raising=False)
+    database.init_db()
+    yield database.connect()
+    database.connect().close()
+
+
+@pytest.fixture
+def bank(db):
+    """A question bank fed by the stand-in"""
+    server = opentdb_stub.serve(0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    yield questions.QuestionBank(f"http://{host}:{port}/api.php", interval=0)
+    server.shutdown()
@@ -0,0 +1,123 @@
+from pathlib import Path
+import json
+import sqlite3
+import pytest
+from src import database
+from src.keys import KeyRegistry
+
+
+def quiz(count: int) -> dict:
+    return {"results": [
+        {"type": "multiple", "question": f"Question {n}?",
+         "correct_answer": f"Right {n}",
+         "incorrect_answers": [f"Wrong {n} {i}" for i in range(3)]}
+        for n in range(count)
+    ]}
+
+
+def start(db, count: int = 6) -> None:
+    db.execute("INSERT INTO users (name, password, team) "
+               "VALUES ('amy', 'hash', 'ngata')")
+    database.start_quiz("amy", "quiz", quiz(count))
+
+
+def test_answer_batch_sent_again(db):
+    start(db)
+    first = ["Right 0", "Wrong 1 0", "Right 2"]
+    assert database.answer_questions("amy", "quiz", first, 0) == (
+        [True, False, True], "ngata")
+
+    # the reply was lost and the batch is sent again with the next one
+    again = first + ["Right 3", "Right 4"]
+    assert database.answer_questions("amy", "quiz", again, 0) == (
+        [True, True], "ngata")
+    assert database.get_points("amy") == 4
+
+
+def test_answer_batch_after_a_gap(db):
+    start(db)
+    assert database.answer_questions("amy", "quiz", ["Right 2"], 2) is None
+    assert database.get_points("amy") == 0
+
+
+def test_answer_batch_without_start(db):
+    start(db)
+    database.answer_questions("amy", "quiz", ["Right 0"])
+    assert database.answer_questions("amy", "quiz", ["Right 1"]) == (
+        [True], "ngata")
+
+
+def test_add_key_drops_oldest(db):
+    start(db)
+    for n in range(database.MAX_API_KEYS + 2):
+        database.add_key(f"key {n}", "amy")
+
+    # the key from signing up and the two oldest logins are gone
+    kept = [row["key_hash"] for row in database.get_keys_since(0)]
+    assert kept == [f"key {n}" for n in range(2, database.MAX_API_KEYS + 2)]
+
+
+# the schema as first moved into SQLite, plain keys and whole quizzes
+OLD_SCHEMA = """
+CREATE TABLE users (
+    name TEXT PRIMARY KEY,
+    password TEXT NOT NULL,
+    team TEXT NOT NULL,
+    points INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE api_keys (
+    api_key TEXT PRIMARY KEY,
+    name TEXT NOT NULL REFERENCES users(name)
+);
+CREATE INDEX api_keys_name ON api_keys(name);
+CREATE TABLE active_quizzes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL REFERENCES users(name),
+    quiz_name TEXT NOT NULL,
+    quiz TEXT NOT NULL,
+    question_index INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (name, quiz_name)
+);
+CREATE TABLE team_points (
+    team TEXT PRIMARY KEY,
+    points INTEGER NOT NULL DEFAULT 0,
+    colour TEXT NOT NULL
+);
+"""
+
+
+def test_upgrade_old_database(tmp_path, monkeypatch):
+    path = Path(tmp_path, "quizzy.db")
+    old = sqlite3.connect(path)
+    old.executescript(OLD_SCHEMA)
+    old.execute("INSERT INTO users (name, password, team) "
+                "VALUES ('amy', 'hash', 'ngata')")
+    old.execute("INSERT INTO api_keys VALUES ('key', 'amy')")
+    old.execute("INSERT INTO active_quizzes (name, quiz_name, quiz, "
+                "question_index) VALUES ('amy', 'quiz', ?, 1)",
+                (json.dumps(quiz(3)),))
+    old.commit()
+    old.close()
+
+    monkeypatch.setattr(database, "DATABASE_DIR", path)
+    monkeypatch.setattr(database._local, "connection", None, raising=False)
+    database.init_db()
+
+    # keys are hashed and the quiz carries on from where it was
+    assert KeyRegistry().lookup("key") == "amy"
+    assert database.answer_question("amy", "quiz", "Right 1") == (
+        True, "ngata")
+    database.connect().close()
+
+
+def test_answer_question_past_the_end(db):
+    start(db, 1)
+    assert database.answer_question("amy", "quiz", "Right 0") == (
+        True, "ngata")
+    assert database.get_points("amy") == 1
+
+    # the quiz stays on its last question rather than running past it
+    with pytest.raises(database.QuizFinished):
+        database.answer_question("amy", "quiz", "Right 0")
+    row = db.execute("SELECT question_index FROM active_quizzes").fetchone()
+    assert row["question_index"] == 1
@@ -0,0 +1,74 @@
+import pytest
+from src import shuffle
+from src.handlers import Handlers
+from src.leaderboard import Leaderboard
+from src.sessions import MemorySessions
+
+QUIZ = {"category": 9, "difficulty": "easy", "type": "multiple", "lives": 3}
+
+
+@pytest.fixture
+def handlers(bank):
+    return Handlers(Leaderboard(), MemorySessions(), bank)
+
+
+def test_answer_not_the_current_question(handlers):
+    body, _ = handlers.start_infinite_quiz("amy", QUIZ)
+    first, second = body["questions"][:2]
+
+    # an answer for the question after, the session is left as it was
+    body, status = handlers.answer_infinite_quiz(
+        "amy", {"id": second["id"], "selected": 0})
+    assert status == 400
+    session = handlers.infinite_sessions.get("amy")
+    assert session["questions"][0] == first["id"]
+    assert session["lives"] == 3
+
+
+def test_expand_replaced_session(handlers):
+    body, _ = handlers.start_infinite_quiz("amy", QUIZ)
+    old = body["session"]
+    body, _ = handlers.start_infinite_quiz("amy", QUIZ)
+    count = len(body["questions"])
+
+    # a refill the old session asked for doesn't reach the new one
+    _, status = handlers.expand_infinite_quiz("amy", {"session": old})
+    assert status == 400
+    session = handlers.infinite_sessions.get("amy")
+    assert len(session["questions"]) == count
+
+    _, status = handlers.expand_infinite_quiz(
+        "amy", {"session": body["session"]})
+    assert status == 200
+
+
+def test_question_shown_as_in_session(handlers):
+    body, _ = handlers.start_infinite_quiz("amy", QUIZ)
+    question = body["questions"][0]
+
+    # looked up again, its answers are in the order the session shows them
+    for _ in range(3):
+        shown, status = handlers.get_question("amy", question["id"])
+        assert status == 200
+        assert shown["options"] == question["options"]
+
+
+def test_infinite_answers_kept_hidden(handlers):
+    body, _ = handlers.start_infinite_quiz("amy", QUIZ)
+    assert "seed" not in body
+
+    # even knowing the seed, the last answer before shuffling isn't always
+    # the correct one
+    session = handlers.infinite_sessions.get("amy")
+    last = []
+    for question in body["questions"]:
+        count = len(question["options"])
+        last.append(shuffle.order(session["seed"], question["id"],
+                                  count).index(count - 1))
+    assert last != session["answers"]
+
+    # while the key still points at the correct answer as shown
+    bank = handlers.question_bank
+    for question, index in zip(body["questions"], session["answers"]):
+        correct = bank.get(question["id"])["correct_answer"]
+        assert question["options"][index] == correct
@@ -0,0 +1,17 @@
+from src import database
+from src.keys import KeyRegistry, hash_key
+
+
+def test_registry_drops_old_keys(db):
+    db.execute("INSERT INTO users (name, password, team) "
+               "VALUES ('amy', 'hash', 'ngata')")
+    database.add_key(hash_key("first"), "amy")
+    keys = KeyRegistry()
+    assert keys.lookup("first") == "amy"
+
+    # logins on another worker push the first key out
+    for n in range(database.MAX_API_KEYS):
+        database.add_key(hash_key(f"key {n}"), "amy")
+    assert keys.lookup("key 0") == "amy"
+    assert keys.lookup("first") is None
+    assert len(keys.index) == database.MAX_API_KEYS
@@ -0,0 +1,73 @@
+from pathlib import Path
+import shutil
+import json
+import pytest
+from src import database
+from src import migrate
+
+
+def question(number: int) -> dict:
+    return {
+        "type": "multiple",
+        "difficulty": "easy",
+        "category": "General Knowledge",
+        "question": f"Question {number} &amp; more?",
+        "correct_answer": f"Right {number}",
+        "incorrect_answers": [f"Wrong {number} {i}" for i in range(3)],
+    }
+
+
+@pytest.fixture
+def profiles(db, tmp_path, monkeypatch) -> Path:
+    """An empty profiles directory of the test's own"""
+    monkeypatch.setattr(migrate, "DEFAULT_DIR", tmp_path)
+    monkeypatch.setattr(migrate, "PROFILES_DIR", Path(tmp_path, "profiles"))
+    shutil.copy(Path(database.DEFAULT_DIR, "teams.json"), tmp_path)
+    Path(tmp_path, "profiles").mkdir()
+    return Path(tmp_path, "profiles")
+
+
+def write_profile(profiles: Path, name: str, quizzes: dict) -> None:
+    profile = {"name": name, "password": "hash", "team": "ngata",
+               "points": 3, "api_key": f"key-{name}",
+               "active_quizzes": quizzes}
+    with open(Path(profiles, f"{name}.json"), "w") as f:
+        f.write(json.dumps(profile))
+
+
+def test_migrate_active_quizzes(db, profiles):
+    quizzes = {
+        f"quiz {i}": {"index": 1, "results": [question(0), question(1)]}
+        for i in range(database.MAX_ACTIVE_QUIZZES + 2)
+    }
+    write_profile(profiles, "amy", quizzes)
+
+    assert migrate.migrate() == (1, 1)
+
+    rows = db.execute("SELECT quiz_name, pack, question_index "
+                      "FROM active_quizzes WHERE name = 'amy'").fetchall()
+    # only the newest are kept, all sharing the one pack
+    assert sorted(row["quiz_name"] for row in rows) == sorted(
+        list(quizzes)[-database.MAX_ACTIVE_QUIZZES:])
+    assert len({row["pack"] for row in rows}) == 1
+    assert db.execute("SELECT COUNT(*) FROM quiz_packs").fetchone()[0] == 1
+
+    # carries on from where the profile left off, with decoded text
+    results = database._load_pack(db, rows[0]["pack"])
+    assert results[1]["question"] == "Question 1 & more?"
+    assert database.answer_question("amy", "quiz 6", "Right 1") == (
+        True, "ngata")
+    correct, team = database.answer_questions("amy", "quiz 5", ["Right 1"])
+    assert (correct, team) == ([True], "ngata")
+    assert database.get_points("amy") == 5
+
+
+def test_migrate_twice(db, profiles):
+    write_profile(profiles, "amy",
+                  {"quiz": {"index": 0, "results": [question(0)]}})
+
+    migrate.migrate()
+    migrate.migrate()
+
+    assert db.execute("SELECT COUNT(*) FROM active_quizzes").fetchone()[0] == 1
+    assert db.execute("SELECT COUNT(*) FROM api_keys").fetchone()[0] == 1
@@ -0,0 +1,57 @@
+import threading
+import time
+from src import opentdb_stub
+from src import questions
+
+
+def test_fill_small_pool(bank, monkeypatch):
+    # fewer questions upstream than a whole batch
+    monkeypatch.setattr(opentdb_stub, "QUESTIONS_PER_POOL", 20)
+
+    assert bank.fill("9:easy:multiple") == 12
+    # the smaller batch is remembered for the pool
+    assert bank.amounts["9:easy:multiple"] == 12
+    assert len(bank.draw(9, "easy", "multiple", 20)) == 12
+
+
+def test_draw_small_pool_without_waiting(bank, monkeypatch):
+    bank.fill("9:easy:multiple")
+    # only an empty pool is filled before handing out questions
+    monkeypatch.setattr(bank, "interval", 5)
+    start = time.monotonic()
+    drawn = bank.draw(9, "easy", "multiple", 100)
+    assert time.monotonic() - start < 1
+    assert len(drawn) == questions.FETCH_AMOUNT
+
+
+def test_cold_pool_filled_once(bank, monkeypatch):
+    fetches = []
+    fetch = bank._fetch
+
+    def counted(pool, params):
+        fetches.append(pool)
+        time.sleep(0.2)
+        return fetch(pool, params)
+    monkeypatch.setattr(bank, "_fetch", counted)
+
+    # players starting on the same empty pool wait on one fill
+    drawn = []
+    threads = [threading.Thread(target=lambda: drawn.append(
+        bank.draw(9, "easy", "multiple", 5))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert fetches == ["9:easy:multiple"]
+    assert all(len(questions) == 5 for questions in drawn)
+
+
+def test_empty_pool_backs_off(bank, monkeypatch):
+    fetches = []
+    monkeypatch.setattr(bank, "_fetch",
+                        lambda pool, params: fetches.append(pool))
+
+    # upstream gave nothing, so it isn't asked again on every draw
+    assert bank.draw(9, "easy", "multiple", 5) == []
+    assert bank.draw(9, "easy", "multiple", 5) == []
+    assert len(fetches) == 1
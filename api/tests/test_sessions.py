@@ -0,0 +1,13 @@
+import time
+from src.sessions import MemorySessions
+
+
+def test_update_expired_session():
+    sessions = MemorySessions(ttl=0.01)
+    sessions.set("amy", {"lives": 3})
+    time.sleep(0.02)
+
+    # not brought back by changing it after it expired
+    assert sessions.update("amy", lambda session: True) is None
+    assert "amy" not in sessions.sessions
+    assert sessions.get("amy") is None
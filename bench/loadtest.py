@@ -0,0 +1,349 @@
+"""Load test the API with a synthetic population of players
+
+Starts api/api.py (without the HTTPS redirect) on a throwaway database
+and an OpenTDB stand-in, signs up a seeded population, then runs each
+scenario and prints latency percentiles and requests per second per
+endpoint as JSON. Run from the repository root:
+
+    python bench/loadtest.py --users 50 --concurrency 20 --duration 10
+    python bench/loadtest.py --scenarios quiz infinite --output run.json
+    python bench/loadtest.py --url http://127.0.0.1:5000  # already running
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import subprocess
+import threading
+import argparse
+import tempfile
+import random
+import time
+import json
+import sys
+import os
+import requests
+
+API_DIR = Path(Path(__file__).parent.parent, "api")
+sys.path.insert(0, str(API_DIR))
+
+from src import shuffle  # noqa: E402
+
+TEAMS = ["ngata", "rutherford", "britten", "blake", "cooper", "sheppard"]
+SCENARIOS = ["login", "quiz", "infinite", "leaderboard"]
+# answers sent as where they were shown, or as their text like older
+# clients
+ANSWER_MODES = ["index", "text"]
+
+# the quiz every player plays in the quiz scenario
+QUIZ_QUESTIONS = 20
+ANSWER_BATCH = 10
+# infinite quiz played in the infinite scenario
+INFINITE_QUIZ = {"category": 9, "difficulty": "easy",
+                 "type": "multiple", "lives": 3}
+# questions left before asking for more, as the client does
+INFINITE_LOW = 10
+
+
+class Recorder:
+    """Latencies and status codes of every request, by endpoint"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.statuses = {}
+
+    def record(self, endpoint: str, latency: float, status) -> None:
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(latency)
+            codes = self.statuses.setdefault(endpoint, {})
+            codes[str(status)] = codes.get(str(status), 0) + 1
+
+    def report(self, elapsed: float) -> dict:
+        """Percentiles in milliseconds and requests per second"""
+        endpoints = {}
+        total = 0
+        for endpoint, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            total += len(latencies)
+            endpoints[endpoint] = {
+                "requests": len(latencies),
+                "rps": round(len(latencies) / elapsed, 2),
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "max": round(latencies[-1] * 1000, 2),
+                "status": self.statuses[endpoint],
+            }
+        return {"seconds": round(elapsed, 2), "requests": total,
+                "rps": round(total / elapsed, 2), "endpoints": endpoints}
+
+
+def percentile(latencies: list, percent: float) -> float:
+    """Nearest-rank percentile of sorted latencies, in milliseconds"""
+    rank = max(0, min(len(latencies) - 1,
+                      int(round(percent / 100 * len(latencies))) - 1))
+    return round(latencies[rank] * 1000, 2)
+
+
+class Player:
+    """One synthetic player with their own connection"""
+
+    def __init__(self, url: str, name: str, password: str, team: str,
+                 seed: int, recorder: Recorder,
+                 answers: str = "index") -> None:
+        self.url = url
+        self.name = name
+        self.password = password
+        self.team = team
+        self.random = random.Random(seed)
+        self.recorder = recorder
+        self.by_index = answers == "index"
+        self.session = requests.Session()
+        self.api_key = None
+
+    def call(self, method: str, route: str, data: dict = None) -> dict:
+        """Timed request to the API"""
+        start = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, f"{self.url}/{route}",
+                data=json.dumps(data) if data is not None else None,
+                headers={"X-API-Key": self.api_key or "",
+                         "Content-Type": "application/json"},
+                timeout=30,
+            )
+            status, body = response.status_code, response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            status, body = type(e).__name__, {}
+        self.recorder.record(route, time.perf_counter() - start, status)
+        return body
+
+    def sign_up(self) -> None:
+        body = self.call("POST", "signup", {"name": self.name,
+                                            "password": self.password,
+                                            "team": self.team})
+        self.api_key = body.get("api_key")
+        # already signed up by an earlier run against the same server
+        if self.api_key is None:
+            self.login()
+
+    def login(self) -> None:
+        body = self.call("POST", "login", {"name": self.name,
+                                           "password": self.password})
+        self.api_key = body.get("api_key", self.api_key)
+
+    def quiz(self) -> None:
+        """Play a whole competitive quiz, answering in batches"""
+        quiz = synthetic_quiz(self.random.randrange(1000))
+        name = f"quiz-{self.random.randrange(5)}"
+        body = self.call("POST", "start_quiz",
+                         {"quiz_name": name, "quiz": quiz})
+
+        answers = [self.answer(question) for question in quiz["results"]]
+        # where each answer is shown for the seed the server handed out
+        if self.by_index and "seed" in body:
+            answers = [
+                shuffle.options(body["seed"], position, question).index(
+                    selected)
+                for position, (question, selected)
+                in enumerate(zip(quiz["results"], answers))
+            ]
+        for start in range(0, len(answers), ANSWER_BATCH):
+            self.call("POST", "answer_quiz_batch", {
+                "quiz_name": name,
+                "answers": answers[start:start + ANSWER_BATCH],
+            })
+
+    def answer(self, question: dict) -> str:
+        # right about two thirds of the time
+        if self.random.random() < 0.66:
+            return question["correct_answer"]
+        return self.random.choice(question["incorrect_answers"])
+
+    def infinite(self) -> None:
+        """Play an infinite quiz until out of lives, expanding as it goes"""
+        body = self.call("POST", "start_infinite_quiz", INFINITE_QUIZ)
+        questions = body.get("questions", [])
+        # newer clients say which question and session they mean
+        session = ({"session": body["session"]} if "session" in body
+                   else {})
+        while questions:
+            question = questions.pop(0)
+            selected = self.random.randrange(len(question["options"]))
+            answer = {"id": question["id"], "selected": selected}
+            if not self.by_index:
+                answer = {"selected": question["options"][selected]}
+            body = self.call("POST", "answer_infinite_quiz", answer)
+            if body.get("lives", 0) <= 0:
+                return
+            if len(questions) < INFINITE_LOW:
+                body = self.call("POST", "expand_infinite_quiz", session)
+                questions.extend(body.get("questions", []))
+
+    def leaderboard(self) -> None:
+        """Poll the leaderboard and score like an idle client"""
+        self.call("GET", "render_leaderboard")
+        self.call("GET", "get_score")
+
+
+def synthetic_quiz(seed: int) -> dict:
+    """A quiz pack in the OpenTDB format, the same for the same seed"""
+    rng = random.Random(seed)
+    results = []
+    for _ in range(QUIZ_QUESTIONS):
+        number = rng.randrange(10000)
+        results.append({
+            "type": "multiple",
+            "difficulty": rng.choice(["easy", "medium", "hard"]),
+            "category": "General Knowledge",
+            "question": f"Benchmark question {number}?",
+            "correct_answer": f"Right {number}",
+            "incorrect_answers": [f"Wrong {number} {j}" for j in range(3)],
+        })
+    return {"response_code": 0, "results": results}
+
+
+def population(url: str, users: int, seed: int, recorder: Recorder,
+               answers: str = "index") -> list:
+    """The same players, names and teams for the same seed"""
+    rng = random.Random(seed)
+    return [
+        Player(url, f"bench{seed}-{i:05}", f"password-{rng.random():.8f}",
+               rng.choice(TEAMS), rng.randrange(2 ** 32), recorder, answers)
+        for i in range(users)
+    ]
+
+
+def run(players: list, action: str, concurrency: int,
+        duration: float = None) -> float:
+    """Have the players repeat an action, giving back the time taken
+
+            Parameters:
+                    players (list): Players, shared between the workers
+                    action (str): Player method to call
+                    concurrency (int): Players acting at once
+                    duration (float): Seconds to keep going for, once
+                            through every player if not given
+    """
+    start = time.perf_counter()
+    stop = start + duration if duration else None
+
+    def worker(index: int) -> None:
+        # each worker plays its own share of the players in turn
+        mine = players[index::concurrency]
+        while mine:
+            for player in mine:
+                getattr(player, action)()
+                if stop is not None and time.perf_counter() >= stop:
+                    return
+            if stop is None:
+                return
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(worker, range(min(concurrency, len(players)))))
+    return time.perf_counter() - start
+
+
+def wait_until_up(url: str, process: subprocess.Popen,
+                  timeout: float = 30) -> None:
+    """Block until the API answers"""
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError("api.py exited while starting")
+        try:
+            requests.get(f"{url}/render_leaderboard", timeout=1)
+            return
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"api.py did not start within {timeout} seconds")
+
+
+def start_servers(port: int, asgi: bool) -> (list, str):
+    """Start the OpenTDB stand-in and api.py on a throwaway database"""
+    directory = tempfile.mkdtemp(prefix="quizzy-bench-")
+    env = os.environ | {
+        "QUIZZY_DB": str(Path(directory, "quizzy.db")),
+        "OPENTDB_URL": f"http://127.0.0.1:{port + 1}/api.php",
+    }
+    log = open(Path(directory, "api.log"), "w")
+
+    stub = subprocess.Popen(
+        [sys.executable, "-m", "src.opentdb_stub", "--port", str(port + 1)],
+        cwd=API_DIR, stdout=log, stderr=subprocess.STDOUT,
+    )
+    command = [sys.executable, "api.py", "--port", str(port),
+               "--no-https-redirect"]
+    if asgi:
+        command.append("--asgi")
+    api = subprocess.Popen(command, cwd=API_DIR, env=env,
+                           stdout=log, stderr=subprocess.STDOUT)
+    return [api, stub], directory
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", type=str, default=None,
+                        help="Test an API that is already running instead.")
+    parser.add_argument("--port", type=int, default=5100,
+                        help="Port to start api.py on, the OpenTDB "
+                        "stand-in uses the next one.")
+    parser.add_argument("--asgi", action="store_true",
+                        help="Start the ASGI version of the API.")
+    parser.add_argument("--users", type=int, default=50,
+                        help="Players to sign up.")
+    parser.add_argument("--concurrency", type=int, default=20,
+                        help="Players making requests at once.")
+    parser.add_argument("--duration", type=float, default=10,
+                        help="Seconds to run each scenario for.")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed for the population and their answers.")
+    parser.add_argument("--answers", choices=ANSWER_MODES, default="index",
+                        help="Send answers as where they were shown or as "
+                        "their text.")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS,
+                        default=SCENARIOS, help="Scenarios to run.")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Write the results to a file as well.")
+    args = parser.parse_args()
+
+    processes = []
+    url = args.url
+    if url is None:
+        processes, directory = start_servers(args.port, args.asgi)
+        url = f"http://127.0.0.1:{args.port}"
+        print(f"api.py log and database in {directory}", file=sys.stderr)
+
+    results = {"config": {key: value for key, value in vars(args).items()
+                          if key != "output"} | {"url": url},
+               "scenarios": {}}
+    try:
+        wait_until_up(url, processes[0] if processes else None)
+
+        # mass sign up, which also creates everyone for the scenarios
+        recorder = Recorder()
+        players = population(url, args.users, args.seed, recorder,
+                             args.answers)
+        elapsed = run(players, "sign_up", args.concurrency)
+        results["scenarios"]["signup"] = recorder.report(elapsed)
+
+        for scenario in args.scenarios:
+            print(f"running {scenario}", file=sys.stderr)
+            recorder = Recorder()
+            for player in players:
+                player.recorder = recorder
+            elapsed = run(players, scenario, args.concurrency, args.duration)
+            results["scenarios"][scenario] = recorder.report(elapsed)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    output = json.dumps(results, indent=4)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
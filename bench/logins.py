@@ -0,0 +1,75 @@
+"""Logins per second with passwords hashed inline, in the pool and cached
+
+Run from the repository root:
+
+    python bench/logins.py --users 30
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse
+import tempfile
+import time
+import json
+import sys
+
+sys.path.insert(0, str(Path(Path(__file__).parent.parent, "api")))
+
+from src import database, hashing, server  # noqa: E402
+
+
+def storm(users: list, threads: int) -> float:
+    """Log every user in at once, giving back logins per second"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        results = list(executor.map(
+            lambda name: server.login(name, "password")[1], users))
+    elapsed = time.perf_counter() - start
+    assert all(results), "a login failed"
+    return len(users) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=30,
+                        help="Users logging in at once.")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Request threads, one per user by default.")
+    parser.add_argument("--workers", type=int, default=hashing.HASH_WORKERS,
+                        help="Hashing processes in the pool.")
+    args = parser.parse_args()
+    threads = args.threads or args.users
+
+    # a throwaway database with a class of users
+    database.DATABASE_DIR = Path(tempfile.mkdtemp(), "quizzy.db")
+    database.init_db()
+    users = [f"student{i}" for i in range(args.users)]
+    for name in users:
+        server.signUp({"name": name, "password": "password",
+                       "team": "ngata", "api_key": name})
+
+    results = {"users": args.users, "threads": threads,
+               "workers": args.workers}
+
+    # before, every hash on the request thread
+    hashing.pool = hashing.HashPool(workers=0)
+    hashing.verified_logins = hashing.VerifiedLogins(ttl=0)
+    results["inline"] = storm(users, threads)
+
+    # after, hashed in the process pool
+    hashing.pool = hashing.HashPool(workers=args.workers)
+    hashing.pool.start()
+    results["pool"] = storm(users, threads)
+
+    # the same users logging in again while still verified
+    hashing.verified_logins = hashing.VerifiedLogins()
+    storm(users, threads)
+    results["pool_verified"] = storm(users, threads)
+    hashing.pool.stop()
+
+    print(json.dumps({key: round(value, 2) if isinstance(value, float)
+                      else value for key, value in results.items()},
+                     indent=4))
+
+
+if __name__ == "__main__":
+    main()
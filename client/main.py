@@ -10,12 +10,17 @@ def main():
         default="http://quizzy.pythonanywhere.com",
         help="Set the back-end API route to a different route such as localhost.",
     )
+    parser.add_argument(
+        "--dev",
+        action="store_true",
+        help="Reload stylesheets from styles/ as they are edited.",
+    )
     args = parser.parse_args()
 
     if args.server == "local":
         args.server = "http://127.0.0.1:5000"
 
-    load_ui(args.server)
+    load_ui(args.server, args.dev)
 
 
 if __name__ == "__main__":
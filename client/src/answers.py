@@ -0,0 +1,117 @@
+from functools import partial
+from PyQt5.QtCore import QObject, pyqtSignal
+from src.normalize import SCHEMA_VERSION
+from src import shuffle
+
+# answers sent to the server at once in competitive mode
+ANSWER_BATCH = 10
+
+
+class AnswerQueue(QObject):
+    """Answers to one go at a competitive quiz, sent to the server a batch
+    at a time"""
+    started = pyqtSignal(object)
+    graded = pyqtSignal(int)
+    failed = pyqtSignal(object)
+
+    def __init__(self, network, title: str, questions,
+                 batch: int = ANSWER_BATCH, parent=None) -> None:
+        super().__init__(parent)
+        self.network = network
+        self.title = title
+        self.questions = questions
+        self.batch = batch
+        # answers not sent yet, as their place in the quiz and the answer
+        self.pending = []
+        self.synced = False
+        self.rejected = False
+        # only one batch out at a time, so they reach the server in order
+        self.sending = False
+        # every answer is in, send what is left whatever its size
+        self.finished = False
+        # seed the server shows answers in order by, once it has replied
+        self.seed = None
+
+    def start(self) -> None:
+        """Start the quiz on the server in the order it will be played"""
+        quiz = {"schema_version": SCHEMA_VERSION,
+                "results": list(self.questions)}
+        self.network.post("start_quiz", {"quiz_name": self.title,
+                                         "quiz": quiz},
+                          on_result=self._started,
+                          on_error=self._start_failed)
+
+    def add(self, position: int, selected: str) -> None:
+        """Queue an answer, sending a batch once there are enough"""
+        # the server never started the quiz, so nothing is graded
+        if self.rejected:
+            return
+        self.pending.append((position, selected))
+        if len(self.pending) >= self.batch:
+            self.send()
+
+    def finish(self) -> None:
+        """Send everything answered, the player is done with the quiz"""
+        self.finished = True
+        self.send()
+
+    def send(self) -> None:
+        """Send the answers given so far to be graded in one go"""
+        if self.sending or not self.synced or not self.pending:
+            return
+
+        batch, self.pending = self.pending, []
+        self.sending = True
+        # where the batch starts, so one sent again isn't graded twice
+        data = {"quiz_name": self.title, "start": batch[0][0],
+                "answers": [self._sent_answer(position, selected)
+                            for position, selected in batch]}
+        self.network.post("answer_quiz_batch", data,
+                          on_result=partial(self._graded, batch),
+                          on_error=partial(self._failed, batch))
+
+    def _sent_answer(self, position: int, selected: str) -> int or str:
+        """An answer as sent to the server, where it was shown if the
+        server handed out a seed"""
+        if self.seed is None:
+            return selected
+        # the order the server grades by, whatever order it was shown in
+        options = shuffle.options(self.seed, position,
+                                  self.questions[position])
+        return options.index(selected)
+
+    def _started(self, response: dict) -> None:
+        """Quiz was started on the server, answers can be sent"""
+        if "status" not in response:
+            self._start_failed(response["error"])
+            return
+        self.synced = True
+        self.seed = response.get("seed")
+        self.started.emit(self.seed)
+
+        # send whatever was answered while waiting
+        if self.finished or len(self.pending) >= self.batch:
+            self.send()
+
+    def _start_failed(self, error) -> None:
+        """Quiz could not be started on the server"""
+        self.rejected = True
+        self.pending = []
+        self.failed.emit(error)
+
+    def _graded(self, batch: list, response: dict) -> None:
+        """Server graded a batch of answers"""
+        self.sending = False
+        if "status" not in response:
+            self._failed(batch, response["error"])
+            return
+        self.graded.emit(response["points"])
+
+        # answers given while the batch was out
+        if self.finished or len(self.pending) >= self.batch:
+            self.send()
+
+    def _failed(self, batch: list, error) -> None:
+        """Batch of answers could not be sent, keep them for the next one"""
+        self.sending = False
+        self.pending = batch + self.pending
@@ -0,0 +1,93 @@
+from pathlib import Path
+import weakref
+from PyQt5 import sip
+from PyQt5.QtCore import QFileSystemWatcher, QObject, pyqtSignal
+from PyQt5.QtGui import QFontDatabase, QIcon, QPixmap
+
+ASSETS_DIR = Path(__file__).parent
+STYLES_DIR = Path(ASSETS_DIR, "styles")
+FONTS_DIR = Path(ASSETS_DIR, "fonts")
+IMAGES = ["home.png", "logo.png", "wallpaper.jpg"]
+
+
+class Assets(QObject):
+    """Stylesheets, fonts and images, read from disk once"""
+    changed = pyqtSignal(str)
+
+    def __init__(self, watch: bool = False, parent=None) -> None:
+        super().__init__(parent)
+        self.styles = {}
+        for path in STYLES_DIR.glob("*.css"):
+            self._read(path)
+
+        for path in FONTS_DIR.glob("*.otf"):
+            QFontDatabase.addApplicationFont(str(path))
+
+        self.pixmaps = {name: QPixmap(str(Path(ASSETS_DIR, name)))
+                        for name in IMAGES}
+        self.icons = {}
+
+        # widgets and the stylesheet they were given, to restyle on reload
+        self.styled = weakref.WeakKeyDictionary()
+        self.watcher = None
+        if watch:
+            self.watcher = QFileSystemWatcher(
+                [str(path) for path in STYLES_DIR.glob("*.css")], self)
+            self.watcher.addPath(str(STYLES_DIR))
+            self.watcher.fileChanged.connect(self._reload)
+            self.watcher.directoryChanged.connect(self._rewatch)
+
+    def style(self, name: str) -> str:
+        """Stylesheet text of a file in styles/"""
+        return self.styles[name]
+
+    def pixmap(self, name: str) -> QPixmap:
+        """Image shipped next to the UI"""
+        return self.pixmaps[name]
+
+    def icon(self, name: str) -> QIcon:
+        """Icon made from an image, made once"""
+        if name not in self.icons:
+            self.icons[name] = QIcon(self.pixmaps[name])
+        return self.icons[name]
+
+    def apply(self, widget, name: str):
+        """Style a widget with a stylesheet, kept up to date in dev mode
+
+                Parameters:
+                        widget (QWidget): Widget to style
+                        name (str): File name of the stylesheet in styles/
+        """
+        widget.setStyleSheet(self.styles[name])
+        if self.watcher is not None:
+            self.styled[widget] = name
+        return widget
+
+    def _read(self, path: Path) -> None:
+        with open(path, "r") as f:
+            self.styles[path.name] = f.read()
+
+    def _reload(self, path: str) -> None:
+        """A stylesheet was edited, restyle every widget using it"""
+        path = Path(path)
+        try:
+            self._read(path)
+        except OSError:
+            # replaced rather than written, picked up by _rewatch
+            return
+        # a replaced file is dropped from the watcher, watch the new one
+        if str(path) not in self.watcher.files():
+            self.watcher.addPath(str(path))
+
+        for widget, name in list(self.styled.items()):
+            if name == path.name and not sip.isdeleted(widget):
+                widget.setStyleSheet(self.styles[name])
+        self.changed.emit(path.name)
+
+    def _rewatch(self, directory: str) -> None:
+        """Watch stylesheets again after an editor saved by replacing them"""
+        watched = self.watcher.files()
+        for path in STYLES_DIR.glob("*.css"):
+            if str(path) not in watched:
+                self.watcher.addPath(str(path))
+                self._reload(str(path))
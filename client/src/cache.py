@@ -0,0 +1,78 @@
+from collections import OrderedDict
+from pathlib import Path
+from hashlib import sha256
+import threading
+import time
+import json
+import os
+
+# most the cache may take up on disk
+MAX_BYTES = 20 * 1024 * 1024
+
+
+def cache_key(params: dict) -> str:
+    """Hash of the normalized query, the same however it was written"""
+    normalized = {str(key): str(value) for key, value in params.items()
+                  if key != "token"}
+    return sha256(json.dumps(normalized, sort_keys=True)
+                  .encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Size-bounded least recently used cache of responses on disk"""
+
+    def __init__(self, directory: Path, max_bytes: int = MAX_BYTES) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        # sizes of the entries, least recently used first
+        files = [entry for entry in os.scandir(directory)
+                 if entry.name.endswith(".json")]
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        self.entries = OrderedDict(
+            (entry.name[:-5], entry.stat().st_size) for entry in files)
+        self.size = sum(self.entries.values())
+
+    def get(self, params: dict) -> dict or None:
+        """Get the last response cached for a query"""
+        key = cache_key(params)
+        path = Path(self.directory, key + ".json")
+        try:
+            with open(path, "r") as f:
+                entry = json.loads(f.read())
+            # mark as recently used, on disk too for the next start up
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+        return entry["data"]
+
+    def put(self, params: dict, data: dict) -> None:
+        """Cache a response, evicting the least recently used over the limit"""
+        key = cache_key(params)
+        body = json.dumps({"stored": time.time(),
+                           "data": data}).encode("utf-8")
+
+        # write then swap in so a half written entry is never read
+        path = Path(self.directory, key + ".json")
+        temp = Path(self.directory, key + ".tmp")
+        with open(temp, "wb") as f:
+            f.write(body)
+        os.replace(temp, path)
+
+        with self.lock:
+            self.size += len(body) - self.entries.pop(key, 0)
+            self.entries[key] = len(body)
+
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                old, size = self.entries.popitem(last=False)
+                self.size -= size
+                try:
+                    os.remove(Path(self.directory, old + ".json"))
+                except OSError:
+                    pass
@@ -0,0 +1,284 @@
+# streams a teacher's question bank into a binary pack, from the client
+# directory run: python -m src.importer bank.csv --profile name --name pack
+from pathlib import Path
+import unicodedata
+import argparse
+import hashlib
+import json
+import csv
+import io
+import os
+import re
+from PyQt5.QtCore import QObject, pyqtSignal
+from src import packfile
+from src.packs import PackIndex
+from src.normalize import canonical
+
+FORMATS = ["csv", "jsonl", "opentdb"]
+EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl",
+              ".json": "opentdb"}
+TYPES = ["multiple", "boolean"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+# questions between progress reports
+CHUNK_SIZE = 1000
+# bytes read from the bank at a time
+READ_SIZE = 64 * 1024
+# longest a single question may be, so a broken bank isn't read whole
+MAX_RECORD = 1024 * 1024
+# invalid records described in the result, the rest are only counted
+MAX_ERRORS = 20
+
+_RESULTS = re.compile(r'"results"\s*:\s*\[')
+_WHITESPACE = re.compile(r"[\s,]*")
+
+
+class ImportProgress(QObject):
+    """Progress of an import, emitted from the thread running it"""
+    changed = pyqtSignal(int, int)
+
+
+def read_csv(text: io.TextIOBase):
+    """Records of a CSV bank with a header row"""
+    # incorrect answers are in every column starting with incorrect,
+    # one answer each or several separated by |
+    reader = csv.DictReader(text)
+    reader.fieldnames = [name.strip().lower().replace(" ", "_")
+                         for name in reader.fieldnames or []]
+    for row in reader:
+        incorrect = []
+        for key, value in row.items():
+            if key and key.startswith("incorrect") and value:
+                incorrect.extend(value.split("|"))
+        yield f"line {reader.line_num}", row | {
+            "incorrect_answers": incorrect}
+
+
+def read_jsonl(text: io.TextIOBase):
+    """Records of a bank with one JSON question per line"""
+    for number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            yield f"line {number}", json.loads(line)
+        except ValueError as e:
+            yield f"line {number}", e
+
+
+def read_opentdb(text: io.TextIOBase):
+    """Records of an OpenTDB JSON bank, one question decoded at a time"""
+    decoder = json.JSONDecoder()
+
+    # find the start of the questions, or a bare list of them
+    buffer = text.read(READ_SIZE)
+    if buffer.lstrip().startswith("["):
+        position = buffer.index("[") + 1
+    else:
+        while (match := _RESULTS.search(buffer)) is None:
+            chunk = text.read(READ_SIZE)
+            if not chunk:
+                raise ValueError("No results list in the bank")
+            # keep enough to find "results" split over two reads
+            buffer = buffer[-64:] + chunk
+        position = match.end()
+
+    def more() -> bool:
+        nonlocal buffer, position
+        chunk = text.read(READ_SIZE)
+        # only keep what hasn't been decoded yet
+        buffer = buffer[position:] + chunk
+        position = 0
+        return bool(chunk)
+
+    number = 0
+    while True:
+        position = _WHITESPACE.match(buffer, position).end()
+        if position == len(buffer):
+            if not more():
+                raise ValueError("The bank ended part way through")
+            continue
+        if buffer[position] == "]":
+            return
+
+        number += 1
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except ValueError:
+            # the question was cut off at the end of the read
+            if len(buffer) - position < MAX_RECORD and more():
+                number -= 1
+                continue
+            raise ValueError(f"question {number} could not be read")
+        position = end
+        yield f"question {number}", record
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl, "opentdb": read_opentdb}
+
+
+def _text(value) -> str:
+    """One line of canonical text"""
+    if value is None:
+        return ""
+    return " ".join(canonical(str(value)).split())
+
+
+def normalize(record: dict, category: str = "") -> dict:
+    """Check a record and give it back as an OpenTDB question
+
+            Parameters:
+                    record (dict): The record as read from the bank
+                    category (str): Category for records without one
+    """
+    if not isinstance(record, dict):
+        raise ValueError("not a question")
+
+    question = _text(record.get("question"))
+    correct = _text(record.get("correct_answer"))
+    incorrect = record.get("incorrect_answers") or []
+    if isinstance(incorrect, str):
+        incorrect = incorrect.split("|")
+    if not isinstance(incorrect, list):
+        raise ValueError("incorrect_answers is not a list")
+    incorrect = [answer for answer in map(_text, incorrect) if answer]
+
+    if not question:
+        raise ValueError("missing question")
+    if not correct:
+        raise ValueError("missing correct_answer")
+    if not incorrect:
+        raise ValueError("missing incorrect_answers")
+    if correct in incorrect or len(set(incorrect)) != len(incorrect):
+        raise ValueError("answers are repeated")
+
+    kind = _text(record.get("type")).lower()
+    if not kind:
+        kind = ("boolean" if sorted([correct] + incorrect)
+                == ["False", "True"] else "multiple")
+    if kind not in TYPES:
+        raise ValueError(f"unknown type {kind}")
+
+    difficulty = _text(record.get("difficulty")).lower() or "medium"
+    if difficulty not in DIFFICULTIES:
+        raise ValueError(f"unknown difficulty {difficulty}")
+
+    return {
+        "type": kind,
+        "difficulty": difficulty,
+        "category": _text(record.get("category")) or category,
+        "question": question,
+        "correct_answer": correct,
+        "incorrect_answers": incorrect,
+    }
+
+
+def fingerprint(question: dict) -> bytes:
+    """Hash of a question's text, the same however it was written"""
+    text = "\0".join(
+        " ".join(question[key].casefold().split())
+        for key in ("question", "correct_answer")
+    )
+    return hashlib.blake2b(unicodedata.normalize("NFKC", text).encode(),
+                           digest_size=16).digest()
+
+
+def import_bank(path: Path, source: Path, name: str, format: str = None,
+                category: str = "", progress=None) -> dict:
+    """Stream a question bank into a local binary pack
+
+            Parameters:
+                    path (Path): The profile to import into
+                    source (Path): The bank, CSV, JSON lines or OpenTDB
+                    name (str): Name of the new pack
+                    format (str): Format of the bank, by its extension if
+                            not given
+                    category (str): Category of questions without one
+                    progress (Callable): Given the bytes read so far and
+                            the size of the bank as it goes
+    """
+    source = Path(source)
+    format = format or EXTENSIONS.get(source.suffix.lower())
+    if format not in READERS:
+        raise ValueError(f"Unknown question bank format {source.suffix}")
+
+    local = Path(path, "local")
+    if any(Path(local, name + suffix).exists()
+           for suffix in (packfile.SUFFIX, ".json")):
+        raise FileExistsError(f"A quiz called {name} already exists")
+
+    total = os.path.getsize(source)
+    result = {"name": name, "imported": 0, "duplicates": 0,
+              "invalid": 0, "errors": []}
+    seen = set()
+
+    with open(source, "rb") as raw, \
+            packfile.PackWriter(Path(local, name + packfile.SUFFIX),
+                                {"category": category}) as writer:
+        text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+        records = READERS[format](text)
+        for count, (where, record) in enumerate(records, 1):
+            if progress is not None and count % CHUNK_SIZE == 0:
+                progress(raw.tell(), total)
+
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                question = normalize(record, category)
+            except ValueError as e:
+                result["invalid"] += 1
+                if len(result["errors"]) < MAX_ERRORS:
+                    result["errors"].append(f"{where}: {e}")
+                continue
+
+            key = fingerprint(question)
+            if key in seen:
+                result["duplicates"] += 1
+                continue
+            seen.add(key)
+
+            writer.add(question)
+            result["imported"] += 1
+            if not writer.meta["category"]:
+                writer.meta["category"] = question["category"]
+
+        if not result["imported"]:
+            raise ValueError(f"No valid questions in {source.name}")
+
+    if progress is not None:
+        progress(total, total)
+
+    # show the new pack on the quizzes page
+    PackIndex(path).update(name, packfile.SUFFIX)
+    return result
+
+
+def main() -> None:
+    from src.main import PROFILES_DIR
+
+    parser = argparse.ArgumentParser(
+        description="Import a question bank into a profile's quizzes.")
+    parser.add_argument("source", type=Path,
+                        help="CSV, JSON lines or OpenTDB JSON bank.")
+    parser.add_argument("--profile", type=str, required=True,
+                        help="Profile to import into.")
+    parser.add_argument("--name", type=str, default=None,
+                        help="Name of the new quiz, the file's by default.")
+    parser.add_argument("--format", type=str, choices=FORMATS, default=None,
+                        help="Format of the bank, by its extension by "
+                        "default.")
+    parser.add_argument("--category", type=str, default="",
+                        help="Category of questions without one.")
+    args = parser.parse_args()
+
+    def report(done: int, total: int) -> None:
+        print(f"\r{done / max(total, 1):.0%}", end="", flush=True)
+
+    result = import_bank(Path(PROFILES_DIR, args.profile), args.source,
+                         args.name or args.source.stem, args.format,
+                         args.category, report)
+    print()
+    print(json.dumps(result, indent=4))
+
+
+if __name__ == "__main__":
+    main()
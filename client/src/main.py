@@ -4,6 +4,10 @@ from hashlib import sha256
 import requests
 import json
 import os
+from src.opentdb import FetchScheduler
+from src.cache import ResponseCache
+from src.packs import PackIndex
+from src.normalize import canonical_quiz
 
 
 with open(Path(Path(__file__).parent, "opentdb.json"), "r") as f:
@@ -12,6 +16,12 @@ with open(Path(Path(__file__).parent, "opentdb.json"), "r") as f:
 DEFAULT_DIR = Path(__file__).parent
 PROFILES_DIR = Path(DEFAULT_DIR, "profiles")
 
+# one pooled session so connections are kept alive between requests
+session = requests.Session()
+# every question fetch from OpenTDB goes through here, cached on disk
+scheduler = FetchScheduler(
+    session, cache=ResponseCache(Path(PROFILES_DIR, ".cache")))
+
 
 class Profile:
     """Profile class"""
@@ -54,7 +64,7 @@ def signUp(
 
     try:
         # try signing up as  anew user
-        response = requests.post(
+        response = session.post(
             f"{api}/signup", data=json.dumps(data), headers=headers
         )
         api_key = response.json()["api_key"]
@@ -81,13 +91,15 @@ def signUp(
     )
 
 
-def login(name: str, password: str) -> (dict, str) or (None, str):
+def login(
+    name: str, password: str, api: str = "http://127.0.0.1:5000"
+) -> (dict, str) or (None, str):
+    """Log in a user"""
     headers = {"Content-Type": "application/json"}
     data = {"name": name, "password": password}
-    api = "http://127.0.0.1:5000"
     try:
-        response = requests.post(f"{api}/login",
-                                 data=json.dumps(data), headers=headers)
+        response = session.post(f"{api}/login",
+                                data=json.dumps(data), headers=headers)
         api_key = response.json()["api_key"]
         online = True
     except requests.exceptions.ConnectionError:
@@ -138,18 +150,14 @@ def createQuiz(
         "type": OPENTDB_API["type"][type],
     }
 
-    url = "https://opentdb.com/api.php"
-    response = requests.get(url, params=params)
+    # rate limited and retried, raises if it still can't be fetched
+    js = scheduler.fetch(params)
+    # decode the text once here rather than every time it is shown
+    js = canonical_quiz(js | {"category": js["results"][0]["category"]})
 
-    if response.status_code == 200:
-        with open(Path(path, "local", name + ".json"), "w") as f:
-            js = response.json()
-            f.write(
-                json.dumps(js | {"category":
-                                 js["results"][0]["category"]}).replace(
-                    "Entertainment: ", ""
-                )
-            )
-            print("New Quiz pack created successfully!")
-    else:
-        print(f"Failed to fetch API. Status code: {response.status_code}")
+    with open(Path(path, "local", name + ".json"), "w") as f:
+        f.write(json.dumps(js).replace("Entertainment: ", ""))
+
+    # keep the quiz cards' index up to date
+    PackIndex(path).update(name)
+    print("New Quiz pack created successfully!")
@@ -0,0 +1,84 @@
+import json
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from src.main import session
+
+
+class WorkerSignals(QObject):
+    """Signals a worker uses to hand its result back to the GUI thread"""
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+
+
+class Worker(QRunnable):
+    """Runs a blocking function on the thread pool"""
+
+    def __init__(self, function, *args, **kwargs) -> None:
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+    def run(self) -> None:
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(result)
+
+
+class Network(QObject):
+    """Runs network calls off the GUI thread over one keep-alive session"""
+
+    def __init__(self, api: str, parent=None) -> None:
+        super().__init__(parent)
+        self.api = api
+        self.api_key = None
+        self.session = session
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(4)
+        # keep workers alive until their signals have been delivered
+        self.workers = set()
+
+    def run(self, function, *args, on_result=None, on_error=None,
+            **kwargs) -> None:
+        """Run any blocking function in the background
+
+                Parameters:
+                        function (Callable): function to run
+                        on_result (Callable): called with what it returns
+                        on_error (Callable): called with what it raises
+        """
+        worker = Worker(function, *args, **kwargs)
+        if on_result:
+            worker.signals.finished.connect(on_result)
+        if on_error:
+            worker.signals.failed.connect(on_error)
+        worker.signals.finished.connect(lambda _: self.workers.discard(worker))
+        worker.signals.failed.connect(lambda _: self.workers.discard(worker))
+
+        self.workers.add(worker)
+        self.pool.start(worker)
+
+    def get(self, route: str, on_result=None, on_error=None) -> None:
+        """GET a route of the back-end API, handing back its JSON"""
+        self.run(self.request, "GET", route,
+                 on_result=on_result, on_error=on_error)
+
+    def post(self, route: str, data: dict,
+             on_result=None, on_error=None) -> None:
+        """POST JSON to a route of the back-end API, handing back its JSON"""
+        self.run(self.request, "POST", route, data,
+                 on_result=on_result, on_error=on_error)
+
+    def request(self, method: str, route: str, data: dict = None) -> dict:
+        """Blocking request to the back-end API"""
+        headers = {"X-API-Key": self.api_key,
+                   "Content-Type": "application/json"}
+        response = self.session.request(
+            method, f"{self.api}/{route}",
+            data=json.dumps(data) if data is not None else None,
+            headers=headers, timeout=10,
+        )
+        return response.json()
@@ -0,0 +1,39 @@
+# question text is decoded and normalized once, when it comes in
+import unicodedata
+import html
+
+# version of the question text in a quiz pack, packs without one are
+# version 1, the HTML escaped text OpenTDB sends
+SCHEMA_VERSION = 2
+
+
+def canonical(text: str) -> str:
+    """Text with HTML entities decoded, in Unicode normal form C"""
+    return unicodedata.normalize("NFC", html.unescape(text))
+
+
+def canonical_question(question: dict) -> dict:
+    """A question with all of its text in canonical form"""
+    return question | {
+        key: canonical(question[key])
+        for key in ("category", "question", "correct_answer")
+        if isinstance(question.get(key), str)
+    } | {
+        "incorrect_answers": [canonical(answer) for answer
+                              in question.get("incorrect_answers", [])],
+    }
+
+
+def canonical_quiz(quiz: dict) -> dict:
+    """A quiz pack with every question in canonical form"""
+    if quiz.get("schema_version", 1) >= SCHEMA_VERSION:
+        return quiz
+    quiz = quiz | {
+        "schema_version": SCHEMA_VERSION,
+        "results": [canonical_question(question)
+                    for question in quiz.get("results", [])],
+    }
+    if isinstance(quiz.get("category"), str):
+        quiz["category"] = canonical(quiz["category"])
+    return quiz
+
@@ -0,0 +1,199 @@
+import threading
+import random
+import time
+import os
+import requests
+
+# OpenTDB, or a local stand-in such as the api's src/opentdb_stub.py
+OPENTDB_URL = os.environ.get("OPENTDB_URL", "https://opentdb.com/api.php")
+
+# OpenTDB allows one call every 5 seconds per IP
+FETCH_INTERVAL = 5.0
+
+
+class FetchError(Exception):
+    """OpenTDB could not give the questions asked for"""
+
+
+class TokenBucket:
+    """Rate limiter, blocks until a call is allowed"""
+
+    def __init__(self, rate: float, capacity: int = 1) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Wait for and take a token"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens
+                                  + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class _Call:
+    """A fetch in flight that others asking the same thing can wait on"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class FetchScheduler:
+    """Rate limited, retrying and coalescing fetches from OpenTDB"""
+
+    def __init__(
+        self,
+        session: requests.Session,
+        url: str = OPENTDB_URL,
+        interval: float = FETCH_INTERVAL,
+        retries: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        cache=None,
+    ) -> None:
+        self.session = session
+        self.cache = cache
+        self.url = url
+        self.bucket = TokenBucket(1 / interval)
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.token_lock = threading.Lock()
+        self.token = None
+
+    def fetch(self, params: dict) -> dict:
+        """Fetch new questions, from the cache only if OpenTDB can't be
+        reached
+
+                Parameters:
+                        params (dict): OpenTDB query parameters
+        """
+        try:
+            return self._fetch_shared(params)
+        except (requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout):
+            # offline, fall back to the last questions fetched for the
+            # same quiz however old
+            cached = self.cache.get(params) if self.cache else None
+            if cached is None:
+                raise
+            return cached
+
+    def _fetch_shared(self, params: dict) -> dict:
+        """Fetch questions, sharing one call with any identical fetch"""
+        key = tuple(sorted(params.items()))
+        with self.lock:
+            call = self.in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self.in_flight[key] = _Call()
+
+        # someone else is already fetching this, wait for theirs
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._fetch(params)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            call.done.set()
+        return call.result
+
+    def _fetch(self, params: dict) -> dict:
+        """Fetch with retries, backing off when told to slow down"""
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self._backoff(attempt - 1))
+            self.bucket.acquire()
+
+            try:
+                response = self.session.get(
+                    self.url, params=params | self._token(), timeout=10)
+                if response.status_code == 429 or response.status_code >= 500:
+                    error = FetchError(
+                        f"OpenTDB responded with {response.status_code}")
+                    continue
+                data = response.json()
+            except requests.exceptions.ConnectionError:
+                # offline, trying again won't help
+                raise
+            except (requests.exceptions.RequestException, ValueError) as e:
+                error = e
+                continue
+
+            code = data["response_code"]
+            if code == 0:
+                if self.cache:
+                    self.cache.put(params, data)
+                return data
+            elif code == 1:
+                raise FetchError("Not enough questions for that quiz, "
+                                 "try fewer questions")
+            elif code == 2:
+                raise FetchError("Invalid quiz settings")
+            elif code in (3, 4):
+                # token expired or every question seen, start a new one
+                self._reset_token(code == 4)
+                error = FetchError("Session token had run out")
+            else:
+                # rate limited
+                error = FetchError("OpenTDB is rate limiting requests")
+        raise error
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _token(self) -> dict:
+        """Session token so OpenTDB doesn't repeat questions"""
+        with self.token_lock:
+            if self.token is None:
+                try:
+                    response = self.session.get(
+                        self.url.replace("api.php", "api_token.php"),
+                        params={"command": "request"}, timeout=10,
+                    )
+                    self.token = response.json()["token"]
+                except (requests.exceptions.RequestException,
+                        ValueError, KeyError):
+                    # carry on without, questions may repeat
+                    return {}
+            return {"token": self.token}
+
+    def _reset_token(self, exhausted: bool) -> None:
+        """Reset a token that has seen every question, or drop it"""
+        with self.token_lock:
+            token, self.token = self.token, None
+        if exhausted and token is not None:
+            try:
+                self.session.get(
+                    self.url.replace("api.php", "api_token.php"),
+                    params={"command": "reset", "token": token}, timeout=10,
+                )
+                with self.token_lock:
+                    self.token = token
+            except requests.exceptions.RequestException:
+                pass
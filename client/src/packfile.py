@@ -0,0 +1,255 @@
+# binary quiz packs for banks too big to load whole, convert one with:
+# python -m src.packfile path/to/quiz.json
+from collections.abc import Sequence
+from collections import OrderedDict
+from pathlib import Path
+from array import array
+import argparse
+import struct
+import mmap
+import json
+import sys
+import os
+from src.normalize import (SCHEMA_VERSION, canonical, canonical_question,
+                           canonical_quiz)
+
+SUFFIX = ".qpk"
+MAGIC = b"QZPK"
+VERSION = 1
+
+# magic, version, reserved, question count, offset of the offset table
+# and length of the metadata that follows the table
+HEADER = struct.Struct("<4sHHIQI")
+OFFSET = struct.Struct("<Q")
+# each record is its length then the question as UTF-8 JSON
+LENGTH = struct.Struct("<I")
+# decoded questions kept by PackQuestions, the one shown and the next
+CACHED_QUESTIONS = 3
+
+
+class PackWriter:
+    """Writes a binary pack a question at a time, never holding them all"""
+    # questions added must already be in canonical form
+
+    def __init__(self, path: Path, meta: dict = None) -> None:
+        self.path = Path(path)
+        self.temp = self.path.with_name(self.path.name + ".tmp")
+        self.meta = dict(meta or {})
+        self.difficulty = {}
+        self.offsets = array("Q")
+
+        self.file = open(self.temp, "wb")
+        self.file.write(bytes(HEADER.size))
+        self.position = HEADER.size
+
+    def add(self, question: dict) -> None:
+        """Append a question to the end of the pack"""
+        record = json.dumps(question, ensure_ascii=False).encode("utf-8")
+        self.offsets.append(self.position)
+        self.file.write(LENGTH.pack(len(record)))
+        self.file.write(record)
+        self.position += LENGTH.size + len(record)
+
+        level = question.get("difficulty", "unknown")
+        self.difficulty[level] = self.difficulty.get(level, 0) + 1
+
+    def close(self) -> None:
+        """Write the offset table and header, then swap the pack in"""
+        if sys.byteorder == "big":
+            self.offsets.byteswap()
+        self.file.write(self.offsets.tobytes())
+
+        # summary for the quiz cards, read without touching a question
+        meta = json.dumps(self.meta | {"difficulty": self.difficulty,
+                                       "schema_version": SCHEMA_VERSION},
+                          ensure_ascii=False).encode("utf-8")
+        self.file.write(meta)
+
+        # the header goes in last, a half written pack is never valid
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, 0, len(self.offsets),
+                                    self.position, len(meta)))
+        self.file.close()
+        os.replace(self.temp, self.path)
+
+    def abort(self) -> None:
+        """Throw away a pack that couldn't be finished"""
+        self.file.close()
+        os.remove(self.temp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class PackFile:
+    """Binary pack opened with mmap, questions decoded one at a time"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, _, self.count, self.table, meta_length = (
+                HEADER.unpack_from(self.map))
+        except struct.error:
+            self.map.close()
+            raise ValueError(f"{self.path.name} is not a quiz pack")
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError(f"{self.path.name} is not a version "
+                             f"{VERSION} quiz pack")
+
+        start = self.table + self.count * OFFSET.size
+        self.meta = json.loads(self.map[start:start + meta_length])
+
+    def __len__(self) -> int:
+        return self.count
+
+    def question(self, index: int) -> dict:
+        """Decode a single question"""
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        offset, = OFFSET.unpack_from(self.map,
+                                     self.table + index * OFFSET.size)
+        length, = LENGTH.unpack_from(self.map, offset)
+        start = offset + LENGTH.size
+        return json.loads(self.map[start:start + length])
+
+    def close(self) -> None:
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class JsonPack:
+    """Quiz pack in the OpenTDB JSON format, read whole as it always was"""
+
+    def __init__(self, path: Path) -> None:
+        with open(path, "r") as f:
+            quiz = json.loads(f.read())
+
+        # older packs are normalized and saved the first time they open
+        if quiz.get("schema_version", 1) < SCHEMA_VERSION:
+            quiz = canonical_quiz(quiz)
+            write_json(path, quiz)
+
+        self.results = quiz.pop("results")
+        self.meta = quiz
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def question(self, index: int) -> dict:
+        return self.results[index]
+
+    def close(self) -> None:
+        pass
+
+
+class PackQuestions(Sequence):
+    """Questions of a pack in the order they are played, decoded on use"""
+
+    def __init__(self, pack, order: list) -> None:
+        self.pack = pack
+        self.order = order
+        # the same question comes back as the same dict, the question
+        # deck knows its next screen is ready by the question it was given
+        self.decoded = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __getitem__(self, index: int) -> dict:
+        position = self.order[index]
+        question = self.decoded.get(position)
+        if question is None:
+            question = self.pack.question(position)
+            self.decoded[position] = question
+            if len(self.decoded) > CACHED_QUESTIONS:
+                self.decoded.popitem(last=False)
+        else:
+            self.decoded.move_to_end(position)
+        return question
+
+
+def open_pack(local: Path, name: str):
+    """Open a local quiz pack, the binary one if it has been converted"""
+    path = Path(local, name + SUFFIX)
+    if not path.exists():
+        return JsonPack(Path(local, name + ".json"))
+
+    pack = PackFile(path)
+    if pack.meta.get("schema_version", 1) >= SCHEMA_VERSION:
+        return pack
+
+    # older packs are normalized and rewritten the first time they open
+    meta = {key: value for key, value in pack.meta.items()
+            if key not in ("difficulty", "schema_version")}
+    if isinstance(meta.get("category"), str):
+        meta["category"] = canonical(meta["category"])
+    writer = PackWriter(path, meta)
+    try:
+        for index in range(len(pack)):
+            writer.add(canonical_question(pack.question(index)))
+    except Exception:
+        writer.abort()
+        raise
+    finally:
+        pack.close()
+    writer.close()
+    return PackFile(path)
+
+
+def write_json(path: Path, quiz: dict) -> None:
+    """Save a JSON quiz pack, swapping it in once it is whole"""
+    temp = Path(path).with_name(Path(path).name + ".tmp")
+    with open(temp, "w") as f:
+        f.write(json.dumps(quiz))
+    os.replace(temp, path)
+
+
+def convert(source: Path, destination: Path = None) -> Path:
+    """Write an OpenTDB JSON quiz pack as a binary pack
+
+            Parameters:
+                    source (Path): The JSON pack, as written by createQuiz
+                    destination (Path): Where to write it, next to the
+                            JSON pack by default
+    """
+    source = Path(source)
+    destination = Path(destination or source.with_suffix(SUFFIX))
+    with open(source, "r") as f:
+        quiz = json.loads(f.read())
+
+    quiz = canonical_quiz(quiz)
+    results = quiz.pop("results")
+    with PackWriter(destination, quiz) as writer:
+        for question in results:
+            writer.add(question)
+    return destination
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Convert JSON quiz packs into binary packs.")
+    parser.add_argument("packs", nargs="+", type=Path,
+                        help="JSON quiz packs to convert.")
+    args = parser.parse_args()
+
+    for source in args.packs:
+        print(f"{source} -> {convert(source)}")
+
+
+if __name__ == "__main__":
+    main()
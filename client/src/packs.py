@@ -0,0 +1,113 @@
+from pathlib import Path
+import threading
+import json
+import os
+from src import packfile
+from src.normalize import SCHEMA_VERSION, canonical
+
+# kept next to user.json in each profile
+INDEX_NAME = "index.json"
+# converted binary packs are used over the JSON pack of the same name
+SUFFIXES = (packfile.SUFFIX, ".json")
+
+_lock = threading.Lock()
+
+
+def summarize(path: Path) -> dict:
+    """Read a quiz pack once for everything the quiz cards show"""
+    stat = os.stat(path)
+    # binary packs carry their summary, no question is decoded
+    if path.suffix == packfile.SUFFIX:
+        with packfile.PackFile(path) as pack:
+            meta, count = pack.meta, len(pack)
+        difficulty = meta.get("difficulty", {})
+    else:
+        with open(path, "r") as f:
+            meta = json.loads(f.read())
+        count = len(meta["results"])
+
+        difficulty = {}
+        for question in meta["results"]:
+            level = question.get("difficulty", "unknown")
+            difficulty[level] = difficulty.get(level, 0) + 1
+
+    return {
+        "name": path.stem,
+        # decoded here so the cards never have to
+        "category": canonical(meta.get("category", "")),
+        "questions": count,
+        "difficulty": difficulty,
+        "mtime": stat.st_mtime,
+        "size": stat.st_size,
+        "schema_version": SCHEMA_VERSION,
+    }
+
+
+class PackIndex:
+    """Summary of every local quiz pack of a profile, kept in one file"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.local = Path(path, "local")
+        self.index_path = Path(path, INDEX_NAME)
+
+    def entries(self) -> list:
+        """Every pack, only re-reading the ones changed since last time"""
+        with _lock:
+            index = self._load()
+            changed = False
+
+            files = {}
+            for entry in os.scandir(self.local):
+                name, suffix = os.path.splitext(entry.name)
+                if suffix not in SUFFIXES:
+                    continue
+                known = files.get(name)
+                if (known is None or SUFFIXES.index(suffix)
+                        < SUFFIXES.index(os.path.splitext(known.name)[1])):
+                    files[name] = entry
+
+            packs = {}
+            for name, entry in files.items():
+                stat = entry.stat()
+                known = index.get(name)
+
+                # trust the index while the file looks the same
+                if (known is not None and known["mtime"] == stat.st_mtime
+                        and known["size"] == stat.st_size
+                        and known.get("schema_version") == SCHEMA_VERSION):
+                    packs[name] = known
+                    continue
+
+                try:
+                    packs[name] = summarize(Path(entry.path))
+                except (OSError, ValueError, KeyError):
+                    continue
+                changed = True
+
+            # packs deleted since last time
+            if changed or len(packs) != len(index):
+                self._save(packs)
+
+        return sorted(packs.values(), key=lambda pack: pack["name"])
+
+    def update(self, name: str, suffix: str = ".json") -> None:
+        """Add or refresh one pack, after it has been written"""
+        with _lock:
+            index = self._load()
+            index[name] = summarize(Path(self.local, name + suffix))
+            self._save(index)
+
+    def _load(self) -> dict:
+        try:
+            with open(self.index_path, "r") as f:
+                return json.loads(f.read())
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, index: dict) -> None:
+        # write then swap in so a half written index is never read
+        temp = Path(self.path, INDEX_NAME + ".tmp")
+        with open(temp, "w") as f:
+            f.write(json.dumps(index))
+        os.replace(temp, self.index_path)
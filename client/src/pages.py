@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from PyQt5.QtCore import QObject
+from PyQt5.QtWidgets import QStackedLayout, QWidget
+
+# menu pages kept alive once built, the least recently shown is destroyed
+PAGE_CACHE_SIZE = 3
+
+
+class PageManager(QObject):
+    """Pages of a stacked layout, menus cached and quizzes thrown away"""
+
+    def __init__(self, layout: QStackedLayout, window: QWidget,
+                 size: int = PAGE_CACHE_SIZE, parent=None) -> None:
+        super().__init__(parent)
+        self.layout = layout
+        self.window = window
+        self.size = size
+        # the first page is home and is never removed, menu pages are
+        # kept by key, least recently shown first
+        self.pages = OrderedDict()
+        # the quiz being played, destroyed as soon as it is left
+        self.transient = None
+
+    def show(self, key: str, build, refresh=None) -> QWidget:
+        """Show a menu page, building it only if it isn't cached
+
+                Parameters:
+                        key (str): Name of the page
+                        build (Callable): Returns a new page
+                        refresh (Callable): Given the cached page to
+                                bring its data up to date
+        """
+        self._drop_transient()
+
+        page = self.pages.get(key)
+        if page is None:
+            page = build()
+            # the title the page was built with, put back on revisits
+            page.setWindowTitle(self.window.windowTitle())
+            self.layout.addWidget(page)
+            self.pages[key] = page
+        else:
+            self.pages.move_to_end(key)
+            self.window.setWindowTitle(page.windowTitle())
+            if refresh is not None:
+                refresh(page)
+
+        self.layout.setCurrentWidget(page)
+        self._evict()
+        return page
+
+    def push(self, page: QWidget) -> None:
+        """Show a page that is destroyed as soon as it is left"""
+        self._drop_transient()
+        self.transient = page
+        self.layout.addWidget(page)
+        self.layout.setCurrentWidget(page)
+
+    def home(self) -> None:
+        """Back to the first page, destroying any quiz page"""
+        self._drop_transient()
+        self.layout.setCurrentIndex(0)
+
+    def _evict(self) -> None:
+        while len(self.pages) > self.size:
+            self._destroy(self.pages.popitem(last=False)[1])
+
+    def _drop_transient(self) -> None:
+        if self.transient is not None:
+            self._destroy(self.transient)
+            self.transient = None
+
+    def _destroy(self, page: QWidget) -> None:
+        self.layout.removeWidget(page)
+        page.deleteLater()
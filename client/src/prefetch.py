@@ -0,0 +1,135 @@
+from collections import deque
+from functools import partial
+import threading
+from PyQt5.QtCore import QObject, pyqtSignal
+
+# refill once this few questions are left
+LOW_WATERMARK = 10
+# never ask for more once this many are buffered
+HIGH_WATERMARK = 40
+
+
+class QuestionPrefetcher(QObject):
+    """Buffer of upcoming infinite quiz questions, refilled in the
+    background"""
+    ready = pyqtSignal(object)
+    failed = pyqtSignal(object)
+
+    def __init__(self, network, low: int = LOW_WATERMARK,
+                 high: int = HIGH_WATERMARK, parent=None) -> None:
+        super().__init__(parent)
+        self.network = network
+        self.low = low
+        self.high = high
+        self.lock = threading.Lock()
+        self.buffer = deque()
+        self.in_flight = False
+        self.waiting = False
+        # refills from an older session are thrown away
+        self.generation = 0
+        self.session = None
+        # no refills once the player has left infinite mode
+        self.stopped = True
+
+    def reset(self, questions: list, session: str = None) -> None:
+        """Start over with the questions a new session began with
+
+                Parameters:
+                        questions (list): The session's first questions
+                        session (str): The session's id, if given one
+        """
+        with self.lock:
+            self.buffer = deque(questions)
+            self.waiting = False
+            self.generation += 1
+            self.session = session
+            self.stopped = False
+            # a refill still out for the old session is left to finish,
+            # the next one is only asked for once it has
+
+    def stop(self) -> None:
+        """Hand nothing more over, the player has left infinite mode"""
+        with self.lock:
+            self.buffer = deque()
+            self.waiting = False
+            self.generation += 1
+            self.stopped = True
+
+    def request(self) -> None:
+        """Hand the next question to ready, now or once it arrives"""
+        with self.lock:
+            question = self.buffer.popleft() if self.buffer else None
+            self.waiting = question is None
+
+        if question is not None:
+            self.ready.emit(question)
+        self.refill()
+
+    def peek(self) -> dict or None:
+        """The question request will hand over next, if already buffered"""
+        with self.lock:
+            return self.buffer[0] if self.buffer else None
+
+    def refill(self) -> None:
+        """Fetch more questions if running low and none are on the way"""
+        with self.lock:
+            if (self.stopped or self.in_flight
+                    or len(self.buffer) > self.low):
+                return
+            self.in_flight = True
+        self._fetch()
+
+    def _fetch(self) -> None:
+        with self.lock:
+            generation, session = self.generation, self.session
+        # the id lets the server turn down refills for an older session
+        data = {"session": session} if session is not None else {}
+        self.network.post("expand_infinite_quiz", data,
+                          on_result=partial(self._filled, generation),
+                          on_error=partial(self._failed, generation))
+
+    def _filled(self, generation: int, response: dict) -> None:
+        """A refill arrived"""
+        if generation != self.generation:
+            self._stale()
+            return
+        if "status" not in response:
+            self._failed(generation, response["error"])
+            return
+
+        # the server hands questions out in order, so none are ever
+        # dropped, the buffer is bounded by not asking past the high mark
+        with self.lock:
+            self.buffer.extend(response["questions"])
+            # hand over straight away if the UI was left waiting
+            question = None
+            if self.waiting and self.buffer:
+                question = self.buffer.popleft()
+                self.waiting = False
+            # keep going until the high watermark, one fetch at a time
+            self.in_flight = (not self.stopped
+                              and len(self.buffer) < self.high
+                              and len(response["questions"]) > 0)
+
+        if question is not None:
+            self.ready.emit(question)
+        if self.in_flight:
+            self._fetch()
+
+    def _failed(self, generation: int, error) -> None:
+        """A refill failed"""
+        if generation != self.generation:
+            self._stale()
+            return
+        with self.lock:
+            self.in_flight = False
+            waiting = self.waiting
+        # only a problem if the player has run out of questions
+        if waiting:
+            self.failed.emit(error)
+
+    def _stale(self) -> None:
+        """A refill for an older session came back, start the new one's"""
+        with self.lock:
+            self.in_flight = False
+        self.refill()
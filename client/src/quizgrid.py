@@ -0,0 +1,211 @@
+from PyQt5.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QRectF,
+    QSize,
+    Qt,
+    pyqtSignal,
+)
+from PyQt5.QtGui import QColor, QFont, QPainter, QPen
+from PyQt5.QtWidgets import (
+    QComboBox,
+    QHBoxLayout,
+    QLineEdit,
+    QListView,
+    QStyle,
+    QStyledItemDelegate,
+    QVBoxLayout,
+    QWidget,
+)
+
+# cards handed to the view at a time as it scrolls
+PAGE_SIZE = 24
+CARD_SIZE = QSize(300, 190)
+ALL_CATEGORIES = "All Categories"
+
+# the entry of a card, as given by PackIndex
+PackRole = Qt.UserRole
+
+
+class QuizPackModel(QAbstractListModel):
+    """Local quiz packs, handed to the view a page at a time"""
+
+    def __init__(self, entries: list, parent=None) -> None:
+        super().__init__(parent)
+        self.entries = entries
+        self.matches = entries
+        self.loaded = min(PAGE_SIZE, len(entries))
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.loaded
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.loaded:
+            return None
+        entry = self.matches[index.row()]
+        if role == Qt.DisplayRole:
+            return entry["name"]
+        if role == Qt.ToolTipRole:
+            return entry["name"]
+        if role == PackRole:
+            return entry
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self.loaded < len(self.matches)
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        """Hand the view the next page once it scrolls to the end"""
+        if parent.isValid():
+            return
+        more = min(PAGE_SIZE, len(self.matches) - self.loaded)
+        if more <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded,
+                             self.loaded + more - 1)
+        self.loaded += more
+        self.endInsertRows()
+
+    def categories(self) -> list:
+        """Every category a local pack is in"""
+        return sorted({entry["category"] for entry in self.entries
+                       if entry["category"]})
+
+    def set_filter(self, text: str = "", category: str = "") -> None:
+        """Only show packs matching the search and category
+
+                Parameters:
+                        text (str): Part of the name or category to look for
+                        category (str): Category to keep, empty for all
+        """
+        text = text.strip().lower()
+        self.beginResetModel()
+        self.matches = [
+            entry for entry in self.entries
+            if (not category or entry["category"] == category)
+            and (text in entry["name"].lower()
+                 or text in entry["category"].lower())
+        ]
+        self.loaded = min(PAGE_SIZE, len(self.matches))
+        self.endResetModel()
+
+
+class QuizCardDelegate(QStyledItemDelegate):
+    """Paints the local quiz pack cards, no widget per card"""
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.title_font = QFont("Arial", 17)
+        self.desc_font = QFont("Arial", 13)
+
+    def sizeHint(self, option, index: QModelIndex) -> QSize:
+        return CARD_SIZE
+
+    def paint(self, painter: QPainter, option, index: QModelIndex) -> None:
+        entry = index.data(PackRole)
+        if entry is None:
+            return
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # card frame, highlighted like the css :hover
+        rect = QRectF(option.rect).adjusted(4.5, 4.5, -4.5, -4.5)
+        hovered = option.state & QStyle.State_MouseOver
+        painter.setPen(QPen(QColor("#007BFF" if hovered else "#CCCCCC"), 1))
+        painter.setBrush(QColor("#FFFFFF"))
+        painter.drawRoundedRect(rect, 12, 12)
+
+        # title in the bottom left, category and size in the top right
+        inner = rect.adjusted(12, 12, -12, -12)
+        half = inner.width() / 2
+        title = QRectF(inner.left(), inner.top() + inner.height() / 2,
+                       half, inner.height() / 2)
+        desc = QRectF(inner.left() + half, inner.top(),
+                      half, inner.height() / 2)
+        stats = QRectF(inner.left() + half, inner.top() + inner.height() / 2,
+                       half, inner.height() / 2)
+
+        painter.setPen(QColor("#000000"))
+        painter.setFont(self.title_font)
+        painter.drawText(title, Qt.AlignBottom | Qt.TextWordWrap,
+                         entry["name"].upper())
+
+        painter.setFont(self.desc_font)
+        painter.drawText(desc, Qt.AlignTop | Qt.TextWordWrap,
+                         entry["category"].upper())
+        if entry["questions"]:
+            painter.drawText(stats, Qt.AlignTop,
+                             f"{entry['questions']} QUESTIONS")
+
+        painter.restore()
+
+
+class QuizGrid(QWidget):
+    """Searchable grid of local quiz packs"""
+    clicked = pyqtSignal(str)
+
+    def __init__(self, entries: list, parent=None) -> None:
+        super().__init__(parent)
+        self.model = QuizPackModel(entries, self)
+
+        layout = QVBoxLayout()
+
+        # search and category filter
+        filters = QHBoxLayout()
+        self.search = QLineEdit()
+        self.search.setObjectName("search")
+        self.search.setPlaceholderText("Search quizzes")
+        self.search.textChanged.connect(self._filter)
+        filters.addWidget(self.search, 1)
+
+        self.category = QComboBox()
+        self.category.addItem(ALL_CATEGORIES)
+        self.category.addItems(self.model.categories())
+        self.category.currentIndexChanged.connect(self._filter)
+        filters.addWidget(self.category)
+        layout.addLayout(filters)
+
+        # only the cards in view are ever painted
+        self.view = QListView()
+        self.view.setObjectName("quiz-display")
+        self.view.setViewMode(QListView.IconMode)
+        self.view.setFlow(QListView.LeftToRight)
+        self.view.setWrapping(True)
+        self.view.setResizeMode(QListView.Adjust)
+        self.view.setMovement(QListView.Static)
+        self.view.setUniformItemSizes(True)
+        self.view.setLayoutMode(QListView.Batched)
+        self.view.setBatchSize(PAGE_SIZE)
+        self.view.setSelectionMode(QListView.NoSelection)
+        self.view.setMouseTracking(True)
+        self.view.setCursor(Qt.PointingHandCursor)
+        self.view.setItemDelegate(QuizCardDelegate(self.view))
+        self.view.setModel(self.model)
+        self.view.clicked.connect(self._clicked)
+        layout.addWidget(self.view)
+
+        self.setLayout(layout)
+
+    def set_entries(self, entries: list) -> None:
+        """Swap in a new list of packs, keeping the search and category"""
+        self.model.entries = entries
+        category = self.category.currentText()
+        self.category.blockSignals(True)
+        self.category.clear()
+        self.category.addItem(ALL_CATEGORIES)
+        self.category.addItems(self.model.categories())
+        self.category.setCurrentText(category)
+        self.category.blockSignals(False)
+        self._filter()
+
+    def _filter(self) -> None:
+        category = self.category.currentText()
+        self.model.set_filter(
+            self.search.text(),
+            "" if category == ALL_CATEGORIES else category,
+        )
+        self.view.scrollToTop()
+
+    def _clicked(self, index: QModelIndex) -> None:
+        self.clicked.emit(index.data(Qt.DisplayRole))
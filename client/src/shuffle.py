@@ -0,0 +1,28 @@
+# answers are shown in an order worked out from a seed the server hands
+# out, so clients can send back where the answer was instead of its text
+import hashlib
+
+
+def order(seed: int, position: int, count: int) -> list:
+    """Where each answer of a question goes, the same on every client
+
+            Parameters:
+                    seed (int): Seed of the attempt
+                    position (int): The question's place in the quiz, or
+                            its id in the question bank
+                    count (int): Number of answers
+    """
+    # Fisher-Yates driven by a hash rather than a random generator, so it
+    # can be repeated anywhere from the seed alone
+    shown = list(range(count))
+    for i in range(count - 1, 0, -1):
+        digest = hashlib.sha256(f"{seed}:{position}:{i}".encode()).digest()
+        j = int.from_bytes(digest[:8], "big") % (i + 1)
+        shown[i], shown[j] = shown[j], shown[i]
+    return shown
+
+
+def options(seed: int, position: int, question: dict) -> list:
+    """A question's answers in the order they are shown"""
+    answers = question["incorrect_answers"] + [question["correct_answer"]]
+    return [answers[i] for i in order(seed, position, len(answers))]
@@ -3,15 +3,21 @@ from functools import partial
 import random
 import json
 import sys
-import os
-import requests
 from src.main import login, signUp, createQuiz
-import html
-from threading import Thread
+from src.network import Network
+from src.prefetch import QuestionPrefetcher
+from src.answers import AnswerQueue
+from src.assets import Assets
+from src.packs import PackIndex
+from src.quizgrid import QuizGrid
+from src.pages import PageManager
+from src.packfile import PackQuestions, open_pack
+from src.importer import ImportProgress, import_bank
+from src import shuffle
 from PyQt5.QtCore import QSize, Qt, pyqtSignal
-from PyQt5.QtGui import QIcon, QPixmap, QFontDatabase, QCursor
+from PyQt5.QtGui import QPixmap, QCursor
+from PyQt5 import sip
 from PyQt5.QtWidgets import (
-    QScrollArea,
     QSpinBox,
     QLineEdit,
     QApplication,
@@ -26,8 +32,17 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QSizePolicy,
     QComboBox,
+    QFileDialog,
+    QProgressBar,
 )
 
+# questions played from a pack, bigger revision banks are sampled
+MAX_QUIZ_QUESTIONS = 50
+BANK_PROMPT = "Choose a CSV, JSON or JSON lines file"
+# inputs of the quiz forms, bound to the window while their page is shown
+FORM_FIELDS = ("dropdown", "difficulty", "spinbox",
+               "quiz_type", "quiz_type_layout", "modes")
+
 
 class Window(QMainWindow):
     """Main Window"""
@@ -35,10 +50,23 @@ class Window(QMainWindow):
     with open(Path(Path(__file__).parent, "opentdb.json"), "r") as f:
         OPENTDB_API = json.loads(f.read())
 
-    def __init__(self, api: str) -> None:
+    def __init__(self, api: str, dev: bool = False) -> None:
         super().__init__()
         self.path = "Home"
         self.api = api
+        # stylesheets, fonts and images, hot reloaded in dev mode
+        self.assets = Assets(watch=dev, parent=self)
+        self.network = Network(api, self)
+
+        # answers to the competitive quiz being played, sent in batches
+        self.answer_queue = None
+        # deck of the quiz being played, if any
+        self.question_deck = None
+
+        # upcoming infinite quiz questions
+        self.prefetcher = QuestionPrefetcher(self.network, parent=self)
+        self.prefetcher.ready.connect(self._show_infinite_question)
+        self.prefetcher.failed.connect(self._infinite_quiz_error)
 
         self._init_ui()
 
@@ -49,14 +77,7 @@ class Window(QMainWindow):
         self.window_name = "Quizzy"
         self.setWindowTitle(f"Quizzy - {self.path}")
 
-        icons_dir_path = Path(Path(__file__).parent, "icons")
-        self.setWindowIcon(QIcon(str(Path(icons_dir_path, "home.png"))))
-
-        # apply custom font to program
-        fonts = ["Aspekta-400.otf", "Aspekta-500.otf"]
-        for font in fonts:
-            fontpath = str(Path(Path(__file__).parent, "fonts", font))
-            QFontDatabase.addApplicationFont(fontpath)
+        self.setWindowIcon(self.assets.icon("home.png"))
 
         self.stacked_layout = (
             QStackedLayout()
@@ -70,10 +91,7 @@ class Window(QMainWindow):
         self.setCentralWidget(central_widget)
 
         # apply styling for program
-        stylepath = Path(Path(__file__).parent, "styles", "body.css")
-        with open(stylepath, "r") as f:
-            self.css = f.read()
-            central_widget.setStyleSheet(self.css)
+        self.assets.apply(central_widget, "body.css")
 
         central_widget.showMaximized()
 
@@ -170,6 +188,7 @@ class Window(QMainWindow):
         # return the built window widget
         container = QWidget()
         container.setLayout(frame)
+        self._keep_fields(container, FORM_FIELDS + ("name_input",))
         return container
 
     def _init_infinite_quizzes_page(self) -> QWidget:
@@ -252,87 +271,76 @@ class Window(QMainWindow):
         # return the widget
         container = QWidget()
         container.setLayout(frame)
+        self._keep_fields(container, FORM_FIELDS)
         return container
 
-    def _start_infinite_quiz(self, expand: bool = False) -> None:
-        """Start the infinite Quiz
-
-                Parameters:
-                    expand (bool): Expanding quiz or not
-        """
+    def _start_infinite_quiz(self) -> None:
+        """Start the infinite Quiz"""
         self.setWindowTitle("Quizzy - Infinite Quiz")
 
-        try:
-            # if new quiz set up params
-            if not expand:
-                self.params = {
-                    "amount": 20,
-                    "category":
-                    Window.OPENTDB_API["categories"][
-                        self.dropdown.currentText()
-                    ],
-                    "difficulty":
-                    Window.OPENTDB_API["difficulty"][
-                        self.difficulty.currentText()
-                    ],
-                    "type":
-                    Window.OPENTDB_API["type"][
-                        [i for i in self.quiz_type
-                         if self.quiz_type[i] == "active"][0]
-                    ],
-                }
-
-            # fetch questions from API
-            url = "https://opentdb.com/api.php"
-            response = requests.get(url, params=self.params)
-            questions = {"questions": response.json()["results"]}
-            headers = {"X-API-Key": self.api_key,
-                       "Content-Type": "application/json"}
-
-            # if data is not there, try again
-            if response.json()["response_code"] != 0:
-                self._start_infinite_quiz(expand=True)
-                return
-
-            if not expand:
-                # set up infinite quiz server side
-                url = f"{self.api}/start_infinite_quiz"
-                self.live_session = questions | {
-                    "lives": self.spinbox.value()
-                }
-                session = dict(self.live_session)
-            else:
-                # ready to expand quiz server side
-                url = f"{self.api}/expand_infinite_quiz"
-                print(response.json(), end="\n\n")
-                session = questions
-
-            response = requests.post(url,
-                                     data=json.dumps(session),
-                                     headers=headers)
-
-            if "status" in response.json():
-                if not expand:
-                    # start infinite quiz session
-                    self.main_layout.addWidget(self._infinite_quiz_page())
-                    self.main_layout.setCurrentIndex(2)
-                else:
-                    # expand the quiz session
-                    self.live_session["questions"].append(session["questions"])
-            else:
-                raise requests.exceptions.ConnectionError(
-                    response.json()["error"])
-
-        except requests.exceptions.ConnectionError as e:
-            # if error with connection,
-            # pop up with dialog then return to main menu
-            QMessageBox.warning(
-                self, "Generate Quiz",
-                f"An error occured while starting session: {e}"
+        # questions come from the server's question bank
+        if not self.api_key:
+            QMessageBox.information(
+                self, "Offline Mode",
+                "Infinity Mode needs a connection to the back-end API."
             )
             self._back_to_main()
             return
 
+        # set up infinite quiz server side from its question bank
+        session = {
+            "category":
+            Window.OPENTDB_API["categories"][
+                self.dropdown.currentText()
+            ],
+            "difficulty":
+            Window.OPENTDB_API["difficulty"][
+                self.difficulty.currentText()
+            ],
+            "type":
+            Window.OPENTDB_API["type"][
+                [i for i in self.quiz_type
+                 if self.quiz_type[i] == "active"][0]
+            ],
+            "lives": self.spinbox.value(),
+        }
+        self.network.post(
+            "start_infinite_quiz", session,
+            on_result=partial(self._infinite_quiz_started, session["lives"]),
+            on_error=self._infinite_quiz_error,
+        )
+
+    def _infinite_quiz_started(self, lives: int, response: dict) -> None:
+        """Infinite quiz session was set up on the server
+
+                Parameters:
+                    lives (int): Lives to start with
+                    response (dict): The server's response
+        """
+        if "status" not in response:
+            self._infinite_quiz_error(response["error"])
+            return
+
+        # start infinite quiz session
+        self.live_session = {"lives": lives,
+                             "session": response.get("session")}
+        self.prefetcher.reset(response["questions"], response.get("session"))
+        self.pages.push(self._infinite_quiz_page())
+        self.prefetcher.request()
+
+    def _infinite_quiz_error(self, error) -> None:
+        """Infinite quiz could not be started or expanded
+
+                Parameters:
+                    error: What went wrong
+        """
+        # pop up with dialog then return to main menu
+        QMessageBox.warning(
+            self, "Generate Quiz",
+            f"An error occured while starting session: {error}"
+        )
+        self._back_to_main()
+
     def _infinite_quiz_page(self) -> QWidget:
         """Start the infinite quiz session"""
         page = QWidget()
@@ -340,108 +348,90 @@ class Window(QMainWindow):
         self.quiz_main = QStackedLayout()
 
         self.score = 0
+        self.answering = False
+
+        # the first question is shown once the prefetcher hands it over
+        self.question_deck = QQuestionDeck(self.assets)
+        self.question_deck.answered.connect(
+            self._infinite_question_option_clicked)
+        self.question_deck.back.connect(self._question_ui_back)
+        self.quiz_main.addWidget(self.question_deck)
 
-        # start quiz by loading UI
-        self.quiz_main.addWidget(self._infinite_question_ui())
         main_layout.addLayout(self.quiz_main, 2, 2)
         page.setLayout(main_layout)
         return page
 
-    def _infinite_question_ui(self) -> QWidget:
-        """GUI Panel for the quizzes"""
-        question_ui = QWidget()
-
-        main_layout = QVBoxLayout()
-        main_layout.addWidget(self._question_ui_nav(infinite=True))
+    def _show_infinite_question(self, question: dict) -> None:
+        """Show the next infinite quiz question
 
-        # gets question
-        question = self.live_session["questions"][0]
-
-        # display question
-        main_layout.addWidget(QQuestions(question["question"], css="quiz.css"))
-
-        options_layout = QGridLayout()
-        options_layout.setHorizontalSpacing(0)
-        options_layout.setVerticalSpacing(0)
-
-        # shuffle location of correct and incorrect answers
-        options = question["incorrect_answers"] + [question["correct_answer"]]
-        random.shuffle(options)
-
-        # set up the format
-        positions = (
-            [(0, 0), (1, 0), (1, 1), (0, 1)]
-            if question["type"] == "multiple"
-            else [(0, 0), (1, 0)]
-        )
+                Parameters:
+                        question (dict): The question
+        """
+        # the player may have left the quiz already
+        if self.question_deck is None or self._left_quiz(self.question_deck):
+            return
 
-        # place all questions to their allocated positions
-        for index, pos in enumerate(positions):
-            option = options[index]
-            button = QQuestions(option, css="questions.css")
-            button.clicked.connect(
-                partial(
-                    self._infinite_question_option_clicked,
-                    option,
-                    question["correct_answer"],
-                )
-            )
-            options_layout.addWidget(button, pos[0], pos[1])
+        self.infinite_question = question
+        self.question_deck.show_question(
+            question, self._question_status(infinite=True))
+        # fill in the one after while the player reads this one
+        upcoming = self.prefetcher.peek()
+        if upcoming is not None:
+            self.question_deck.prepare(upcoming)
 
-        questions_box = QHBoxLayout()
+    def _infinite_question_option_clicked(self, selected: str):
+        """Answer was clicked and selected
 
-        questions_box.addLayout(options_layout)
+                Parameters:
+                        selected (str): The question that is selected
+        """
+        # ignore clicks while waiting on the last answer
+        if self.answering:
+            return
+        self.answering = True
 
-        main_layout.addLayout(questions_box)
-        question_ui.setLayout(main_layout)
+        # sent as where it was shown, servers naming the session grade by it
+        if self.live_session["session"] is not None:
+            selected = self.infinite_question["options"].index(selected)
 
-        return question_ui
+        # submit question, only the server knows the answer, saying which
+        # so a late answer can't be taken for the next question
+        self.network.post("answer_infinite_quiz",
+                          {"id": self.infinite_question["id"],
+                           "selected": selected},
+                          on_result=partial(self._infinite_question_answered,
+                                            self.question_deck),
+                          on_error=partial(self._infinite_answer_failed,
+                                           self.question_deck))
 
-    def _infinite_question_option_clicked(self,
-                                          selected: str,
-                                          correct_answer: str):
-        """Answer was clicked and selected
+    def _infinite_question_answered(self, deck: QWidget, response: dict):
+        """Server graded the answer
 
                 Parameters:
-                        selected (str): The question that is selected
-                        correct_answer (str): The correct answer
+                        deck (QQuestionDeck): Deck the question was on
+                        response (dict): The server's response
         """
+        self.answering = False
 
-        # if online
-        if self.api_key:
-            # submit question if correct
-            headers = {"X-API-Key": self.api_key,
-                       "Content-Type":
-                       "application/json"}
-            data = {"selected": selected}
-            response = requests.post(
-                f"{self.api}/answer_infinite_quiz",
-                data=json.dumps(data),
-                headers=headers,
-            )
+        # if there's an error
+        if "status" not in response:
+            self._infinite_answer_failed(deck, response["error"])
+            return
 
-            # if there's no error
-            if "status" in response.json():
-                status = response.json()["status"]
-                self.live_session["lives"] = response.json()["lives"]
-            else:
-                raise requests.exceptions.ConnectionError(
-                    response.json()["error"])
+        correct = response["status"] == "Correct Answer"
+        self.live_session["lives"] = response["lives"]
 
-            # if correct add points locally
-            if "correct" in status.lower():
-                self.user_score += 1
-                self.points_display.setText(f"{self.user_score} points")
+        # if correct add points locally
+        if correct:
+            self.user_score += 1
+            self.points_display.setText(f"{self.user_score} points")
 
-        # delete question
-        del self.live_session["questions"][0]
-        # if only 10 or less questions, generate more through threading
-        if 10 >= len(self.live_session["questions"]):
-            thread = Thread(target=self._start_infinite_quiz, args=(True,))
-            thread.start()
+        # the player may have left the quiz while the answer was out
+        if self._left_quiz(deck):
+            return
 
         # checks if answer correct
-        if selected == correct_answer:
+        if correct:
             QMessageBox.information(
                 self, "Right Answer",
                 "Congratulations! Your answer is correct."
@@ -451,22 +441,32 @@ class Window(QMainWindow):
             QMessageBox.warning(self, "Wrong Answer",
                                 "Oops! Your answer is incorrect.")
 
-        first_widget = self.quiz_main.widget(0)
-        self.quiz_main.removeWidget(first_widget)
-        first_widget.deleteLater()
-
         # if lives is 0, then end quiz otherwise repeat the proccess
         if self.live_session["lives"] <= 0:
+            first_widget = self.quiz_main.widget(0)
+            self.quiz_main.removeWidget(first_widget)
+            first_widget.deleteLater()
             self.quiz_main.addWidget(self._quiz_summary(infinite=True))
         else:
-            self.quiz_main.addWidget(self._infinite_question_ui())
+            self.prefetcher.request()
+
+    def _infinite_answer_failed(self, deck: QWidget, error) -> None:
+        """Answer could not be sent, only a problem if still playing"""
+        self.answering = False
+        if not self._left_quiz(deck):
+            self._infinite_quiz_error(error)
+
+    def _left_quiz(self, deck: QWidget) -> bool:
+        """Whether the player has left the quiz a deck was shown in"""
+        return sip.isdeleted(deck) or deck is not self.question_deck
 
     def switch_quiz_type(self, index: int) -> None:
         """Question type interactive selector"""
-        self.quiz_type = {
+        # in place, the form's page keeps hold of the same dict
+        self.quiz_type.update({
             item: "active" if index == i else "inactive"
             for i, item in enumerate(list(Window.OPENTDB_API["type"]))
-        }
+        })
 
         # apply new styling to elements
         for i, item in enumerate(self.quiz_type):
@@ -504,38 +504,215 @@ class Window(QMainWindow):
             self.quiz_type_layout.addWidget(button)
 
         container.setLayout(self.quiz_type_layout)
-        container.setStyleSheet(self.css)
+        self.assets.apply(container, "body.css")
         return container
 
     def _generate_quiz(self) -> None:
         """Generate teh quiz"""
-        try:
-            # creates quiz based on selected params in the
-            # user's directory
-            createQuiz(
-                self.user.path,
-                self.spinbox.value(),
-                self.dropdown.currentText(),
-                self.difficulty.currentText(),
-                [i for i in self.quiz_type
-                 if self.quiz_type[i] == "active"][0],
-                self.name_input.text(),
-            )
+        name = self.name_input.text()
 
+        # creates quiz based on selected params in the
+        # user's directory, in the background
+        self.network.run(
+            createQuiz,
+            self.user.path,
+            self.spinbox.value(),
+            self.dropdown.currentText(),
+            self.difficulty.currentText(),
+            [i for i in self.quiz_type
+             if self.quiz_type[i] == "active"][0],
+            name,
+            on_result=partial(self._quiz_generated, name),
+            on_error=partial(self._quiz_generated, name),
+        )
+
+    def _quiz_generated(self, name: str, error: Exception = None) -> None:
+        """Quiz finished generating
+
+                Parameters:
+                        name (str): Name of the quiz
+                        error (Exception): What went wrong, if anything
+        """
+        if error is None:
             QMessageBox.information(
                 self, "Generate Quiz",
-                f"{self.name_input.text()} successfully created!"
+                f"{name} successfully created!"
             )
-        except requests.exceptions.ConnectionError as e:
+        else:
             QMessageBox.warning(
                 self,
                 "Generate Quiz",
                 "An error occured while generating " +
-                f"{self.name_input.text()}: {e}",
+                f"{name}: {error}",
             )
 
         self._back_to_main()
 
+    def _init_import_page(self) -> QWidget:
+        """Initialize the Import Questions page"""
+        main = QWidget()
+        self.setWindowTitle("Quizzy - Import Questions")
+        main.setObjectName("generate-quizzes-page")
+
+        frame = QHBoxLayout()
+        main_layout = QVBoxLayout()
+
+        ui_layout = QVBoxLayout()
+        ui_layout.setSpacing(0)
+
+        heading = QLabel("Import Questions")
+        heading.setObjectName("heading")
+
+        container = QWidget()
+        container.source = None
+
+        # question bank to import
+        input_text = QLabel("Question Bank*")
+        input_text.setObjectName("input-text")
+
+        container.choose = QPushButton(BANK_PROMPT)
+        container.choose.setCursor(QCursor(Qt.PointingHandCursor))
+        container.choose.setObjectName("input-field")
+        container.choose.clicked.connect(
+            partial(self._choose_bank, container))
+
+        ui_layout.addStretch(1)
+        ui_layout.addWidget(input_text)
+        ui_layout.addWidget(container.choose)
+
+        # quiz name input field
+        input_text = QLabel("Name*")
+        input_text.setObjectName("input-text")
+
+        container.name = QLineEdit()
+        container.name.setPlaceholderText("Year 10 Revision")
+        container.name.setObjectName("input-field")
+
+        ui_layout.addStretch(1)
+        ui_layout.addWidget(input_text)
+        ui_layout.addWidget(container.name)
+
+        # how far through the bank the import is
+        container.progress = QProgressBar()
+        container.progress.setObjectName("input-field")
+        container.progress.setRange(0, 100)
+        container.progress.setValue(0)
+
+        ui_layout.addStretch(2)
+        ui_layout.addWidget(container.progress)
+
+        # button to start the import
+        ui_layout.addStretch(2)
+        container.start = QPushButton("Import")
+        container.start.setCursor(QCursor(Qt.PointingHandCursor))
+        container.start.setObjectName("input-field")
+        container.start.clicked.connect(partial(self._import_bank, container))
+        ui_layout.addWidget(container.start)
+        main.setLayout(ui_layout)
+
+        # format the form properly
+        main_layout.addStretch(1)
+        main_layout.addWidget(heading, alignment=Qt.AlignCenter)
+        main_layout.addWidget(main)
+        main_layout.addStretch(1)
+
+        frame.addStretch(1)
+        frame.addLayout(main_layout)
+        frame.addStretch(1)
+
+        container.setLayout(frame)
+        return container
+
+    def _choose_bank(self, page: QWidget) -> None:
+        """Pick the question bank to import
+
+                Parameters:
+                        page (QWidget): The import page
+        """
+        source, _ = QFileDialog.getOpenFileName(
+            self, "Import Questions", "",
+            "Question banks (*.csv *.json *.jsonl *.ndjson)",
+        )
+        if not source:
+            return
+
+        page.source = Path(source)
+        page.choose.setText(page.source.name)
+        if not page.name.text():
+            page.name.setText(page.source.stem)
+
+    def _import_bank(self, page: QWidget) -> None:
+        """Import the chosen question bank in the background
+
+                Parameters:
+                        page (QWidget): The import page
+        """
+        name = page.name.text().strip()
+        if page.source is None or not name:
+            QMessageBox.information(self, "Import Questions",
+                                    "Choose a question bank and a name.")
+            return
+
+        # the bank is streamed on the pool, the bar follows along
+        page.start.setEnabled(False)
+        page.progress.setValue(0)
+        progress = ImportProgress(self)
+        progress.changed.connect(partial(self._import_progress, page))
+        self.network.run(
+            import_bank, self.user.path, page.source, name,
+            progress=progress.changed.emit,
+            on_result=partial(self._bank_imported, page, progress),
+            on_error=partial(self._bank_imported, page, progress, None),
+        )
+
+    def _import_progress(self, page: QWidget, done: int, total: int) -> None:
+        """Move the progress bar along
+
+                Parameters:
+                        page (QWidget): The import page
+                        done (int): Bytes of the bank read so far
+                        total (int): Size of the bank
+        """
+        if not sip.isdeleted(page):
+            page.progress.setValue(int(done * 100 / max(total, 1)))
+
+    def _bank_imported(self, page: QWidget, progress: ImportProgress,
+                       result: dict, error: Exception = None) -> None:
+        """Question bank finished importing
+
+                Parameters:
+                        page (QWidget): The import page
+                        progress (ImportProgress): The import's progress
+                        result (dict): How many questions were imported
+                        error (Exception): What went wrong, if anything
+        """
+        progress.deleteLater()
+        if not sip.isdeleted(page):
+            page.start.setEnabled(True)
+
+        if error is not None:
+            QMessageBox.warning(
+                self, "Import Questions",
+                f"An error occured while importing: {error}",
+            )
+            return
+
+        message = (f"{result['name']} created with {result['imported']} "
+                   f"questions. {result['duplicates']} duplicates and "
+                   f"{result['invalid']} invalid questions were skipped.")
+        # the first few of what was wrong with the skipped ones
+        if result["errors"]:
+            message += "\n\n" + "\n".join(result["errors"][:5])
+        QMessageBox.information(self, "Import Questions", message)
+
+        # start afresh for the next bank
+        if not sip.isdeleted(page):
+            page.source = None
+            page.name.clear()
+            page.progress.setValue(0)
+            page.choose.setText(BANK_PROMPT)
+        self._back_to_main()
+
     def _create_login_page(self) -> QWidget:
         """Create the login page widget"""
         # title window
@@ -631,21 +808,32 @@ class Window(QMainWindow):
             print("Missing fields")
             return None
 
-        # login
-        user, message = login(name, password)
+        # login in the background
+        self.network.run(login, name, password, self.api,
+                         on_result=partial(self._logged_in, "Log In"),
+                         on_error=partial(self._network_error, "Log In"))
+
+    def _logged_in(self, title: str, result: tuple) -> None:
+        """Logged in or signed up, fetch the user's score
+
+                Parameters:
+                        title (str): Title for any dialogs
+                        result (tuple): The user and a message
+        """
+        user, message = result
         if not user:
-            QMessageBox.information(self, "Log In", message)
+            QMessageBox.information(self, title, message)
             return
 
         # try logging into the back-end server and fetch user score
         self.api_key = user["api_key"]
+        self.network.api_key = self.api_key
         self.user = user["profile"]
         # if offline or online
         if self.api_key:
-            headers = {"X-API-Key": self.api_key,
-                       "Content-Type": "application/json"}
-            response = requests.get(f"{self.api}/get_score", headers=headers)
-            self.user_score = response.json()["score"]
+            self.network.get("get_score",
+                             on_result=self._load_main_page,
+                             on_error=partial(self._network_error, title))
         else:
             QMessageBox.information(
                 self,
@@ -653,6 +841,16 @@ class Window(QMainWindow):
                 "Unable to connect to back-end API." +
                 "Switching to Offline Mode. Some features may be restricted.",
             )
+            self._load_main_page({})
+
+    def _load_main_page(self, response: dict) -> None:
+        """Swap to the home menu
+
+                Parameters:
+                        response (dict): The user's score from the server
+        """
+        if "score" in response:
+            self.user_score = response["score"]
 
         # create the home menu
         self.stacked_layout.addWidget(self._create_main_page())
@@ -660,6 +858,15 @@ class Window(QMainWindow):
         self.stacked_layout.removeWidget(first_widget)
         first_widget.deleteLater()
 
+    def _network_error(self, title: str, error: Exception) -> None:
+        """A request to the back-end API failed
+
+                Parameters:
+                        title (str): Title of the dialog
+                        error (Exception): What went wrong
+        """
+        QMessageBox.warning(self, title, f"An error occured: {error}")
+
     def _create_signup_page(self) -> QWidget:
         """Create the sign up page widget"""
         # title window
@@ -759,33 +966,10 @@ class Window(QMainWindow):
             print("Missing fields")
             return None
 
-        # signs up user
-        user, message = signUp(name, password, team)
-        if not user:
-            QMessageBox.information(self, "Sign Up", message)
-            return
-
-        self.api_key = user["api_key"]
-        self.user = user["profile"]
-        # if online and registration successful, get score
-        if self.api_key:
-            headers = {"X-API-Key": self.api_key,
-                       "Content-Type": "application/json"}
-            response = requests.get(f"{self.api}/get_score", headers=headers)
-            self.user_score = response.json()["score"]
-        else:
-            # if offline
-            QMessageBox.information(
-                self,
-                "Offline Mode",
-                "Unable to connect to back-end API." +
-                "Switching to Offline Mode. Some features may be restricted.",
-            )
-
-        self.stacked_layout.addWidget(self._create_main_page())
-        first_widget = self.stacked_layout.itemAt(0).widget()
-        self.stacked_layout.removeWidget(first_widget)
-        first_widget.deleteLater()
+        # signs up user in the background
+        self.network.run(signUp, name, password, team, self.api,
+                         on_result=partial(self._logged_in, "Sign Up"),
+                         on_error=partial(self._network_error, "Sign Up"))
 
     def _create_main_page(self) -> QWidget:
         """Create the main page of the application"""
@@ -806,14 +990,28 @@ class Window(QMainWindow):
         main_layout.addLayout(self.main_layout)
         self.main_page.setLayout(main_layout)
 
+        # menu pages are built once and kept, quiz pages thrown away
+        self.pages = PageManager(self.main_layout, self, parent=self)
+
         return self.main_page
 
-    def _menu_clicked(self, function) -> None:
-        """Select the current menu"""
-        element = function()
-        self.main_layout.addWidget(element)
-        # set the index
-        self.main_layout.setCurrentIndex(1)
+    def _menu_clicked(self, function, refresh=None) -> None:
+        """Select the current menu
+
+            Parameters:
+                    function (Callable): function that returns a QWidget
+                    refresh (Callable): brings a cached page up to date
+        """
+        self.pages.show(function.__name__, function, refresh)
+
+    def _keep_fields(self, page: QWidget, names: tuple) -> None:
+        """Remember which of the window's inputs belong to a page"""
+        page.fields = {name: getattr(self, name) for name in names}
+
+    def _bind_fields(self, page: QWidget) -> None:
+        """Point the window's inputs back at a cached page's"""
+        for name, value in page.fields.items():
+            setattr(self, name, value)
 
     def _init_homepage(self) -> QWidget:
         """Initialise the home page"""
@@ -834,37 +1032,42 @@ class Window(QMainWindow):
         nav = {
             "Quiz Me!": {
                 "onclick": self._init_quizzespage,
+                "refresh": self._refresh_quizzespage,
                 "description": ("Challenge yourself to a "
                                 + "quiz from your local files."),
             },
             "Generate Quizzes!": {
                 "onclick": self._init_generate_quizzes_page,
+                "refresh": self._bind_fields,
                 "description": "Quickly and easily generate quizzes to play.",
             },
             "Leaderboards": {
                 "onclick": self._init_leaderboards,
+                "refresh": self._refresh_leaderboards,
                 "description": "Check out which house has the most points.",
             },
             "Infinity Mode": {
                 "onclick": self._init_infinite_quizzes_page,
+                "refresh": self._bind_fields,
                 "description": "Play quizzes infinitely without limit.",
             },
+            "Import Questions": {
+                "onclick": self._init_import_page,
+                "refresh": None,
+                "description": "Turn your own question bank into a quiz.",
+            },
         }
 
-        # add css styling to buttons menus
-        stylepath = Path(Path(__file__).parent, "styles", "card.css")
-        with open(stylepath, "r") as f:
-            style = f.read()
-
         # format the buttons onto the menu
         for index, content in enumerate(nav):
             button = QCard(content,
-                           description=nav[content]["description"],
-                           css=style)
+                           description=nav[content]["description"])
             button.setObjectName("QCard")
+            self.assets.apply(button, "card.css")
             button.setCursor(QCursor(Qt.PointingHandCursor))
             button.clicked.connect(partial(self._menu_clicked,
-                                           nav[content]["onclick"]))
+                                           nav[content]["onclick"],
+                                           nav[content]["refresh"]))
 
             x, y = divmod(index, 2)
             menu_layout.addWidget(button, x, y)
@@ -898,10 +1101,11 @@ class Window(QMainWindow):
         label.setObjectName("heading")
 
         # load all the local quizzes
+        main.grid = self._local_quiz_pack()
         section_layout.addStretch(1)
         section_layout.addWidget(heading, alignment=Qt.AlignCenter)
         section_layout.addWidget(label, alignment=Qt.AlignLeft)
-        section_layout.addWidget(self._local_quiz_pack())
+        section_layout.addWidget(main.grid)
         section_layout.addStretch(1)
 
         main_layout.addStretch(1)
@@ -911,6 +1115,10 @@ class Window(QMainWindow):
         main.setLayout(main_layout)
         return main
 
+    def _refresh_quizzespage(self, page: QWidget) -> None:
+        """Pick up quizzes generated since the page was built"""
+        page.grid.set_entries(PackIndex(self.user.path).entries())
+
     def _leaderboards_ui(self) -> QWidget:
         """Create the leaderboards UI widget"""
         main = QWidget()
@@ -925,35 +1133,59 @@ class Window(QMainWindow):
             main.setLayout(layout)
             return main
 
-        # request leaderboard points from server
-        headers = {"X-API-Key": self.api_key}
-        response = requests.get(f"{self.api}/render_leaderboard",
-                                headers=headers)
-        data = response.json()["data"]
+        main.setLayout(layout)
+        main.setObjectName("leaderboard-container")
+        self.assets.apply(main, "leaderboard.css")
+        self._load_leaderboard(main)
+        return main
+
+    def _load_leaderboard(self, main: QWidget) -> None:
+        """Request the leaderboard points, replacing any shown
+
+                Parameters:
+                        main (QWidget): The leaderboard widget
+        """
+        layout = main.layout()
+        while layout.count():
+            layout.takeAt(0).widget().deleteLater()
+
+        # request leaderboard points from server in the background
+        main.loading = QLabel("Loading...")
+        layout.addWidget(main.loading)
+        self.network.get(
+            "render_leaderboard",
+            on_result=partial(self._leaderboard_loaded, main, main.loading),
+            on_error=partial(self._network_error, "Leaderboard"),
+        )
+
+    def _leaderboard_loaded(self, main: QWidget,
+                            loading: QLabel, response: dict) -> None:
+        """Fill in the leaderboard once the server responds
+
+                Parameters:
+                        main (QWidget): The leaderboard widget
+                        loading (QLabel): Placeholder to replace
+                        response (dict): The server's response
+        """
+        # the user may have left the page, or it was refreshed since
+        if sip.isdeleted(main) or main.loading is not loading:
+            return
 
         # sort by highest scoring
         data = dict(
-            sorted(data.items(),
+            sorted(response["data"].items(),
                    key=lambda item: item[1]["points"],
                    reverse=True)
         )
 
-        # css style leaderboards
-        stylepath = Path(Path(__file__).parent, "styles", "leaderboard.css")
-        with open(stylepath, "r") as f:
-            style = f.read()
-
         # dynamically add widgets
+        loading.deleteLater()
         for i in data:
-            layout.addWidget(
+            main.layout().addWidget(
                 QLeaderboardItem(i.capitalize(),
                                  data[i]["points"],
                                  data[i]["colour"])
             )
-        main.setLayout(layout)
-        main.setObjectName("leaderboard-container")
-        main.setStyleSheet(style)
-        return main
 
     def _init_leaderboards(self) -> QWidget:
         """Initialise the leaderboards"""
@@ -970,7 +1202,8 @@ class Window(QMainWindow):
         section_layout.addStretch(1)
         section_layout.addWidget(heading, alignment=Qt.AlignCenter)
 
-        section_layout.addWidget(self._leaderboards_ui())
+        main.board = self._leaderboards_ui()
+        section_layout.addWidget(main.board)
         section_layout.addStretch(1)
 
         main_layout.addStretch(1)
@@ -980,6 +1213,11 @@ class Window(QMainWindow):
         main.setLayout(main_layout)
         return main
 
+    def _refresh_leaderboards(self, page: QWidget) -> None:
+        """Fetch the points again for a cached leaderboard page"""
+        if self.api_key:
+            self._load_leaderboard(page.board)
+
     def _create_navbar(self) -> QWidget:
         """Create the navbar for the program"""
         navbar = QWidget()
@@ -990,8 +1228,7 @@ class Window(QMainWindow):
         # home button
         logo_button = QPushButton()
         logo_button.setCursor(QCursor(Qt.PointingHandCursor))
-        logo_button.setIcon(QIcon(str(Path(Path(__file__).parent,
-                                           "home.png"))))
+        logo_button.setIcon(self.assets.icon("home.png"))
         logo_button.setIconSize(QSize(36, 36))
         logo_button.setObjectName("logo")
         logo_button.clicked.connect(self._back_to_main)
@@ -1012,49 +1249,21 @@ class Window(QMainWindow):
         layout.addWidget(logout)
 
         # add css styling
-        stylepath = Path(Path(__file__).parent, "styles", "navbar.css")
-        with open(stylepath, "r") as f:
-            self.setStyleSheet(f.read())
+        self.assets.apply(self, "navbar.css")
 
         navbar.setLayout(layout)
         return navbar
 
-    def _local_quiz_pack(self) -> QScrollArea:
-        """Dynamically creates the quiz packs"""
-        scroll_area = QScrollArea()
-        scroll_area.setObjectName("quiz-display")
-        scroll_area.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+    def _local_quiz_pack(self) -> QuizGrid:
+        """Grid of the local quiz packs, painted as they scroll into view"""
         # css styling
-        stylepath = Path(Path(__file__).parent, "styles", "body.css")
-        with open(stylepath, "r") as f:
-            self.setStyleSheet(f.read())
-
-        section = QHBoxLayout()
-        section.setSpacing(0)
-
-        # set up all of the quizzes
-        quizzes = [
-            file.rstrip(".json") for file in
-            os.listdir(Path(self.user.path, "local"))
-        ]
-
-        # dynamically load the quizzes
-        for i in quizzes:
-            card = QCover(title=i, user=self.user)
-            card.setCursor(QCursor(Qt.PointingHandCursor))
-            card.clicked.connect(partial(self._card_clicked, i))
-            section.addWidget(card)
-
-        # make area scrollable
-        section_widget = QWidget()
-        section_widget.setObjectName("cards-scroll")
-        section_widget.setLayout(section)
-        section_widget.setSizePolicy(QSizePolicy.Expanding,
-                                     QSizePolicy.Expanding)
-
-        scroll_area.setWidget(section_widget)
+        self.assets.apply(self, "body.css")
 
-        return scroll_area
+        # set up all of the quizzes from the index, not the quiz files
+        grid = QuizGrid(PackIndex(self.user.path).entries())
+        grid.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        grid.clicked.connect(self._card_clicked)
+        return grid
 
     def _quiz_page(self, title: str) -> QWidget:
         """Load the quiz
@@ -1066,22 +1275,38 @@ class Window(QMainWindow):
         main_layout = QGridLayout()
         self.quiz_main = QStackedLayout()
 
-        # open the quiz file
-        with open(Path(self.user.path, "local", title + ".json"), "r") as f:
-            quiz_data = json.loads(f.read())
-        # shuffle order of questions
-        random.shuffle(quiz_data["results"])
-
-        questions = quiz_data["results"]
+        # open the quiz file, binary packs are only read as played
+        pack = open_pack(Path(self.user.path, "local"), title)
+        # shuffle order of questions, only their indices
+        order = random.sample(range(len(pack)),
+                              min(len(pack), MAX_QUIZ_QUESTIONS))
+        questions = PackQuestions(pack, order)
 
         # set up the quiz
         self.score = 0
         self.question_index = 0
         self.active_quiz = questions
         self.active_title = title
+        self.answer_queue = None
 
-        # start the quiz
-        self.quiz_main.addWidget(self._question_ui(questions[0]))
+        # start the quiz on the server in the order it will be played
+        if self.api_key:
+            queue = self.answer_queue = AnswerQueue(self.network, title,
+                                                    questions)
+            queue.started.connect(partial(self._quiz_synced, queue))
+            queue.failed.connect(partial(self._quiz_sync_failed, queue))
+            queue.graded.connect(self._answers_graded)
+            queue.start()
+
+        # start the quiz, the next question is filled in ahead of time
+        self.question_deck = QQuestionDeck(self.assets)
+        self.question_deck.answered.connect(self._question_option_clicked)
+        self.question_deck.back.connect(self._question_ui_back)
+        self.question_deck.show_question(questions[0],
+                                         self._question_status(), 0)
+        if len(questions) > 1:
+            self.question_deck.prepare(questions[1], 1)
+        self.quiz_main.addWidget(self.question_deck)
 
         main_layout.addLayout(self.quiz_main, 2, 2)
         page.setLayout(main_layout)
@@ -1116,123 +1341,46 @@ class Window(QMainWindow):
 
     def _back_to_main(self):
         """Go back to main menu no matter what"""
-        self.setWindowTitle("Quizzy - Home")
-        for _ in range(self.main_layout.count() - 1, 0, -1):
-            widget = self.main_layout.widget(_)
-            self.main_layout.removeWidget(widget)
-
+        # menu pages stay cached, any quiz is destroyed
+        self.pages.home()
+        # replies still out for the quiz are dropped when they arrive, and
+        # no more infinite questions are handed over
+        self.question_deck = None
+        self.prefetcher.stop()
         self.setWindowTitle(f"Quizzy - {self.path}")
 
-    def _question_ui_nav(self, infinite: bool = False) -> QWidget:
-        """Question navigation bar
+    def _question_status(self, infinite: bool = False) -> str:
+        """Score shown above the question
 
                 Parameters:
                         infinite (bool): Infinite gamemode?
         """
-        widget = QWidget()
-        layout = QHBoxLayout()
-
-        # back to menu button
-        back = QPushButton("BACK")
-        back.setCursor(QCursor(Qt.PointingHandCursor))
-        back.clicked.connect(self._question_ui_back)
-
-        layout.addWidget(back)
-        layout.addStretch()
         if not infinite:
-            # display score
-            layout.addWidget(QLabel(f"{self.score}/{len(self.active_quiz)}"))
-        else:
-            # display lives and score
-            layout.addWidget(
-                QLabel(f"Score: {self.score} "
-                       f"Lives: {self.live_session['lives']}")
-            )
-
-        widget.setLayout(layout)
-        return widget
+            return f"{self.score}/{len(self.active_quiz)}"
+        # lives as well in infinite mode
+        return f"Score: {self.score} Lives: {self.live_session['lives']}"
 
     def _question_ui_back(self) -> None:
         """Back to menu from questions"""
-        first_widget = self.main_layout.widget(2)
-        self.main_layout.removeWidget(first_widget)
-        first_widget.deleteLater()
-
+        # send off anything answered so far
+        if self.answer_queue is not None:
+            self.answer_queue.finish()
         self._back_to_main()
 
-    def _question_ui(self, question: dict) -> QWidget:
-        """Load the question UI for nomrmal mode
-
-                Parameters:
-                        question (dict): The question
-        """
-        question_ui = QWidget()
-
-        main_layout = QVBoxLayout()
-        main_layout.addWidget(self._question_ui_nav())
-
-        # display the question
-        main_layout.addWidget(QQuestions(question["question"], css="quiz.css"))
-
-        options_layout = QGridLayout()
-        options_layout.setHorizontalSpacing(0)
-        options_layout.setVerticalSpacing(0)
-
-        # combines and shuffles order of questions
-        options = question["incorrect_answers"] + [question["correct_answer"]]
-        random.shuffle(options)
-
-        # set up positions of the answers
-        positions = (
-            [(0, 0), (1, 0), (1, 1), (0, 1)]
-            if question["type"] == "multiple"
-            else [(0, 0), (1, 0)]
-        )
-
-        # load the answer options
-        for index, pos in enumerate(positions):
-            option = options[index]
-            button = QQuestions(option, css="questions.css")
-
-            button.clicked.connect(
-                partial(
-                    self._question_option_clicked,
-                    option, question["correct_answer"]
-                )
-            )
-            options_layout.addWidget(button, pos[0], pos[1])
-
-        questions_box = QHBoxLayout()
-
-        questions_box.addLayout(options_layout)
-
-        main_layout.addLayout(questions_box)
-        question_ui.setLayout(main_layout)
-
-        return question_ui
-
-    def _question_option_clicked(self, selected: str, correct_answer: str):
+    def _question_option_clicked(self, selected: str):
         """Selected answer to question
 
                 Parameter:
                         selected (str): The selected answer
-                        correct_answer (str): The correct answer
         """
-        # if online
-        if self.api_key:
-            # answer the quiz online to add points
-            headers = {"X-API-Key": self.api_key,
-                       "Content-Type": "application/json"}
-            data = {"quiz_name": self.active_title, "selected": selected}
-            response = requests.post(
-                f"{self.api}/answer_quiz",
-                data=json.dumps(data), headers=headers
-            )
-            status = response.json()["status"]
-            # if correct add points locally
-            if "correct" in status.lower():
-                self.user_score += 1
-                self.points_display.setText(f"{self.user_score} points")
+        question = self.active_quiz[self.question_index]
+        correct_answer = question["correct_answer"]
+
+        # if online, answers are sent to the server in batches
+        if self.answer_queue is not None:
+            self.answer_queue.add(self.question_index, selected)
+            if self.question_index + 1 >= len(self.active_quiz):
+                self.answer_queue.finish()
 
         if selected == correct_answer:
             QMessageBox.information(
@@ -1244,20 +1392,58 @@ class Window(QMainWindow):
             QMessageBox.warning(self, "Wrong Answer",
                                 "Oops! Your answer is incorrect.")
 
-        first_widget = self.quiz_main.widget(0)
-        self.quiz_main.removeWidget(first_widget)
-        first_widget.deleteLater()
-
-        # if correct add points
         self.question_index += 1
         if self.question_index >= len(self.active_quiz):
             # if end of questions, display summary
+            first_widget = self.quiz_main.widget(0)
+            self.quiz_main.removeWidget(first_widget)
+            first_widget.deleteLater()
             self.quiz_main.addWidget(self._quiz_summary())
         else:
-            # else next question
-            self.quiz_main.addWidget(
-                self._question_ui(self.active_quiz[self.question_index])
+            # else next question, already filled in on the hidden page
+            self.question_deck.show_question(
+                self.active_quiz[self.question_index],
+                self._question_status(), self.question_index
             )
+            if self.question_index + 1 < len(self.active_quiz):
+                self.question_deck.prepare(
+                    self.active_quiz[self.question_index + 1],
+                    self.question_index + 1)
+
+    def _quiz_synced(self, queue: AnswerQueue, seed) -> None:
+        """Quiz was started on the server, answers are shown by its seed
+
+                Parameters:
+                        queue (AnswerQueue): Answers to the quiz started
+                        seed (int): Seed the server handed out, if any
+        """
+        # a reply for an earlier go at the same quiz has the wrong seed
+        if queue is not self.answer_queue:
+            return
+        if (self.question_deck is not None
+                and not sip.isdeleted(self.question_deck)):
+            self.question_deck.seed = seed
+
+    def _quiz_sync_failed(self, queue: AnswerQueue, error) -> None:
+        """Quiz could not be started on the server, so isn't graded"""
+        if queue is not self.answer_queue:
+            return
+        QMessageBox.warning(
+            self, "Competitive Quiz",
+            "Could not start the quiz on the server, your answers won't "
+            f"be counted: {error}"
+        )
+
+    def _answers_graded(self, points: int) -> None:
+        """Server graded a batch of answers
+
+                Parameters:
+                        points (int): Points gained
+        """
+        # add the points gained locally
+        if points:
+            self.user_score += points
+            self.points_display.setText(f"{self.user_score} points")
 
     def _card_clicked(self, title: str):
         """Question card on local quizzes page clicked
@@ -1268,77 +1454,39 @@ class Window(QMainWindow):
         # set window title
         self.setWindowTitle(f"Quizzy - {title.upper()}")
         # load quiz
-        self.main_layout.addWidget(self._quiz_page(title))
-        self.main_layout.setCurrentIndex(2)
+        self.pages.push(self._quiz_page(title))
 
 
-class QCover(QWidget):
-    """Local quiz pack question box"""
+class QQuestions(QWidget):
+    """Question Heading"""
     clicked = pyqtSignal()
 
-    def __init__(self,
-                 title: str,
-                 user: dict,
-                 parent=None,
-                 css: str = "card.css"):
+    def __init__(
+        self, title: str,
+        parent=None,
+        css: str = "",
+        user: dict = None
+    ):
         super().__init__(parent)
 
         card_layout = QVBoxLayout()
         self.title = title
-        self.user = user
-
-        card_layout.addWidget(self._format())
         self.setObjectName("card")
 
-        stylepath = Path(Path(__file__).parent, "styles", css)
-        with open(stylepath, "r") as f:
-            self.setStyleSheet(f.read())
+        self.label = QLabel(title)
+        self.label.setWordWrap(True)
+        self.label.setAlignment(Qt.AlignCenter)
+        card_layout.addWidget(self.label)
 
-        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setStyleSheet(css)
 
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.setLayout(card_layout)
 
-    def _decor(self):
-        return QLabel()
-
-    def _title(self):
-        label = QLabel(html.unescape(self.title.upper()))
-        label.setObjectName("card-title")
-        label.setWordWrap(True)
-        label.setAlignment(Qt.AlignBottom)
-        return label
-
-    def _desc(self):
-        with open(Path(self.user.path,
-                       "local", self.title + ".json"), "r") as f:
-            category = json.loads(f.read())["category"].upper()
-        label = QLabel(html.unescape(category))
-        label.setObjectName("card-desc")
-        label.setWordWrap(True)
-        label.setAlignment(Qt.AlignTop)
-        return label
-
-    def _stats(self):
-        return QLabel()
-
-    def _format(self) -> QWidget:
-        frame = QWidget()
-        frame.setObjectName("card-frame")
-        frame.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-
-        # format order
-        format = [self._decor, self._title, self._desc, self._stats]
-        layout = QGridLayout()
-
-        # format positions
-        for index, function in enumerate(format):
-            x, y = divmod(index, 2)
-            layout.addWidget(function(), y, x)
-
-        layout.setSpacing(0)
-
-        frame.setLayout(layout)
-        return frame
+    def set_title(self, title: str) -> None:
+        """Show different text without building a new widget"""
+        self.title = title
+        self.label.setText(title)
 
     def mousePressEvent(self, event):
         """Override mouse press event to emit clicked signal"""
@@ -1346,38 +1494,129 @@ class QCover(QWidget):
         super().mousePressEvent(event)
 
 
-class QQuestions(QWidget):
-    """Question Heading"""
-    clicked = pyqtSignal()
+class QQuestionView(QWidget):
+    """Question screen, filled in again for every question"""
+    answered = pyqtSignal(str)
+    back = pyqtSignal()
 
-    def __init__(
-        self, title: str,
-        parent=None,
-        css: str = "questions.css",
-        user: dict = None
-    ):
+    # where the answers go, true or false only uses the first two
+    POSITIONS = [(0, 0), (1, 0), (1, 1), (0, 1)]
+
+    def __init__(self, assets: Assets, parent=None):
         super().__init__(parent)
+        self.options = []
 
-        card_layout = QVBoxLayout()
-        self.title = title
-        self.setObjectName("card")
+        main_layout = QVBoxLayout()
 
-        label = QLabel(html.unescape(title))
-        label.setWordWrap(True)
-        label.setAlignment(Qt.AlignCenter)
-        card_layout.addWidget(label)
+        # navigation bar
+        nav = QWidget()
+        nav_layout = QHBoxLayout()
+        back = QPushButton("BACK")
+        back.setCursor(QCursor(Qt.PointingHandCursor))
+        back.clicked.connect(self.back.emit)
+        nav_layout.addWidget(back)
+        nav_layout.addStretch()
+        self.status = QLabel()
+        nav_layout.addWidget(self.status)
+        nav.setLayout(nav_layout)
+        main_layout.addWidget(nav)
+
+        # the question
+        self.question = assets.apply(QQuestions(""), "quiz.css")
+        main_layout.addWidget(self.question)
+
+        # the answers
+        options_layout = QGridLayout()
+        options_layout.setHorizontalSpacing(0)
+        options_layout.setVerticalSpacing(0)
+        self.buttons = []
+        for index, pos in enumerate(self.POSITIONS):
+            button = assets.apply(QQuestions(""), "questions.css")
+            button.clicked.connect(partial(self._clicked, index))
+            options_layout.addWidget(button, pos[0], pos[1])
+            self.buttons.append(button)
 
-        stylepath = Path(Path(__file__).parent, "styles", css)
-        with open(stylepath, "r") as f:
-            self.setStyleSheet(f.read())
+        questions_box = QHBoxLayout()
+        questions_box.addLayout(options_layout)
+        main_layout.addLayout(questions_box)
 
-        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.setLayout(card_layout)
+        self.setLayout(main_layout)
 
-    def mousePressEvent(self, event):
-        """Override mouse press event to emit clicked signal"""
-        self.clicked.emit()
-        super().mousePressEvent(event)
+    def set_question(self, question: str, options: list) -> None:
+        """Fill in a question and its answers
+
+                Parameters:
+                        question (str): The question
+                        options (list): Answers, in the order to show them
+        """
+        self.options = options
+        self.question.set_title(question)
+        for index, button in enumerate(self.buttons):
+            if index < len(options):
+                button.set_title(options[index])
+                button.show()
+            else:
+                button.hide()
+
+    def _clicked(self, index: int) -> None:
+        self.answered.emit(self.options[index])
+
+
+class QQuestionDeck(QWidget):
+    """Two question screens, the next question filled in on the hidden one"""
+    answered = pyqtSignal(str)
+    back = pyqtSignal()
+
+    def __init__(self, assets: Assets, parent=None):
+        super().__init__(parent)
+        self.stack = QStackedLayout()
+        for _ in range(2):
+            view = QQuestionView(assets)
+            view.answered.connect(self.answered.emit)
+            view.back.connect(self.back.emit)
+            self.stack.addWidget(view)
+        # question the hidden screen was filled in with
+        self.prepared = None
+        # seed from the server answers are shown in order by, once known
+        self.seed = None
+        self.setLayout(self.stack)
+
+    def show_question(self, question: dict, status: str,
+                      position: int = None) -> None:
+        """Show a question, flipping to the hidden screen if it is ready
+
+                Parameters:
+                        question (dict): The question
+                        status (str): Score to show above it
+                        position (int): The question's place in the quiz
+        """
+        if self.prepared is question:
+            view = self.stack.widget(1 - self.stack.currentIndex())
+            self.stack.setCurrentWidget(view)
+        else:
+            view = self.stack.currentWidget()
+            view.set_question(question["question"],
+                              self._options(question, position))
+        self.prepared = None
+        view.status.setText(status)
+
+    def prepare(self, question: dict, position: int = None) -> None:
+        """Fill in the hidden screen with the question coming next"""
+        view = self.stack.widget(1 - self.stack.currentIndex())
+        view.set_question(question["question"],
+                          self._options(question, position))
+        self.prepared = question
+
+    def _options(self, question: dict, position: int = None) -> list:
+        # infinite quiz questions come shuffled by the server
+        if "options" in question:
+            return question["options"]
+        # in the order the server works out from its seed
+        if self.seed is not None and position is not None:
+            return shuffle.options(self.seed, position, question)
+        options = question["incorrect_answers"] + [question["correct_answer"]]
+        random.shuffle(options)
+        return options
 
 
 class QLeaderboardItem(QWidget):
@@ -1451,12 +1690,12 @@ class QCard(QWidget):
 
         card_layout.addStretch(1)
 
-        title_label = QLabel(html.unescape(title))
+        title_label = QLabel(title)
         title_label.setObjectName("title")
         card_layout.addWidget(title_label, alignment=Qt.AlignBottom)
 
         if description:
-            desc_label = QLabel(html.unescape(description))
+            desc_label = QLabel(description)
             desc_label.setWordWrap(True)
             desc_label.setObjectName("description")
             card_layout.addWidget(desc_label, alignment=Qt.AlignTop)
@@ -1491,9 +1730,9 @@ class QCard(QWidget):
         super().mousePressEvent(event)
 
 
-def main(host: str) -> None:
+def main(host: str, dev: bool = False) -> None:
     """Main function"""
     app = QApplication(sys.argv)
-    window = Window(host)
+    window = Window(host, dev)
     window.showMaximized()
     sys.exit(app.exec())